@@ -0,0 +1,31 @@
+"""Shared helpers for the benchmark scripts in this directory.
+
+These are plain scripts rather than tests; run them directly, for example::
+
+    python benchmarks/klass_properties.py
+"""
+
+import timeit
+import typing
+
+
+def best_of(
+    func: typing.Callable[[], typing.Any], number: int = 100_000, repeat: int = 5
+) -> float:
+    """Return the best per call time in nanoseconds across repeated runs"""
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number * 1e9
+
+
+def report(
+    title: str, results: typing.Iterable[tuple[str, float]], unit: str = "ns/call"
+) -> None:
+    """Print a table of results, relative to the first entry"""
+    results = list(results)
+    print(title)
+    if not results:
+        return
+    baseline = results[0][1]
+    width = max(len(name) for name, _ in results)
+    for name, value in results:
+        print(f"  {name:<{width}}  {value:10.1f} {unit}  {value / baseline:6.2f}x")
+    print()
@@ -0,0 +1,99 @@
+"""Benchmark compressing many small payloads, with and without a dictionary.
+
+Uses 10000 small JSON records, as a metadata cache would hold, training the
+dictionaries on the first 1000.  Ratios are printed alongside the timings.
+"""
+
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from _timing import best_of, report
+
+from snakeoil import compression
+
+COUNT = 10000
+
+
+def main():
+    payloads = [
+        json.dumps(
+            {
+                "name": f"dev-python/pkg-{x}",
+                "version": f"{x % 5}.{x % 11}.{x % 3}",
+                "depends": ["dev-lang/python", "dev-python/snakeoil"][: x % 3],
+                "keywords": ["amd64", "arm64", "~riscv"][x % 3 :],
+            }
+        ).encode()
+        for x in range(COUNT)
+    ]
+    size = sum(map(len, payloads))
+
+    def ratio(compressed):
+        return size / sum(map(len, compressed))
+
+    for compressor_type in ("zstd", "zlib"):
+        try:
+            dictionary = compression.train_dictionary(
+                payloads[:1000], compressor_type=compressor_type
+            )
+        except ValueError as e:
+            print(f"{compressor_type}: {e}\n")
+            continue
+        plain = compression.compress_many(payloads, compressor_type=compressor_type)
+        trained = compression.compress_many(payloads, dictionary)
+        report(
+            f"{compressor_type}, {COUNT} payloads; ratio {ratio(plain):.2f} without "
+            f"a dictionary, {ratio(trained):.2f} with",
+            (
+                (
+                    "compress_many",
+                    best_of(
+                        lambda: compression.compress_many(
+                            payloads, compressor_type=compressor_type
+                        ),
+                        1,
+                        5,
+                    )
+                    / 1e6,
+                ),
+                (
+                    "compress_many, dictionary",
+                    best_of(
+                        lambda: compression.compress_many(payloads, dictionary), 1, 5
+                    )
+                    / 1e6,
+                ),
+                (
+                    "decompress_many, dictionary",
+                    best_of(
+                        lambda: compression.decompress_many(trained, dictionary), 1, 5
+                    )
+                    / 1e6,
+                ),
+            ),
+            unit="ms",
+        )
+
+    report(
+        f"compress_data per payload, {COUNT} payloads",
+        (
+            (
+                name,
+                best_of(
+                    lambda: [compression.compress_data(name, x, 3) for x in payloads],
+                    1,
+                    3,
+                )
+                / 1e6,
+            )
+            for name in ("zstd", "gzip")
+        ),
+        unit="ms",
+    )
+
+
+if __name__ == "__main__":
+    main()
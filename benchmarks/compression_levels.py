@@ -0,0 +1,38 @@
+"""Benchmark ratio and throughput of each compressor across its levels.
+
+Uses snakeoil's own source as the corpus by default; pass files to measure
+them instead, each compressed separately.  Levels chosen by
+``compression.pick_level`` with its default targets are marked.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from snakeoil import compression
+
+
+def main(paths=()):
+    corpus = None
+    if paths:
+        corpus = []
+        for path in paths:
+            with open(path, "rb") as f:
+                corpus.append(f.read())
+    results = compression.benchmark(corpus)
+    for compressor_type in dict.fromkeys(x.compressor_type for x in results):
+        levels = [x for x in results if x.compressor_type == compressor_type]
+        picked = compression.pick_level(levels).level
+        print(compressor_type)
+        print(f"  {'level':>5}  {'ratio':>6}  {'compress':>14}  {'decompress':>14}")
+        for x in levels:
+            print(
+                f"  {x.level:>5}  {x.ratio:6.2f}  {x.compress_mbps:9.1f} MB/s"
+                f"  {x.decompress_mbps:9.1f} MB/s{'  *' if x.level == picked else ''}"
+            )
+        print()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
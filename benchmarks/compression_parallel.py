@@ -0,0 +1,71 @@
+"""Benchmark serial versus in process parallel bzip2 and xz compression.
+
+Uses 16MiB of moderately compressible data.  Speedups scale with the number of
+cores available; on a single core the parallel paths should only be marginally
+slower than the serial ones.  Both decompression timings use the same multi-stream
+input.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from _timing import best_of, report
+
+from snakeoil import compression
+
+SIZE = 16 << 20
+
+
+def main():
+    line = b"".join(b"%i %s\n" % (x, os.urandom(8).hex().encode()) for x in range(4096))
+    data = (line * (SIZE // len(line) + 1))[:SIZE]
+    for name, level in (("bzip2", 9), ("xz", 6)):
+        parallel = compression.compress_data(name, data, level=level, parallelize=True)
+        report(
+            f"{name} -{level}, {SIZE >> 20}MiB, cpus={os.cpu_count()}",
+            (
+                (
+                    "compress",
+                    best_of(
+                        lambda: compression.compress_data(name, data, level=level),
+                        1,
+                        3,
+                    )
+                    / 1e6,
+                ),
+                (
+                    "compress, parallel",
+                    best_of(
+                        lambda: compression.compress_data(
+                            name, data, level=level, parallelize=True
+                        ),
+                        1,
+                        3,
+                    )
+                    / 1e6,
+                ),
+                (
+                    "decompress",
+                    best_of(lambda: compression.decompress_data(name, parallel), 1, 3)
+                    / 1e6,
+                ),
+                (
+                    "decompress, parallel",
+                    best_of(
+                        lambda: compression.decompress_data(
+                            name, parallel, parallelize=True
+                        ),
+                        1,
+                        3,
+                    )
+                    / 1e6,
+                ),
+            ),
+            unit="ms",
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Benchmark compress_data and decompress_data on small payloads.
+
+Compares against creating a fresh stdlib or zstandard context per call, which
+is what compress_data did before pooling contexts and sizing xz dictionaries
+and bzip2 blocks to the data.
+"""
+
+import bz2
+import lzma
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from _timing import best_of, report
+
+from snakeoil import compression
+
+PAYLOAD = b"".join(
+    b"%i: /usr/lib/python3/site-packages/%i.py\n" % (x, x) for x in range(40)
+)
+
+
+def fresh_zstd():
+    try:
+        import zstandard
+    except ImportError:
+        return None
+    return lambda: zstandard.ZstdCompressor(level=3).compress(PAYLOAD)
+
+
+def main():
+    zstd = fresh_zstd()
+    cases = [
+        ("bzip2", 9, lambda: bz2.compress(PAYLOAD, 9), 2000),
+        ("xz", 6, lambda: lzma.compress(PAYLOAD, preset=6), 20),
+        ("xz", 9, lambda: lzma.compress(PAYLOAD, preset=9), 5),
+        ("zstd", 3, zstd, 20000),
+    ]
+    for name, level, fresh, number in cases:
+        compressed = compression.compress_data(name, PAYLOAD, level)
+        results = []
+        if fresh is not None:
+            results.append(("fresh context", best_of(fresh, number, 3) / 1e3))
+        results.append(
+            (
+                "compress_data",
+                best_of(
+                    lambda: compression.compress_data(name, PAYLOAD, level), number, 3
+                )
+                / 1e3,
+            )
+        )
+        results.append(
+            (
+                "decompress_data",
+                best_of(
+                    lambda: compression.decompress_data(name, compressed), number, 3
+                )
+                / 1e3,
+            )
+        )
+        report(f"{name} -{level}, {len(PAYLOAD)} bytes", results, unit="us/call")
+
+
+if __name__ == "__main__":
+    main()
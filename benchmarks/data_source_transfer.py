@@ -0,0 +1,74 @@
+"""Benchmark data_source.transfer_to_data_source into files on disk.
+
+Compares the in kernel copy against the previous mmap and write approach, and the
+generic read/write loop (used for sources without a path) at the old 32KiB read size
+versus the current default.  The size defaults to 1GiB; pass a size in MiB
+to test larger files, for example ``python benchmarks/data_source_transfer.py 4096``.
+The temporary directory is created under $TMPDIR, which should be a real filesystem
+rather than tmpfs for meaningful numbers.  Timings are warm cache.
+"""
+
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from _timing import best_of, report
+
+from snakeoil import data_source
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 1024
+    with tempfile.TemporaryDirectory() as tmp:
+        src = os.path.join(tmp, "src")
+        chunk = os.urandom(1 << 20)
+        with open(src, "wb") as f:
+            for _ in range(size):
+                f.write(chunk)
+        source = data_source.local_source(src)
+        dest = os.path.join(tmp, "dest")
+
+        def transfer(source, bufsize=None):
+            if os.path.exists(dest):
+                os.unlink(dest)
+            source.transfer_to_path(dest, bufsize=bufsize)
+
+        def userspace(source, bufsize=None):
+            def f():
+                copiers = data_source._in_kernel_copiers
+                data_source._in_kernel_copiers = ()
+                try:
+                    transfer(source, bufsize)
+                finally:
+                    data_source._in_kernel_copiers = copiers
+
+            return f
+
+        report(
+            f"transfer {size}MiB file to file",
+            (
+                ("mmap and write", best_of(userspace(source), 1, 3) / 1e6),
+                ("in kernel", best_of(lambda: transfer(source), 1, 3) / 1e6),
+            ),
+            unit="ms",
+        )
+
+        # no path, thus the generic read/write loop.
+        handle = data_source.invokable_data_source(lambda text: open(src, "rb"))
+        report(
+            f"transfer {size}MiB file handle to file",
+            (
+                ("32KiB reads", best_of(userspace(handle, 32 * 1024), 1, 3) / 1e6),
+                (
+                    f"{data_source.base.transfer_bufsize >> 10}KiB reads",
+                    best_of(userspace(handle), 1, 3) / 1e6,
+                ),
+            ),
+            unit="ms",
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""Benchmark AtomicWriteFile durability modes against AtomicWriteBatch.
+
+Writes 200 small files per run, as a cache regeneration would.  The temporary
+directory is created under $TMPDIR, which should be on the filesystem of interest;
+syncs on tmpfs are free, and thus meaningless.
+"""
+
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from _timing import best_of, report
+
+from snakeoil import fileutils
+
+COUNT = 200
+DATA = "cache entry\n" * 20
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = [os.path.join(tmp, f"entry-{x}") for x in range(COUNT)]
+
+        def individual(durability):
+            def f():
+                for path in paths:
+                    with fileutils.AtomicWriteFile(path, durability=durability) as af:
+                        af.write(DATA)
+
+            return f
+
+        def batch(**kwargs):
+            def f():
+                with fileutils.AtomicWriteBatch(**kwargs) as b:
+                    for path in paths:
+                        b.write(path, DATA)
+
+            return f
+
+        report(
+            f"{COUNT} files",
+            (
+                ("AtomicWriteFile none", best_of(individual("none"), 1, 3) / 1e6),
+                ("AtomicWriteFile data", best_of(individual("data"), 1, 3) / 1e6),
+                ("AtomicWriteFile full", best_of(individual("full"), 1, 3) / 1e6),
+                ("batch, not durable", best_of(batch(durable=False), 1, 3) / 1e6),
+                ("batch, fsync", best_of(batch(), 1, 3) / 1e6),
+                ("batch, syncfs", best_of(batch(syncfs=True), 1, 3) / 1e6),
+            ),
+            unit="ms",
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Benchmark fileutils.readlines against the bulk reader.
+
+Covers the common case of many small config/metadata files, and a single large
+file.  Files are written to a temporary directory, so timings are warm cache.
+"""
+
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from _timing import best_of, report
+
+from snakeoil import fileutils
+
+SMALL = "".join(f"KEY{x}=value {x}\n" for x in range(20))
+LARGE = "".join(f"line {x} of a larger file\n" for x in range(1_000_000))
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        small = []
+        for x in range(1000):
+            small.append(path := os.path.join(tmp, f"small-{x}"))
+            with open(path, "w") as f:
+                f.write(SMALL)
+        with open(large := os.path.join(tmp, "large"), "w") as f:
+            f.write(LARGE)
+
+        report(
+            "1000 small files, stripped",
+            (
+                (
+                    "readlines",
+                    best_of(lambda: [list(fileutils.readlines(p)) for p in small], 5)
+                    / 1000,
+                ),
+                (
+                    "readlines_bulk",
+                    best_of(lambda: [fileutils.readlines_bulk(p) for p in small], 5)
+                    / 1000,
+                ),
+            ),
+            unit="us/1000 files",
+        )
+        report(
+            f"large file ({len(LARGE) >> 20}MiB), stripped",
+            (
+                (
+                    "readlines",
+                    best_of(lambda: list(fileutils.readlines(large)), 1, 3) / 1e6,
+                ),
+                (
+                    "readlines_bulk",
+                    best_of(lambda: fileutils.readlines_bulk(large), 1, 3) / 1e6,
+                ),
+            ),
+            unit="ms",
+        )
+        report(
+            f"large file ({len(LARGE) >> 20}MiB), unstripped",
+            (
+                (
+                    "readlines",
+                    best_of(lambda: list(fileutils.readlines(large, False)), 1, 3)
+                    / 1e6,
+                ),
+                (
+                    "readlines_bulk",
+                    best_of(lambda: fileutils.readlines_bulk(large, False), 1, 3) / 1e6,
+                ),
+            ),
+            unit="ms",
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""Startup time budgets for snakeoil modules.
+
+Each module is imported in fresh interpreters and compared against a budget in
+milliseconds; the exit status is non zero if any is exceeded.  Eagerly imported
+stdlib modules that could be deferred via snakeoil.delayed are listed too.
+
+Budgets are the recorded baseline plus 25% headroom; the baseline is the median
+of seven measurements, each the fastest of 15 fresh interpreters, on a single
+cpu linux machine running python 3.11.  Rerecord BASELINES when an import gets
+legitimately heavier or lighter.  Budgets are machine dependent; override them
+for a given machine via --budget module=ms.  Extra arguments are passed through to
+snakeoil.tools.importtime, for example::
+
+    python benchmarks/import_budget.py --cold --budget snakeoil.klass=20
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from snakeoil.cli.tool import Tool
+from snakeoil.tools import importtime
+
+# milliseconds; the median of seven runs of `python benchmarks/import_budget.py`.
+BASELINES = {
+    "snakeoil.chksum": 77.3,
+    "snakeoil.cli.arghparse": 74.5,
+    "snakeoil.compression": 62.2,
+    "snakeoil.data_source": 65.7,
+    "snakeoil.fileutils": 53.3,
+    "snakeoil.formatters": 54.1,
+    "snakeoil.klass": 45.5,
+    "snakeoil.mappings": 48.6,
+    "snakeoil.osutils": 35.2,
+    "snakeoil.process": 6.4,
+}
+HEADROOM = 1.25
+RUNS = 15
+BUDGETS = {module: round(ms * HEADROOM, 1) for module, ms in BASELINES.items()}
+
+
+def main(args):
+    budgets = [f"--budget={module}={ms}" for module, ms in BUDGETS.items()]
+    # measured as the baseline was; later arguments take precedence.
+    return Tool(importtime.parser)(
+        [f"--runs={RUNS}"] + budgets + list(args) + list(BUDGETS)
+    )
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,71 @@
+"""Benchmarks for GenericEquality and GenericRichComparison.
+
+Compares the generated comparison methods against the generic attribute walk
+they replace, and against a plain tuple, for equality checks and for sorting
+a large list.
+"""
+
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from _timing import best_of, report
+
+from snakeoil.klass import GenericRichComparison
+
+
+class compiled(GenericRichComparison):
+    __slots__ = ("category", "package", "version")
+    __attr_comparison__ = ("category", "package", "version")
+
+    def __init__(self, category, package, version):
+        self.category, self.package, self.version = category, package, version
+
+
+class generic(compiled):
+    __slots__ = ()
+
+    # force the generic implementations back in place.
+    __eq__ = GenericRichComparison.__eq__
+    __lt__ = GenericRichComparison.__lt__
+    __sort_key__ = GenericRichComparison.__sort_key__
+
+
+def make(kls, count=10_000):
+    rand = random.Random(0)
+    return [
+        kls(f"cat-{rand.randrange(50)}", f"pkg-{rand.randrange(500)}", rand.random())
+        for _ in range(count)
+    ]
+
+
+def main():
+    pairs = (
+        ("tuple", (lambda o1, o2: lambda: o1 == o2)(("a", "b", 1), ("a", "b", 1))),
+        ("generated", (lambda o1, o2: lambda: o1 == o2)(*make(compiled, 2))),
+        ("generic", (lambda o1, o2: lambda: o1 == o2)(*make(generic, 2))),
+    )
+    report("__eq__", ((name, best_of(func)) for name, func in pairs))
+
+    tuples = [(o.category, o.package, o.version) for o in make(compiled)]
+    fast, slow = make(compiled), make(generic)
+    report(
+        "sorting 10k instances",
+        (
+            ("tuple", best_of(lambda: sorted(tuples), number=10) / 1000),
+            ("generated __lt__", best_of(lambda: sorted(fast), number=10) / 1000),
+            (
+                "generated __sort_key__",
+                best_of(lambda: sorted(fast, key=compiled.__sort_key__), number=10)
+                / 1000,
+            ),
+            ("generic __lt__", best_of(lambda: sorted(slow), number=10) / 1000),
+        ),
+        unit="us/sort",
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""Microbenchmarks for the snakeoil.klass property helpers.
+
+Compares jit_attr, jit_attr_none, cached_property and alias_attr against
+functools.cached_property and a handwritten property, both for the first
+(cold) access on a fresh instance and for repeated (warm) access.  Cold
+timings include instance creation.  Results are relative to
+functools.cached_property.
+"""
+
+import functools
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from _timing import best_of, report
+
+from snakeoil.klass import alias_attr, cached_property, jit_attr, jit_attr_none
+
+
+class handwritten:
+    __slots__ = ("_attr",)
+
+    @property
+    def attr(self):
+        try:
+            return self._attr
+        except AttributeError:
+            self._attr = 1
+            return 1
+
+
+class functools_cached:
+    @functools.cached_property
+    def attr(self):
+        return 1
+
+
+class slotted_jit_attr:
+    __slots__ = ("_attr",)
+
+    @jit_attr
+    def attr(self):
+        return 1
+
+
+class slotted_jit_attr_none:
+    __slots__ = ("_attr",)
+
+    @jit_attr_none
+    def attr(self):
+        return 1
+
+
+class dict_jit_attr:
+    @jit_attr
+    def attr(self):
+        return 1
+
+
+class dict_jit_attr_none:
+    @jit_attr_none
+    def attr(self):
+        return 1
+
+
+class snakeoil_cached:
+    @cached_property
+    def attr(self):
+        return 1
+
+
+class aliased:
+    __slots__ = ("_attr",)
+
+    def __init__(self):
+        self._attr = 1
+
+    attr = alias_attr("_attr")
+
+
+targets = (
+    ("functools.cached_property", functools_cached),
+    ("handwritten property", handwritten),
+    ("jit_attr (slotted)", slotted_jit_attr),
+    ("jit_attr_none (slotted)", slotted_jit_attr_none),
+    ("jit_attr (__dict__)", dict_jit_attr),
+    ("jit_attr_none (__dict__)", dict_jit_attr_none),
+    ("cached_property", snakeoil_cached),
+    ("alias_attr", aliased),
+)
+
+
+def cold(kls):
+    return lambda: kls().attr
+
+
+def warm(kls):
+    obj = kls()
+    obj.attr
+    return lambda: obj.attr
+
+
+def main():
+    report("cold access", ((name, best_of(cold(kls))) for name, kls in targets))
+    report(
+        "warm access",
+        ((name, best_of(warm(kls), number=1_000_000)) for name, kls in targets),
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""Benchmark the per access overhead of delayed instantiation proxies.
+
+Measures attribute access and special method dispatch on a reified proxy
+against the real object and against the object unwrapped via reify.
+"""
+
+import os
+import re
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from _timing import best_of, report
+
+from snakeoil.delayed import regexp, reify
+from snakeoil.obj import DelayedInstantiation
+
+
+def main():
+    real = re.compile(r"^(\w+)-(\d+)$")
+    proxy = regexp(r"^(\w+)-(\d+)$")
+    proxy.pattern  # force reification; this measures steady state overhead.
+    report(
+        "attribute access (pattern.match)",
+        (
+            ("real object", best_of(lambda: real.match)),
+            ("proxy", best_of(lambda: proxy.match)),
+            ("reified once", (lambda obj: best_of(lambda: obj.match))(reify(proxy))),
+        ),
+    )
+    report("reify() call", (("reify(proxy)", best_of(lambda: reify(proxy))),))
+    report(
+        "match call",
+        (
+            ("real object", best_of(lambda: real.match("foo-1"))),
+            ("proxy", best_of(lambda: proxy.match("foo-1"))),
+        ),
+    )
+
+    real_list = list(range(10))
+    proxy_list = DelayedInstantiation(list, lambda: real_list)
+    len(proxy_list)
+    report(
+        "special method (len)",
+        (
+            ("real object", best_of(lambda: len(real_list))),
+            ("proxy", best_of(lambda: len(proxy_list))),
+        ),
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Benchmark osutils.ensure_dirs, ensure_dirs_many, and the ensure_dirs cache.
+
+Creates 5000 output directories nested four deep beneath a temporary directory,
+as a build writing per package output would.
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from _timing import best_of, report
+
+from snakeoil import osutils
+
+COUNT = 5000
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        root = os.path.join(tmp, "out")
+        paths = [
+            os.path.join(root, f"cat-{x % 50}", f"pkg-{x}", "work", "temp")
+            for x in range(COUNT)
+        ]
+
+        def create(func, repeat=5):
+            # the removal between runs mustn't be timed.
+            timings = []
+            for _ in range(repeat):
+                shutil.rmtree(root, ignore_errors=True)
+                start = time.perf_counter()
+                func()
+                timings.append(time.perf_counter() - start)
+            return min(timings) * 1e3
+
+        report(
+            f"create {COUNT} nested directories",
+            (
+                (
+                    "ensure_dirs",
+                    create(lambda: [osutils.ensure_dirs(x) for x in paths]),
+                ),
+                ("ensure_dirs_many", create(lambda: osutils.ensure_dirs_many(paths))),
+            ),
+            unit="ms",
+        )
+
+        osutils.ensure_dirs_many(paths, cache=True)
+        report(
+            f"ensure {COUNT} existing directories",
+            (
+                (
+                    "ensure_dirs",
+                    best_of(lambda: [osutils.ensure_dirs(x) for x in paths], 1, 5)
+                    / 1e6,
+                ),
+                (
+                    "ensure_dirs, cached",
+                    best_of(
+                        lambda: [osutils.ensure_dirs(x, cache=True) for x in paths],
+                        1,
+                        5,
+                    )
+                    / 1e6,
+                ),
+            ),
+            unit="ms",
+        )
+
+
+if __name__ == "__main__":
+    main()
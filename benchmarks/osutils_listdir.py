@@ -0,0 +1,103 @@
+"""Benchmark osutils directory listing against the previous listdir and stat approach.
+
+Uses a directory of 100k entries: mostly files, with some subdirectories and
+symlinks.  Timings are warm cache.
+"""
+
+import errno
+import os
+import stat
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from _timing import best_of, report
+
+from snakeoil import osutils
+
+ENTRIES = 100_000
+
+
+def _stat_swallow_enoent(path, check):
+    try:
+        return check(os.stat(path).st_mode)
+    except OSError as oe:
+        if oe.errno == errno.ENOENT:
+            return False
+        raise
+
+
+def old_listdir_files(path):
+    return [
+        x
+        for x in os.listdir(path)
+        if _stat_swallow_enoent(os.path.join(path, x), stat.S_ISREG)
+    ]
+
+
+def old_listdir_dirs(path):
+    return [
+        x
+        for x in os.listdir(path)
+        if _stat_swallow_enoent(os.path.join(path, x), stat.S_ISDIR)
+    ]
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        for x in range(ENTRIES):
+            path = os.path.join(tmp, str(x))
+            if x % 100 == 0:
+                os.mkdir(path)
+                # give the walkers something to descend into.
+                open(os.path.join(path, "file"), "w").close()
+            elif x % 100 == 1:
+                os.symlink(str(x - 1), path)
+            else:
+                open(path, "w").close()
+
+        report(
+            f"{ENTRIES} entries, files and dirs",
+            (
+                (
+                    "listdir+stat",
+                    best_of(
+                        lambda: (old_listdir_files(tmp), old_listdir_dirs(tmp)), 1, 3
+                    )
+                    / 1e6,
+                ),
+                (
+                    "listdir_files+listdir_dirs",
+                    best_of(
+                        lambda: (
+                            osutils.listdir_files(tmp),
+                            osutils.listdir_dirs(tmp),
+                        ),
+                        1,
+                        3,
+                    )
+                    / 1e6,
+                ),
+                (
+                    "listdir_split",
+                    best_of(lambda: osutils.listdir_split(tmp), 1, 3) / 1e6,
+                ),
+            ),
+            unit="ms",
+        )
+        report(
+            f"{ENTRIES} entries, recursive",
+            (
+                ("os.walk", best_of(lambda: list(os.walk(tmp)), 1, 3) / 1e6),
+                (
+                    "walk_entries",
+                    best_of(lambda: list(osutils.walk_entries(tmp)), 1, 3) / 1e6,
+                ),
+            ),
+            unit="ms",
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Benchmark osutils.walk_parallel against os.walk and walk_entries.
+
+Builds a tree shaped like an ebuild repository: 20k package directories spread
+over 150 categories, each with a handful of files.  Pass a directory as the first
+argument to walk an existing tree instead; an NFS mount for example.
+
+Warm cache timings are always taken.  Cold cache timings require root, since the
+page, dentry and inode caches are dropped via /proc/sys/vm/drop_caches before
+each run.
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from _timing import best_of, report
+
+from snakeoil import osutils
+
+CATEGORIES = 150
+PACKAGES = 20_000
+
+
+def build(root):
+    for x in range(PACKAGES):
+        pkg = os.path.join(root, f"cat-{x % CATEGORIES}", f"pkg-{x}")
+        os.makedirs(os.path.join(pkg, "files"))
+        for name in ("Manifest", "metadata.xml", f"pkg-{x}-1.ebuild"):
+            open(os.path.join(pkg, name), "w").close()
+
+
+def drop_caches():
+    os.sync()
+    with open("/proc/sys/vm/drop_caches", "w") as f:
+        f.write("3\n")
+
+
+def cold(func, repeat=3):
+    timings = []
+    for _ in range(repeat):
+        drop_caches()
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1e3
+
+
+def run(root):
+    walkers = (
+        ("os.walk", lambda: sum(1 for _ in os.walk(root))),
+        ("walk_entries", lambda: sum(1 for _ in osutils.walk_entries(root))),
+        (
+            "walk_parallel ordered",
+            lambda: sum(1 for _ in osutils.walk_parallel(root, ordered=True)),
+        ),
+        ("walk_parallel", lambda: sum(1 for _ in osutils.walk_parallel(root))),
+    )
+    report(
+        "warm cache",
+        ((name, best_of(func, 1, 3) / 1e6) for name, func in walkers),
+        unit="ms",
+    )
+    if os.access("/proc/sys/vm/drop_caches", os.W_OK):
+        report("cold cache", ((name, cold(func)) for name, func in walkers), unit="ms")
+    else:
+        print("cold cache: skipped, requires root")
+
+
+def main():
+    if len(sys.argv) > 1:
+        run(sys.argv[1])
+        return
+    with tempfile.TemporaryDirectory() as tmp:
+        build(tmp)
+        run(tmp)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+shared offloading of blocking work for snakeoil's async apis
+
+Blocking calls are run in a single thread pool shared by every async api; a per
+event loop semaphore bounds how many operations are in flight so a flood of
+awaits can't exhaust the pool, file descriptors, or spawn a process per payload.
+"""
+
+__all__ = ("limit", "offload", "set_async_concurrency")
+
+import os
+import threading
+import weakref
+
+_concurrency = None
+_executor = None
+_lock = threading.Lock()
+_limits = weakref.WeakKeyDictionary()
+
+
+def set_async_concurrency(limit: int) -> None:
+    """Set the maximum number of concurrent blocking operations for async apis
+
+    This is shared by all of snakeoil's async apis, and defaults to what
+    :py:class:`concurrent.futures.ThreadPoolExecutor` picks for its workers.  It
+    affects event loops that have not yet used the async apis; existing in flight
+    operations are unaffected.
+    """
+    global _concurrency, _executor
+    if limit < 1:
+        raise ValueError(f"limit must be positive: {limit!r}")
+    with _lock:
+        _concurrency = limit
+        executor, _executor = _executor, None
+        _limits.clear()
+    if executor is not None:
+        executor.shutdown(wait=False)
+
+
+def _get_concurrency():
+    if _concurrency is None:
+        # same default as ThreadPoolExecutor.
+        return min(32, (os.cpu_count() or 1) + 4)
+    return _concurrency
+
+
+def _get_executor():
+    global _executor
+    with _lock:
+        if _executor is None:
+            from concurrent.futures import ThreadPoolExecutor
+
+            _executor = ThreadPoolExecutor(
+                max_workers=_get_concurrency(), thread_name_prefix="snakeoil-async"
+            )
+        return _executor
+
+
+def limit():
+    """Return the semaphore bounding operations in flight for the running loop"""
+    import asyncio
+
+    loop = asyncio.get_running_loop()
+    if (semaphore := _limits.get(loop)) is None:
+        semaphore = _limits[loop] = asyncio.BoundedSemaphore(_get_concurrency())
+    return semaphore
+
+
+async def offload(func, *args):
+    """Run func in the shared thread pool, returning its result"""
+    import asyncio
+
+    async with limit():
+        return await asyncio.get_running_loop().run_in_executor(
+            _get_executor(), func, *args
+        )
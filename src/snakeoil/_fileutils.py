@@ -7,15 +7,34 @@ Access this functionality from :py:module:`snakeoil.osutils` instead
 __all__ = (
     "mmap_and_close",
     "readlines_iter",
+    "readlines_list",
     "native_readlines",
+    "native_readlines_bulk",
     "native_readfile",
 )
 
 import errno
 import itertools
+import locale
 import mmap
 import os
 
+# files at least this size are decoded straight out of an mmap rather than
+# being copied into a bytes object first.
+_BULK_MMAP_THRESHOLD = 1 << 20
+
+# str.splitlines splits on these in addition to newlines; file iteration doesn't.
+_splitlines_extra_separators = (
+    "\x0b",
+    "\x0c",
+    "\x1c",
+    "\x1d",
+    "\x1e",
+    "\x85",
+    "\u2028",
+    "\u2029",
+)
+
 
 def mmap_and_close(fd, *args, **kwargs):
     """
@@ -98,6 +117,107 @@ def native_readlines(
     return readlines_iter(_strip_whitespace_filter(iterable), mtime, source=handle)
 
 
+class readlines_list(list):
+    """list of lines returned by :py:func:`native_readlines_bulk`, carrying the file mtime"""
+
+    __slots__ = ("mtime",)
+
+    def __init__(self, iterable=(), mtime=None):
+        super().__init__(iterable)
+        self.mtime = mtime
+
+
+def _read_fd(fd: int, size: int) -> bytes:
+    chunks = []
+    # size is only a hint; /proc and /sys files report 0 for example.
+    while chunk := os.read(fd, max(size, mmap.PAGESIZE)):
+        chunks.append(chunk)
+        size = 0
+    return b"".join(chunks)
+
+
+def native_readlines_bulk(
+    mode,
+    mypath,
+    strip_whitespace=True,
+    swallow_missing=False,
+    none_on_missing=False,
+    encoding=None,
+    skip_blanks=False,
+):
+    """Read a file returning a list of its lines, reading and decoding the file in one pass.
+
+    This is the bulk equivalent of :py:func:`native_readlines`; the whole file is read
+    with a single read (or mmap for large files), decoded once, and split in C.  For
+    the small files that are the common case, this avoids the per line cost of
+    iterating a file object.  Line splitting follows the same rules as iterating a
+    file opened with the given mode.
+
+    :param mypath: fs path for the file to read
+    :param strip_whitespace: strip any leading or trailing whitespace including newline?
+    :param swallow_missing: throw an IOError if missing, or swallow it?
+    :param none_on_missing: if the file is missing, return None, else
+        if the file is missing return an empty list
+    :param skip_blanks: if True, lines that are empty after stripping are dropped.
+    :return: :py:class:`readlines_list` of the lines, with the mtime of the file
+    """
+    binary = "b" in mode
+    if not binary and encoding is None:
+        encoding = locale.getpreferredencoding(False)
+    try:
+        fd = os.open(mypath, os.O_RDONLY | os.O_CLOEXEC)
+    except IOError as ie:
+        if not swallow_missing or ie.errno not in (errno.ENOTDIR, errno.ENOENT):
+            raise
+        if none_on_missing:
+            return None
+        return readlines_list()
+
+    try:
+        st = os.fstat(fd)
+        if not binary and st.st_size >= _BULK_MMAP_THRESHOLD:
+            with mmap.mmap(fd, 0, prot=mmap.PROT_READ) as m:
+                data = str(m, encoding)
+        else:
+            data = _read_fd(fd, st.st_size)
+            if not binary:
+                data = data.decode(encoding)
+    finally:
+        os.close(fd)
+
+    if binary:
+        newline = b"\n"
+        # bytes.splitlines also splits on \r, which binary file iteration doesn't.
+        exact_splitlines = b"\r" not in data
+    else:
+        newline = "\n"
+        # universal newlines, as text mode file iteration does.
+        if "\r" in data:
+            data = data.replace("\r\n", newline).replace("\r", newline)
+        exact_splitlines = not any(x in data for x in _splitlines_extra_separators)
+
+    if strip_whitespace:
+        lines = data.split(newline)
+        if not lines[-1]:
+            lines.pop()
+        if skip_blanks:
+            lines = [x for x in (line.strip() for line in lines) if x]
+        else:
+            lines = [line.strip() for line in lines]
+    else:
+        if exact_splitlines:
+            lines = data.splitlines(True)
+        else:
+            lines = [line + newline for line in data.split(newline)]
+            if lines[-1] == newline:
+                lines.pop()
+            else:
+                lines[-1] = lines[-1][:-1]
+        if skip_blanks:
+            lines = [line for line in lines if line.strip()]
+    return readlines_list(lines, st.st_mtime)
+
+
 def _strip_whitespace_filter(iterable):
     for line in iterable:
         yield line.strip()
@@ -12,8 +12,8 @@ from shlex import shlex
 
 from snakeoil._internals import deprecated
 
-from .delayed import regexp
-from .fileutils import readlines
+from .delayed import rebind_globals, regexp
+from .fileutils import readlines_bulk
 from .log import logger
 from .mappings import ProtectedDict
 
@@ -58,7 +58,7 @@ def read_bash(
     :return: yields lines w/ commenting stripped out
     """
     if isinstance(bash_source, str):
-        bash_source = readlines(bash_source, True)
+        bash_source = readlines_bulk(bash_source, True)
     s = ""
     for lineno, line in enumerate(bash_source, 1):
         if allow_line_cont and s:
@@ -338,3 +338,7 @@ class BashParseError(Exception):
                 "error parsing '%s' on or before line %i" % (filename, line)
             )
         self.file, self.line, self.errmsg = filename, line, errmsg
+
+
+# once compiled, the regexps above are looked up directly rather than via proxy.
+rebind_globals(globals())
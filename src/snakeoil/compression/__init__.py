@@ -1,11 +1,50 @@
-import multiprocessing
+__all__ = (
+    "ArComp",
+    "ArCompError",
+    "Capabilities",
+    "Dictionary",
+    "LevelBenchmark",
+    "SeekableBlock",
+    "SeekableReader",
+    "acompress_chunks",
+    "acompress_data",
+    "adecompress_chunks",
+    "adecompress_data",
+    "auto_level",
+    "benchmark",
+    "capabilities",
+    "clear_context_pools",
+    "compress_chunks",
+    "compress_data",
+    "compress_handle",
+    "compress_many",
+    "decompress_chunks",
+    "decompress_data",
+    "decompress_handle",
+    "decompress_many",
+    "pick_level",
+    "set_async_concurrency",
+    "train_dictionary",
+)
+
+import os
 import shlex
-from functools import cached_property
+from functools import cached_property, partial
 from importlib import import_module
 
 from .. import process
+from .._async import set_async_concurrency
 from ..cli.exceptions import UserException
-from ..process.spawn import spawn_get_output
+from . import _util
+from ._dictionary import (
+    Dictionary,
+    compress_many,
+    decompress_many,
+    train_dictionary,
+)
+from ._seekable import SeekableBlock, SeekableReader
+from ._tune import LevelBenchmark, auto_level, benchmark, pick_level
+from ._util import Capabilities, clear_context_pools
 
 
 class _transform_source:
@@ -28,15 +67,58 @@ class _transform_source:
         parallelize = parallelize and self.module.parallelizable
         return self.module.compress_handle(handle, level, parallelize=parallelize)
 
-    def decompress_handle(self, handle, parallelize=False):
+    def decompress_handle(self, handle, parallelize=False, index=None):
         parallelize = parallelize and self.module.parallelizable
-        return self.module.decompress_handle(handle, parallelize=parallelize)
+        return self.module.decompress_handle(
+            handle, parallelize=parallelize, index=index
+        )
 
+    def compress_chunks(self, chunks, level, parallelize=False, **kwds):
+        parallelize = parallelize and self.module.parallelizable
+        return self.module.compress_chunks(
+            chunks, level, parallelize=parallelize, **kwds
+        )
+
+    def decompress_chunks(self, chunks, parallelize=False):
+        parallelize = parallelize and self.module.parallelizable
+        return self.module.decompress_chunks(chunks, parallelize=parallelize)
+
+    async def acompress_data(self, data, level, parallelize=False):
+        parallelize = parallelize and self.module.parallelizable
+        return await self.module.acompress_data(data, level, parallelize=parallelize)
 
-_transforms = {name: _transform_source(name) for name in ("bzip2", "xz")}
+    async def adecompress_data(self, data, parallelize=False):
+        parallelize = parallelize and self.module.parallelizable
+        return await self.module.adecompress_data(data, parallelize=parallelize)
+
+    def acompress_chunks(self, chunks, level, parallelize=False):
+        parallelize = parallelize and self.module.parallelizable
+        return self.module.acompress_chunks(chunks, level, parallelize=parallelize)
+
+    def adecompress_chunks(self, chunks, parallelize=False):
+        parallelize = parallelize and self.module.parallelizable
+        return self.module.adecompress_chunks(chunks, parallelize=parallelize)
+
+
+_transforms = {
+    name: _transform_source(name) for name in ("bzip2", "gzip", "xz", "zstd")
+}
+
+
+_auto_level_kwds = frozenset(
+    ("data_class", "min_ratio", "min_compress_mbps", "min_decompress_mbps")
+)
 
 
 def compress_data(compressor_type, data, level=9, **kwds):
+    """Compress data.
+
+    :param level: the compression level, or "auto" to use :func:`auto_level`;
+        its data_class and target keyword arguments are accepted in that case.
+    """
+    if level == "auto":
+        auto_kwds = {k: kwds.pop(k) for k in _auto_level_kwds.intersection(kwds)}
+        level = auto_level(compressor_type, data, **auto_kwds)
     return _transforms[compressor_type].compress_data(data, level, **kwds)
 
 
@@ -49,9 +131,80 @@ def compress_handle(compressor_type, handle, level=9, **kwds):
 
 
 def decompress_handle(compressor_type, source, **kwds):
+    """Return a file object decompressing source.
+
+    :param index: if given, the (compressed offset, uncompressed offset) pairs
+        recorded by :func:`compress_chunks` for a checkpointed source.  When
+        source is a path, seeks then decompress from the closest stream rather
+        than the start of the file.
+    """
     return _transforms[compressor_type].decompress_handle(source, **kwds)
 
 
+def compress_chunks(compressor_type, chunks, level=9, **kwds):
+    """Compress an iterable of bytes chunks, returning an iterator of compressed chunks.
+
+    Memory usage is bounded regardless of the size of the data.
+
+    :param checkpoint: if given, start a new independently decompressible stream
+        every checkpoint bytes of input.  This requires the native module.
+    :param index: if given, a list that (compressed offset, uncompressed offset)
+        pairs are appended to for each stream.  This requires the native module.
+    """
+    return _transforms[compressor_type].compress_chunks(chunks, level, **kwds)
+
+
+def decompress_chunks(compressor_type, chunks, **kwds):
+    """Decompress an iterable of bytes chunks, returning an iterator of chunks."""
+    return _transforms[compressor_type].decompress_chunks(chunks, **kwds)
+
+
+def capabilities():
+    """Report what each compressor supports in this environment.
+
+    Nothing is probed for on import; this looks up every compressor's binaries,
+    which are then cached.
+
+    :return: dict mapping compressor type to :class:`Capabilities`.
+    """
+    return {
+        name: transform.module.capabilities() for name, transform in _transforms.items()
+    }
+
+
+async def acompress_data(compressor_type, data, level=9, **kwds):
+    """Async version of :func:`compress_data`.
+
+    Native compression is offloaded to a shared thread pool, while external
+    binaries are run as asyncio subprocesses.  The number of operations in
+    flight per event loop is bounded; see :func:`set_async_concurrency`.
+    """
+    if level == "auto":
+        auto_kwds = {k: kwds.pop(k) for k in _auto_level_kwds.intersection(kwds)}
+        level = await _util.offload(
+            partial(auto_level, compressor_type, data, **auto_kwds)
+        )
+    return await _transforms[compressor_type].acompress_data(data, level, **kwds)
+
+
+async def adecompress_data(compressor_type, data, **kwds):
+    """Async version of :func:`decompress_data`."""
+    return await _transforms[compressor_type].adecompress_data(data, **kwds)
+
+
+def acompress_chunks(compressor_type, chunks, level=9, **kwds):
+    """Compress an iterable or async iterable of bytes chunks, returning an async iterator.
+
+    Unlike :func:`compress_chunks`, checkpoints aren't supported.
+    """
+    return _transforms[compressor_type].acompress_chunks(chunks, level, **kwds)
+
+
+def adecompress_chunks(compressor_type, chunks, **kwds):
+    """Decompress an iterable or async iterable of bytes chunks, returning an async iterator."""
+    return _transforms[compressor_type].adecompress_chunks(chunks, **kwds)
+
+
 class ArCompError(UserException):
     """Generic archive and compressed file error."""
 
@@ -84,6 +237,7 @@ class ArComp:
 
     def __init__(self, path, ext=None):
         self.path = path
+        self.ext = ext
 
     @cached_property
     def _unpack_cmd(self):
@@ -109,6 +263,9 @@ class _Archive:
     """Generic archive format support."""
 
     def unpack(self, dest=None, **kwargs):
+        # importing spawn looks up binaries; don't pay that until unpacking.
+        from ..process.spawn import spawn_get_output
+
         cmd = shlex.split(self._unpack_cmd.format(path=self.path))
         ret, output = spawn_get_output(cmd, collect_fds=(2,), **kwargs)
         if ret:
@@ -116,10 +273,72 @@ class _Archive:
             raise ArCompError(msg, code=ret)
 
 
+class _NativeArchive(_Archive):
+    """Archive format supporting in process extraction.
+
+    In process extraction is opt in via ``native=True``; its safety filters
+    reject archives that the external binaries unpack.  The binaries are still
+    used when the format or an archive extension lacks in process support, or
+    when spawn related keyword arguments are given.
+    """
+
+    native_exts = frozenset()
+
+    def _native_extract(self, dest, **kwargs):
+        raise NotImplementedError
+
+    def unpack(
+        self,
+        dest=None,
+        *,
+        native=False,
+        filter="data",
+        workers=None,
+        progress=None,
+        **kwargs,
+    ):
+        """Unpack the archive into the current directory, or the cwd keyword if given.
+
+        :param native: if true, extract in process where supported rather than
+            via the external binaries.
+        :param filter: safety filter for in process extraction; one of the
+            :mod:`tarfile` extraction filter names, "data" by default.
+        :param workers: if greater than 1, extract members via a thread pool.
+        :param progress: if given, called with the name and size of each
+            member once it has been extracted in process.
+        """
+        if not native:
+            return super().unpack(dest, **kwargs)
+        import tarfile
+        import zipfile
+
+        if (
+            self.ext in self.native_exts
+            and kwargs.keys() <= {"cwd"}
+            # extraction filters are available from 3.11.4 onwards.
+            and hasattr(tarfile, "data_filter")
+        ):
+            try:
+                return self._native_extract(
+                    kwargs.get("cwd") or os.getcwd(),
+                    filter=filter,
+                    workers=workers,
+                    progress=progress,
+                )
+            except (ImportError, process.CommandNotFound):
+                # compression support is missing; fall back to the binaries.
+                pass
+            except (OSError, ValueError, tarfile.TarError, zipfile.BadZipFile) as e:
+                raise ArCompError(f"unpacking failed: {self.path!r}: {e}")
+        return super().unpack(dest, **kwargs)
+
+
 class _CompressedFile:
     """Single compressed file."""
 
     def unpack(self, dest=None, **kwargs):
+        from ..process.spawn import spawn_get_output
+
         cmd = shlex.split(self._unpack_cmd.format(path=self.path))
         with open(dest, "wb") as f:
             ret, output = spawn_get_output(
@@ -134,6 +353,8 @@ class _CompressedStdin:
     """Compressed data from stdin."""
 
     def unpack(self, dest=None, **kwargs):
+        from ..process.spawn import spawn_get_output
+
         cmd = shlex.split(self._unpack_cmd)
         with open(self.path, "rb") as src, open(dest, "wb") as f:
             ret, output = spawn_get_output(
@@ -147,8 +368,10 @@ class _CompressedStdin:
             raise ArCompError(msg, code=ret)
 
 
-class _Tar(_Archive, ArComp):
+class _Tar(_NativeArchive, ArComp):
     exts = frozenset([".tar"])
+    native_exts = exts
+    compressor_type = None
     binary = (
         "gtar",
         "tar",
@@ -175,32 +398,65 @@ class _Tar(_Archive, ArComp):
                 )
         return cmd
 
+    def _native_extract(self, dest, **kwargs):
+        from ._extract import extract_tar
+
+        if self.compressor_type is None:
+            handle = open(self.path, "rb")
+        else:
+            handle = decompress_handle(self.compressor_type, self.path)
+        try:
+            extract_tar(handle, dest, **kwargs)
+        finally:
+            handle.close()
+
 
 class _TarGZ(_Tar):
     exts = frozenset([".tar.gz", ".tgz", ".tar.Z", ".tar.z"])
+    # compress(1) and pack(1) formats require the binaries.
+    native_exts = frozenset([".tar.gz", ".tgz"])
+    compressor_type = "gzip"
     compress_binary = (("pigz",), ("gzip",))
 
 
 class _TarBZ2(_Tar):
     exts = frozenset([".tar.bz2", ".tbz2", ".tbz"])
+    native_exts = exts
+    compressor_type = "bzip2"
     compress_binary = (("lbzip2",), ("pbzip2",), ("bzip2",))
 
 
 class _TarLZMA(_Tar):
     exts = frozenset([".tar.lzma"])
+    native_exts = frozenset()
     compress_binary = ("lzma",)
 
 
 class _TarXZ(_Tar):
     exts = frozenset([".tar.xz", ".txz"])
-    compress_binary = (("pixz",), ("xz", f"-T{multiprocessing.cpu_count()}"))
+    native_exts = exts
+    compressor_type = "xz"
+    compress_binary = (("pixz",), ("xz", "-T0"))
 
 
-class _Zip(_Archive, ArComp):
+class _TarZST(_Tar):
+    exts = frozenset([".tar.zst", ".tzst"])
+    native_exts = exts
+    compressor_type = "zstd"
+    compress_binary = (("zstd", "-T0"),)
+
+
+class _Zip(_NativeArchive, ArComp):
     exts = frozenset([".ZIP", ".zip", ".jar"])
+    native_exts = exts
     binary = ("unzip",)
     default_unpack_cmd = '{binary} -qo "{path}"'
 
+    def _native_extract(self, dest, **kwargs):
+        from ._extract import extract_zip
+
+        extract_zip(self.path, dest, **kwargs)
+
 
 class _GZ(_CompressedStdin, ArComp):
     exts = frozenset([".gz", ".Z", ".z"])
@@ -220,6 +476,12 @@ class _XZ(_CompressedStdin, ArComp):
     default_unpack_cmd = "{binary} -d -c"
 
 
+class _ZST(_CompressedStdin, ArComp):
+    exts = frozenset([".zst"])
+    binary = ("zstd",)
+    default_unpack_cmd = "{binary} -d -c"
+
+
 class _7Z(_Archive, ArComp):
     exts = frozenset([".7Z", ".7z"])
     binary = ("7z",)
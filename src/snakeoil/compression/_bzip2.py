@@ -6,25 +6,29 @@ it defers to executing bzip2 with tempfile arguments to do decompression
 and compression.
 
 Use this module unless it's absolutely critical that the bz2 module is used.
+
+Parallel compression and decompression is done in process via a thread pool if
+the bz2 module is available, splitting the data into independent streams;
+lbzip2 is used otherwise.
 """
 
 __all__ = ("compress_data", "decompress_data")
 
 import multiprocessing
+import re
 from functools import partial
 
-from .. import process
 from ..compression import _util
 
 # Unused import
 # pylint: disable=W0611
 
-# if Bzip2 can't be found, throw an error.
-bz2_path = process.find_binary("bzip2")
-
+# binaries are looked up on first use, rather than scanning PATH at import.
+bzip2_binary = _util.lazy_binary("bzip2")
+lbzip2_binary = _util.lazy_binary("lbzip2")
 
 try:
-    from bz2 import BZ2File
+    from bz2 import BZ2Compressor, BZ2Decompressor, BZ2File
     from bz2 import compress as _compress_data
     from bz2 import decompress as _decompress_data
 
@@ -34,54 +38,182 @@ except ImportError:
     # (and some code needs to be able to check that).
     native = False
 
-    _compress_data = partial(_util.compress_data, bz2_path)
-    _decompress_data = partial(_util.decompress_data, bz2_path)
+    def _compress_data(data, compresslevel=9):
+        return _util.compress_data(bzip2_binary.require(), data, compresslevel)
 
-_compress_handle = partial(_util.compress_handle, bz2_path)
-_decompress_handle = partial(_util.decompress_handle, bz2_path)
+    def _decompress_data(data):
+        return _util.decompress_data(bzip2_binary.require(), data)
 
-try:
-    lbzip2_path = process.find_binary("lbzip2")
-    lbzip2_compress_args = (f"-n{multiprocessing.cpu_count()}",)
-    lbzip2_decompress_args = lbzip2_compress_args
-    parallelizable = True
-except process.CommandNotFound:
-    lbzip2_path = None
-    parallelizable = False
-    lbzip2_compress_args = lbzip2_decompress_args = ()
+
+def _compress_handle(handle, compresslevel=9):
+    return _util.compress_handle(bzip2_binary.require(), handle, compresslevel)
+
+
+def _decompress_handle(handle, index=None):
+    return _util.decompress_handle(bzip2_binary.require(), handle, index=index)
+
+
+def _lbzip2_args():
+    return (f"-n{multiprocessing.cpu_count()}",)
+
+
+def _parallelizable():
+    return native or lbzip2_binary.path is not None
+
+
+def __getattr__(name):
+    # these used to be determined at import; they're now computed on access.
+    if name == "parallelizable":
+        return _parallelizable()
+    elif name == "bz2_path":
+        return bzip2_binary.path
+    elif name == "lbzip2_path":
+        return lbzip2_binary.path
+    elif name in ("lbzip2_compress_args", "lbzip2_decompress_args"):
+        return _lbzip2_args() if lbzip2_binary.path is not None else ()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# the supported compression levels, fastest first.
+levels = range(1, 10)
+
+# the start of a stream, immediately followed by its first block.
+_stream_header = re.compile(rb"BZh[1-9]1AY&SY")
+
+
+def _block_size(level):
+    # a stream per bzip2 block, so splitting doesn't cost any compression ratio.
+    return level * 100_000
+
+
+def capabilities():
+    return _util.Capabilities(
+        native, bzip2_binary.path, lbzip2_binary.path, _parallelizable()
+    )
+
+
+def _small_level(level, size):
+    """Return the lowest level whose block size fits size bytes, up to level.
+
+    Output is identical beyond the stream header, but compression and
+    decompression set up less memory; for small data that setup dominates.
+    """
+    # the initial run length encoding can expand data by up to a quarter, and
+    # blocks hold slightly less than a multiple of 100k.
+    return min(level, (size * 5 // 4 + 19) // 100_000 + 1)
 
 
 def compress_data(data, level=9, parallelize=False):
-    if parallelize and parallelizable:
+    if parallelize and native:
+        return _util.parallel_compress_data(
+            partial(_compress_data, compresslevel=level), data, _block_size(level)
+        )
+    elif parallelize and _parallelizable():
         return _util.compress_data(
-            lbzip2_path, data, compresslevel=level, extra_args=lbzip2_compress_args
+            lbzip2_binary.path, data, compresslevel=level, extra_args=_lbzip2_args()
         )
+    elif native:
+        return _compress_data(data, compresslevel=_small_level(level, len(data)))
     return _compress_data(data, compresslevel=level)
 
 
 def decompress_data(data, parallelize=False):
-    if parallelize and parallelizable:
+    if parallelize and native:
+        offsets = [m.start() for m in _stream_header.finditer(data)]
+        return _util.parallel_decompress_data(_decompress_data, data, offsets)
+    elif parallelize and _parallelizable():
         return _util.decompress_data(
-            lbzip2_path, data, extra_args=lbzip2_decompress_args
+            lbzip2_binary.path, data, extra_args=_lbzip2_args()
         )
     return _decompress_data(data)
 
 
 def compress_handle(handle, level=9, parallelize=False):
-    if parallelize and parallelizable:
+    if parallelize and native:
+        return _util.parallel_compress_handle(
+            handle, partial(_compress_data, compresslevel=level), _block_size(level)
+        )
+    elif parallelize and _parallelizable():
         return _util.compress_handle(
-            lbzip2_path, handle, compresslevel=level, extra_args=lbzip2_compress_args
+            lbzip2_binary.path, handle, compresslevel=level, extra_args=_lbzip2_args()
         )
     elif native and isinstance(handle, str):
         return BZ2File(handle, mode="w", compresslevel=level)
     return _compress_handle(handle, compresslevel=level)
 
 
-def decompress_handle(handle, parallelize=False):
-    if parallelize and parallelizable:
+def decompress_handle(handle, parallelize=False, index=None):
+    if index is not None and native and isinstance(handle, str):
+        return _util.seekable_handle("bzip2", handle, index)
+    elif parallelize and lbzip2_binary.path is not None:
         return _util.decompress_handle(
-            lbzip2_path, handle, extra_args=lbzip2_decompress_args
+            lbzip2_binary.path, handle, extra_args=_lbzip2_args(), index=index
         )
     elif native and isinstance(handle, str):
         return BZ2File(handle, mode="r")
-    return _decompress_handle(handle)
+    return _decompress_handle(handle, index)
+
+
+def compress_chunks(chunks, level=9, parallelize=False, checkpoint=None, index=None):
+    if native and parallelize:
+        return _util.parallel_compress_chunks(
+            partial(_compress_data, compresslevel=level),
+            chunks,
+            checkpoint or _block_size(level),
+            index=index,
+        )
+    elif native:
+        return _util.native_compress_chunks(
+            partial(BZ2Compressor, level), chunks, checkpoint, index
+        )
+    elif parallelize and _parallelizable():
+        return _util.compress_chunks(
+            lbzip2_binary.path, chunks, level, _lbzip2_args(), checkpoint, index
+        )
+    return _util.compress_chunks(
+        bzip2_binary.require(), chunks, level, (), checkpoint, index
+    )
+
+
+def decompress_chunks(chunks, parallelize=False):
+    if parallelize and lbzip2_binary.path is not None:
+        return _util.decompress_chunks(lbzip2_binary.path, chunks, _lbzip2_args())
+    elif native:
+        return _util.native_decompress_chunks(BZ2Decompressor, chunks)
+    return _util.decompress_chunks(bzip2_binary.require(), chunks)
+
+
+async def acompress_data(data, level=9, parallelize=False):
+    if native:
+        return await _util.offload(compress_data, data, level, parallelize)
+    elif parallelize and _parallelizable():
+        return await _util.acompress_data(
+            lbzip2_binary.path, data, compresslevel=level, extra_args=_lbzip2_args()
+        )
+    return await _util.acompress_data(bzip2_binary.require(), data, compresslevel=level)
+
+
+async def adecompress_data(data, parallelize=False):
+    if native:
+        return await _util.offload(decompress_data, data, parallelize)
+    elif parallelize and _parallelizable():
+        return await _util.adecompress_data(
+            lbzip2_binary.path, data, extra_args=_lbzip2_args()
+        )
+    return await _util.adecompress_data(bzip2_binary.require(), data)
+
+
+def acompress_chunks(chunks, level=9, parallelize=False):
+    if native:
+        return _util.anative_compress_chunks(partial(BZ2Compressor, level), chunks)
+    elif parallelize and _parallelizable():
+        return _util.acompress_chunks(lbzip2_binary.path, chunks, level, _lbzip2_args())
+    return _util.acompress_chunks(bzip2_binary.require(), chunks, level)
+
+
+def adecompress_chunks(chunks, parallelize=False):
+    if parallelize and lbzip2_binary.path is not None:
+        return _util.adecompress_chunks(lbzip2_binary.path, chunks, _lbzip2_args())
+    elif native:
+        return _util.anative_decompress_chunks(BZ2Decompressor, chunks)
+    return _util.adecompress_chunks(bzip2_binary.require(), chunks)
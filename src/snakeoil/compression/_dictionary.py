@@ -0,0 +1,241 @@
+"""
+dictionary compression of many small payloads
+
+Small payloads compress poorly on their own; there's too little data for the
+compressor to find repetition in.  A dictionary trained on similar payloads
+primes the compressor with the content they have in common.
+
+zstd dictionaries are used where a native zstd module is available.  Python's
+lzma module doesn't expose preset dictionaries, so the fallback is zlib, whose
+preset dictionaries (``zdict``) are raw content.
+"""
+
+__all__ = ("Dictionary", "compress_many", "decompress_many", "train_dictionary")
+
+import zlib
+from collections import Counter
+
+# the magic number starting zstd's trained dictionaries; anything else is raw
+# content.
+_zstd_dict_magic = b"\x37\xa4\x30\xec"
+# zlib can only reference the last 32KiB of data, the dictionary included.
+_zlib_max_size = 32 << 10
+_default_size = 110 << 10
+# the length of the substrings training scores samples by.
+_shingle = 8
+
+
+def _native_zstd():
+    """Return the native zstd backend module, or None if it's unavailable."""
+    from . import _zstd
+
+    return _zstd if _zstd.native else None
+
+
+def _default_type():
+    return "zstd" if _native_zstd() is not None else "zlib"
+
+
+def _zstd_module():
+    if (module := _native_zstd()) is None:
+        raise ValueError("zstd dictionaries require a native zstd module")
+    return module
+
+
+class Dictionary:
+    """A compression dictionary.
+
+    ``bytes(dictionary)`` is its serialized form; pass that back in to recreate it.
+    """
+
+    __slots__ = ("compressor_type", "data", "_native")
+
+    def __init__(self, compressor_type, data):
+        if compressor_type not in ("zstd", "zlib"):
+            raise ValueError(f"unsupported dictionary type: {compressor_type!r}")
+        self.compressor_type = compressor_type
+        self.data = bytes(data)
+        self._native = None
+
+    def __bytes__(self):
+        return self.data
+
+    def __len__(self):
+        return len(self.data)
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__} {self.compressor_type} {len(self)} bytes>"
+
+    @property
+    def native(self):
+        """The zstd module's dictionary object, created once and reused."""
+        if self._native is None:
+            module = _zstd_module()
+            raw = not self.data.startswith(_zstd_dict_magic)
+            if module._zstd is not None:
+                self._native = module._zstd.ZstdDict(self.data, is_raw=raw)
+            else:
+                zstandard = module.zstandard
+                self._native = zstandard.ZstdCompressionDict(
+                    self.data,
+                    dict_type=(
+                        zstandard.DICT_TYPE_RAWCONTENT
+                        if raw
+                        else zstandard.DICT_TYPE_FULLDICT
+                    ),
+                )
+        return self._native
+
+
+def _raw_content(samples, size):
+    """Build a raw content dictionary from the most representative samples.
+
+    Samples are scored by how common their substrings are across all samples,
+    and the best are packed in with the best last- since matches closer to the
+    data are cheaper to encode.
+    """
+    samples = list(dict.fromkeys(x for x in samples if x))
+    counts = Counter()
+    for sample in samples:
+        counts.update(
+            {sample[x : x + _shingle] for x in range(0, len(sample), _shingle // 2)}
+        )
+
+    def score(sample):
+        shingles = range(0, len(sample), _shingle // 2)
+        return sum(counts[sample[x : x + _shingle]] for x in shingles) / len(sample)
+
+    chosen = []
+    remaining = size
+    for sample in sorted(samples, key=score, reverse=True):
+        if len(sample) > remaining:
+            continue
+        chosen.append(sample)
+        if (remaining := remaining - len(sample)) < _shingle:
+            break
+    return b"".join(reversed(chosen))
+
+
+def train_dictionary(samples, size=None, compressor_type=None):
+    """Train a compression dictionary from samples of the payloads to compress.
+
+    :param samples: iterable of bytes payloads.
+    :param size: the maximum dictionary size.  Defaults to 110KiB for zstd, and
+        32KiB for zlib- the most it can use.
+    :param compressor_type: "zstd" or "zlib"; defaults to zstd if a native zstd
+        module is available.
+    :return: :class:`Dictionary` instance.
+    """
+    if compressor_type is None:
+        compressor_type = _default_type()
+    samples = [bytes(x) for x in samples]
+    if compressor_type == "zlib":
+        size = _zlib_max_size if size is None else min(size, _zlib_max_size)
+        return Dictionary("zlib", _raw_content(samples, size))
+    if compressor_type != "zstd":
+        raise ValueError(f"unsupported dictionary type: {compressor_type!r}")
+
+    module = _zstd_module()
+    size = _default_size if size is None else size
+    try:
+        if module._zstd is not None:
+            data = module._zstd.train_dict(samples, size).dict_content
+        else:
+            data = module.zstandard.train_dictionary(size, samples).as_bytes()
+    except (module._zstd or module.zstandard).ZstdError:
+        # training needs a reasonable number of samples; too few and it fails
+        # outright.  zstd handles raw content dictionaries just as well.
+        data = _raw_content(samples, size)
+    return Dictionary("zstd", data)
+
+
+def _zstd_compressor(level, dictionary):
+    module = _zstd_module()
+    native = dictionary.native if dictionary is not None else None
+    if module._zstd is not None:
+        compressor = module._zstd.ZstdCompressor(level, zstd_dict=native)
+        return lambda data: compressor.compress(data, compressor.FLUSH_FRAME)
+    return module.zstandard.ZstdCompressor(level=level, dict_data=native).compress
+
+
+def _zstd_decompressor(dictionary):
+    module = _zstd_module()
+    native = dictionary.native if dictionary is not None else None
+    if module._zstd is not None:
+        # ZstdDecompressor instances are single use; the dictionary is digested
+        # once and reused regardless.
+        return lambda data: module._zstd.decompress(data, zstd_dict=native)
+    return module.zstandard.ZstdDecompressor(dict_data=native).decompress
+
+
+def _zlib_compressor(level, dictionary):
+    if dictionary is None:
+        primed = zlib.compressobj(level)
+    else:
+        primed = zlib.compressobj(level, zdict=dictionary.data)
+
+    def compress(data):
+        # copying a primed compressor skips reprocessing the dictionary.
+        compressor = primed.copy()
+        return compressor.compress(data) + compressor.flush()
+
+    return compress
+
+
+def _zlib_decompressor(dictionary):
+    kwargs = {} if dictionary is None else {"zdict": dictionary.data}
+
+    def decompress(data):
+        decompressor = zlib.decompressobj(**kwargs)
+        result = decompressor.decompress(data)
+        if not decompressor.eof:
+            raise zlib.error("incomplete or truncated stream")
+        return result
+
+    return decompress
+
+
+def _resolve_type(dictionary, compressor_type):
+    if dictionary is not None:
+        if compressor_type not in (None, dictionary.compressor_type):
+            raise ValueError(
+                f"{dictionary.compressor_type} dictionary can't be used with "
+                f"{compressor_type!r}"
+            )
+        return dictionary.compressor_type
+    if compressor_type is None:
+        return _default_type()
+    if compressor_type not in ("zstd", "zlib"):
+        raise ValueError(f"unsupported compressor type: {compressor_type!r}")
+    return compressor_type
+
+
+def compress_many(payloads, dictionary=None, level=3, compressor_type=None):
+    """Compress each of many payloads independently, reusing one compressor.
+
+    :param payloads: iterable of bytes payloads.
+    :param dictionary: :class:`Dictionary` to compress with, if any.
+    :param compressor_type: "zstd" or "zlib"; defaults to the dictionary's type,
+        else zstd if a native zstd module is available.
+    :return: list of compressed payloads; each is decompressible on its own given
+        the same dictionary.
+    """
+    compressor_type = _resolve_type(dictionary, compressor_type)
+    if compressor_type == "zstd":
+        compress = _zstd_compressor(level, dictionary)
+    else:
+        compress = _zlib_compressor(level, dictionary)
+    return [compress(x) for x in payloads]
+
+
+def decompress_many(payloads, dictionary=None, compressor_type=None):
+    """Decompress payloads produced by :func:`compress_many`.
+
+    The dictionary and compressor type must be those they were compressed with.
+    """
+    compressor_type = _resolve_type(dictionary, compressor_type)
+    if compressor_type == "zstd":
+        decompress = _zstd_decompressor(dictionary)
+    else:
+        decompress = _zlib_decompressor(dictionary)
+    return [decompress(x) for x in payloads]
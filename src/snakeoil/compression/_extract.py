@@ -0,0 +1,254 @@
+"""
+in process tar and zip extraction
+
+Member data is read sequentially from the archive, while the writing of regular
+files- along with setting their permissions and timestamps- can be spread over a
+thread pool.
+"""
+
+__all__ = ("extract_tar", "extract_zip")
+
+import os
+import shutil
+import stat
+import tarfile
+import zipfile
+from collections import deque
+from operator import attrgetter
+
+# regular files larger than this are streamed to disk from the reading thread
+# rather than being buffered in memory for a worker.
+_max_buffered_file = 16 << 20
+# the maximum amount of buffered file data awaiting a worker.
+_max_pending = 64 << 20
+
+_filters = ("data", "tar", "fully_trusted")
+
+
+class _Writer:
+    """Run member writes inline, or on a thread pool with bounded buffering.
+
+    Progress is reported from the calling thread, in archive order.
+    """
+
+    def __init__(self, workers, progress):
+        self._progress = progress
+        self._pending = deque()
+        self._pending_bytes = 0
+        self._pool = None
+        if workers is not None and workers > 1:
+            from concurrent.futures import ThreadPoolExecutor
+
+            self._pool = ThreadPoolExecutor(workers)
+            self._max_count = workers * 4
+
+    @property
+    def parallel(self):
+        return self._pool is not None
+
+    def report(self, name, size):
+        if self._progress is None:
+            return
+        if self._pending:
+            # keep archive order; reported once the writes before it finish.
+            self._pending.append((name, 0, None))
+        else:
+            self._progress(name, size)
+
+    def run(self, name, size, func, *args):
+        """Run func in the calling thread, after any pending writes."""
+        self.wait()
+        func(*args)
+        self._report(name, size)
+
+    def _report(self, name, size):
+        if self._progress is not None:
+            self._progress(name, size)
+
+    def submit(self, name, size, func, *args):
+        if self._pool is None:
+            return self.run(name, size, func, *args)
+        self._pending.append((name, size, self._pool.submit(func, *args)))
+        self._pending_bytes += size
+        while self._pending and (
+            self._pending_bytes > _max_pending or len(self._pending) > self._max_count
+        ):
+            self._finish_one()
+
+    def _finish_one(self):
+        name, size, future = self._pending.popleft()
+        self._pending_bytes -= size
+        if future is not None:
+            future.result()
+        self._report(name, size)
+
+    def wait(self):
+        while self._pending:
+            self._finish_one()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if exc_type is None:
+                self.wait()
+        finally:
+            if self._pool is not None:
+                self._pool.shutdown(cancel_futures=True)
+
+
+def _tar_filter(name):
+    if name not in _filters:
+        raise ValueError(f"unknown filter: {name!r}")
+    return getattr(tarfile, f"{name}_filter")
+
+
+def _remove_existing(path):
+    # never write through an existing symlink; this is what tar(1) does too.
+    try:
+        os.unlink(path)
+    except (FileNotFoundError, IsADirectoryError, PermissionError):
+        pass
+
+
+def _write_tar_member(tar, member, path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    _remove_existing(path)
+    with open(path, "wb") as f:
+        if isinstance(data, bytes):
+            f.write(data)
+        else:
+            shutil.copyfileobj(data, f, 1 << 20)
+    tar.chown(member, path, False)
+    tar.chmod(member, path)
+    tar.utime(member, path)
+
+
+def extract_tar(fileobj, dest, filter="data", workers=None, progress=None):
+    """Extract an uncompressed tar stream into dest.
+
+    :param fileobj: file object of the tar data; only read sequentially.
+    :param filter: one of the :mod:`tarfile` extraction filter names; "data" by
+        default, which rejects members that would end up outside of dest along
+        with links to outside of it, and device files.
+    :param workers: if greater than 1, write regular files via a thread pool.
+    :param progress: if given, called with the name and size of each member
+        once it has been extracted.
+    """
+    member_filter = _tar_filter(filter)
+    dest = os.path.realpath(dest)
+    directories = []
+    with (
+        tarfile.open(fileobj=fileobj, mode="r|") as tar,
+        _Writer(workers, progress) as writer,
+    ):
+        for member in tar:
+            if (member := member_filter(member, dest)) is None:
+                continue
+            path = os.path.join(dest, member.name)
+            if member.isreg():
+                data = tar.extractfile(member)
+                args = (member.name, member.size, _write_tar_member, tar, member, path)
+                if writer.parallel and member.size <= _max_buffered_file:
+                    writer.submit(*args, data.read())
+                else:
+                    writer.run(*args, data)
+                continue
+            if member.islnk():
+                # the link target may still be pending.
+                writer.wait()
+            if member.isdir():
+                directories.append(member)
+            tar.extract(
+                member, dest, set_attrs=not member.isdir(), filter="fully_trusted"
+            )
+            writer.report(member.name, member.size)
+        writer.wait()
+        # like TarFile.extractall, directory attributes are set last so read only
+        # directories don't block extraction into them.
+        for member in sorted(directories, key=attrgetter("name"), reverse=True):
+            path = os.path.join(dest, member.name)
+            tar.chown(member, path, False)
+            tar.utime(member, path)
+            tar.chmod(member, path)
+
+
+def _zip_mode(mode, filter):
+    if filter == "fully_trusted":
+        return stat.S_IMODE(mode)
+    # as tarfile's data and tar filters do.
+    return stat.S_IMODE(mode) & ~(
+        stat.S_ISUID | stat.S_ISGID | stat.S_ISVTX | stat.S_IWGRP | stat.S_IWOTH
+    )
+
+
+def _zip_member_path(info, dest):
+    # the sanitization zipfile.ZipFile.extract applies to member names.
+    parts = os.path.splitdrive(info.filename.replace("/", os.path.sep))[1]
+    parts = (x for x in parts.split(os.path.sep) if x not in ("", os.curdir, os.pardir))
+    return os.path.normpath(os.path.join(dest, *parts))
+
+
+def _write_zip_member(zf, info, path, mode):
+    _remove_existing(path)
+    with zf.open(info) as source, open(path, "wb") as f:
+        shutil.copyfileobj(source, f, 1 << 20)
+    if mode:
+        os.chmod(path, mode)
+
+
+def _zip_symlink(zf, info, dest, filter):
+    path = os.path.join(dest, *info.filename.split("/"))
+    if os.path.isabs(info.filename) or ".." in info.filename.split("/"):
+        raise ValueError(f"{info.filename!r}: unsafe path")
+    target = zf.read(info).decode()
+    if filter != "fully_trusted":
+        resolved = os.path.realpath(os.path.join(os.path.dirname(path), target))
+        if os.path.commonpath((resolved, dest)) != dest:
+            raise ValueError(f"{info.filename!r}: link to {target!r} leaves {dest!r}")
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    _remove_existing(path)
+    os.symlink(target, path)
+
+
+def extract_zip(path, dest, filter="data", workers=None, progress=None):
+    """Extract a zip file into dest.
+
+    Member names are sanitized as :meth:`zipfile.ZipFile.extract` does.  Unix
+    permissions and symlinks are restored, as unzip(1) does.
+
+    :param filter: as for :func:`extract_tar`; unless "fully_trusted", setuid,
+        setgid, sticky and group/other write permissions are dropped, and symlinks
+        to outside of dest are rejected.
+    :param workers: if greater than 1, decompress and write members via a thread
+        pool.
+    :param progress: if given, called with the name and size of each member
+        once it has been extracted.
+    """
+    if filter not in _filters:
+        raise ValueError(f"unknown filter: {filter!r}")
+    dest = os.path.realpath(dest)
+    with zipfile.ZipFile(path) as zf, _Writer(workers, progress) as writer:
+        for info in zf.infolist():
+            mode = info.external_attr >> 16
+            if stat.S_ISLNK(mode):
+                writer.wait()
+                _zip_symlink(zf, info, dest, filter)
+                writer.report(info.filename, info.file_size)
+            elif info.is_dir():
+                zf.extract(info, dest)
+                writer.report(info.filename, 0)
+            else:
+                target = _zip_member_path(info, dest)
+                # created here, as workers creating the same parents would race.
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                writer.submit(
+                    info.filename,
+                    info.file_size,
+                    _write_zip_member,
+                    zf,
+                    info,
+                    target,
+                    _zip_mode(mode, filter),
+                )
@@ -0,0 +1,174 @@
+"""
+gzip decompression/compression
+
+Where possible, this module defers to cpython's gzip and zlib modules- if they're
+not available, it defers to executing gzip to do decompression and compression.
+
+Parallel compression and decompression use pigz if it's available.
+"""
+
+__all__ = ("compress_data", "decompress_data")
+
+import multiprocessing
+from functools import partial
+
+from ..compression import _util
+
+# Unused import
+# pylint: disable=W0611
+
+# binaries are looked up on first use, rather than scanning PATH at import.
+gzip_binary = _util.lazy_binary("gzip")
+pigz_binary = _util.lazy_binary("pigz")
+
+try:
+    import zlib
+    from gzip import GzipFile
+    from gzip import compress as _compress_data
+    from gzip import decompress as _decompress_data
+
+    native = True
+except ImportError:
+    # without the gzip module, the gzip binary is required once used.
+    native = False
+
+    def _compress_data(data, compresslevel=9):
+        return _util.compress_data(gzip_binary.require(), data, compresslevel)
+
+    def _decompress_data(data):
+        return _util.decompress_data(gzip_binary.require(), data)
+
+
+def _pigz_args():
+    return (f"-p{multiprocessing.cpu_count()}",)
+
+
+def _parallelizable():
+    return pigz_binary.path is not None
+
+
+def __getattr__(name):
+    # these used to be determined at import; they're now computed on access.
+    if name == "parallelizable":
+        return _parallelizable()
+    elif name == "gzip_path":
+        return gzip_binary.path
+    elif name == "pigz_path":
+        return pigz_binary.path
+    elif name in ("pigz_compress_args", "pigz_decompress_args"):
+        return _pigz_args() if pigz_binary.path is not None else ()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# the supported compression levels, fastest first.
+levels = range(1, 10)
+
+
+def capabilities():
+    return _util.Capabilities(
+        native, gzip_binary.path, pigz_binary.path, _parallelizable()
+    )
+
+
+def _native_handle(handle, mode, **kwargs):
+    if isinstance(handle, str):
+        return GzipFile(handle, mode=mode, **kwargs)
+    return GzipFile(fileobj=_util.fd_fileobj(handle, mode), mode=mode, **kwargs)
+
+
+def compress_data(data, level=9, parallelize=False):
+    if parallelize and _parallelizable():
+        return _util.compress_data(
+            pigz_binary.path, data, compresslevel=level, extra_args=_pigz_args()
+        )
+    return _compress_data(data, compresslevel=level)
+
+
+def decompress_data(data, parallelize=False):
+    if parallelize and _parallelizable():
+        return _util.decompress_data(pigz_binary.path, data, extra_args=_pigz_args())
+    return _decompress_data(data)
+
+
+def compress_handle(handle, level=9, parallelize=False):
+    if parallelize and _parallelizable():
+        return _util.compress_handle(
+            pigz_binary.path, handle, compresslevel=level, extra_args=_pigz_args()
+        )
+    elif native and (isinstance(handle, str) or gzip_binary.path is None):
+        return _native_handle(handle, "wb", compresslevel=level)
+    return _util.compress_handle(gzip_binary.require(), handle, compresslevel=level)
+
+
+def decompress_handle(handle, parallelize=False, index=None):
+    if index is not None and native and isinstance(handle, str):
+        return _util.seekable_handle("gzip", handle, index)
+    elif parallelize and _parallelizable():
+        return _util.decompress_handle(
+            pigz_binary.path, handle, extra_args=_pigz_args(), index=index
+        )
+    elif native and (isinstance(handle, str) or gzip_binary.path is None):
+        return _native_handle(handle, "rb")
+    return _util.decompress_handle(gzip_binary.require(), handle, index=index)
+
+
+def compress_chunks(chunks, level=9, parallelize=False, checkpoint=None, index=None):
+    if parallelize and _parallelizable() and checkpoint is None and index is None:
+        return _util.compress_chunks(pigz_binary.path, chunks, level, _pigz_args())
+    elif native:
+        # wbits of 31 is a gzip wrapper.
+        return _util.native_compress_chunks(
+            partial(zlib.compressobj, level, zlib.DEFLATED, 31),
+            chunks,
+            checkpoint,
+            index,
+        )
+    return _util.compress_chunks(
+        gzip_binary.require(), chunks, level, (), checkpoint, index
+    )
+
+
+def decompress_chunks(chunks, parallelize=False):
+    if parallelize and _parallelizable():
+        return _util.decompress_chunks(pigz_binary.path, chunks, _pigz_args())
+    elif native:
+        return _util.native_decompress_chunks(partial(zlib.decompressobj, 31), chunks)
+    return _util.decompress_chunks(gzip_binary.require(), chunks)
+
+
+async def acompress_data(data, level=9, parallelize=False):
+    if parallelize and _parallelizable():
+        return await _util.acompress_data(
+            pigz_binary.path, data, compresslevel=level, extra_args=_pigz_args()
+        )
+    elif native:
+        return await _util.offload(compress_data, data, level)
+    return await _util.acompress_data(gzip_binary.require(), data, compresslevel=level)
+
+
+async def adecompress_data(data, parallelize=False):
+    if parallelize and _parallelizable():
+        return await _util.adecompress_data(
+            pigz_binary.path, data, extra_args=_pigz_args()
+        )
+    elif native:
+        return await _util.offload(decompress_data, data)
+    return await _util.adecompress_data(gzip_binary.require(), data)
+
+
+def acompress_chunks(chunks, level=9, parallelize=False):
+    if parallelize and _parallelizable():
+        return _util.acompress_chunks(pigz_binary.path, chunks, level, _pigz_args())
+    elif native:
+        return _util.anative_compress_chunks(
+            partial(zlib.compressobj, level, zlib.DEFLATED, 31), chunks
+        )
+    return _util.acompress_chunks(gzip_binary.require(), chunks, level)
+
+
+def adecompress_chunks(chunks, parallelize=False):
+    if parallelize and _parallelizable():
+        return _util.adecompress_chunks(pigz_binary.path, chunks, _pigz_args())
+    elif native:
+        return _util.anative_decompress_chunks(partial(zlib.decompressobj, 31), chunks)
+    return _util.adecompress_chunks(gzip_binary.require(), chunks)
@@ -0,0 +1,443 @@
+"""
+random access to compressed files
+
+Compressed formats are made of independently decompressible pieces- xz blocks,
+zstd frames, bzip2 blocks, and concatenated streams in general.  Given an index
+of those pieces, a read only needs to decompress the pieces covering it.
+"""
+
+__all__ = ("SeekableBlock", "SeekableReader")
+
+import bisect
+import io
+import mmap
+import os
+import typing
+import zlib
+from collections import OrderedDict
+
+_xz_magic = b"\xfd7zXZ\x00"
+_zstd_magic = 0xFD2FB528
+_zstd_seek_table_magic = 0x8F92EAB1
+_bzip2_block_magic = 0x314159265359
+_bzip2_eos_magic = 0x177245385090
+
+
+class SeekableBlock(typing.NamedTuple):
+    """An independently decompressible piece of a compressed file."""
+
+    #: compressed offset; in bits for bzip2 blocks.
+    offset: int
+    #: compressed size; in bits for bzip2 blocks.
+    size: int
+    #: uncompressed offset.
+    position: int
+    #: uncompressed size.
+    length: int
+    #: one of "stream" for complete compressed streams, "xz" or "bzip2".
+    kind: str = "stream"
+    #: stream flags for xz blocks.
+    flags: int = 0
+
+
+def _u32(data, offset=0):
+    return int.from_bytes(data[offset : offset + 4], "little")
+
+
+def _varint(value):
+    data = bytearray()
+    while value >= 0x80:
+        data.append((value & 0x7F) | 0x80)
+        value >>= 7
+    data.append(value)
+    return bytes(data)
+
+
+def _read_varint(data, offset):
+    value = shift = 0
+    while True:
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return value, offset
+        shift += 7
+
+
+def _pad4(data):
+    return data + b"\0" * (-len(data) % 4)
+
+
+def _xz_blocks(data):
+    """Yield (offset, unpadded size, uncompressed size, flags) from xz indexes.
+
+    Streams are parsed from the end of the file backwards, via their footers.
+    """
+    streams = []
+    end = len(data)
+    while end > 0:
+        # stream padding.
+        while end >= 4 and data[end - 4 : end] == b"\0\0\0\0":
+            end -= 4
+        if end == 0:
+            break
+        footer = data[end - 12 : end]
+        if footer[10:] != b"YZ" or zlib.crc32(footer[4:10]) != _u32(footer):
+            raise ValueError("invalid xz stream footer")
+        flags = footer[8:10]
+        index_size = (_u32(footer, 4) + 1) * 4
+        index_start = end - 12 - index_size
+        if data[index_start] != 0:
+            raise ValueError("invalid xz index")
+        count, pos = _read_varint(data, index_start + 1)
+        records = []
+        for _ in range(count):
+            unpadded, pos = _read_varint(data, pos)
+            uncompressed, pos = _read_varint(data, pos)
+            records.append((unpadded, uncompressed))
+        start = index_start - sum(x + (-x % 4) for x, _ in records) - 12
+        if start < 0 or data[start : start + 6] != _xz_magic:
+            raise ValueError("invalid xz stream header")
+        offset = start + 12
+        blocks = []
+        for unpadded, uncompressed in records:
+            blocks.append((offset, unpadded, uncompressed, int.from_bytes(flags)))
+            offset += unpadded + (-unpadded % 4)
+        streams.append(blocks)
+        end = start
+    for blocks in reversed(streams):
+        yield from blocks
+
+
+def _decompress_xz_block(data, unpadded, length, flags):
+    """Decompress a lone, padded, xz block by wrapping it in a stream of its own."""
+    from . import decompress_data
+
+    flags = flags.to_bytes(2)
+    header = _xz_magic + flags + zlib.crc32(flags).to_bytes(4, "little")
+    index = _pad4(b"\0" + _varint(1) + _varint(unpadded) + _varint(length))
+    index += zlib.crc32(index).to_bytes(4, "little")
+    footer = (len(index) // 4 - 1).to_bytes(4, "little") + flags
+    footer = zlib.crc32(footer).to_bytes(4, "little") + footer + b"YZ"
+    return decompress_data("xz", header + data + index + footer)
+
+
+def _zstd_frames(data):
+    """Yield (offset, size, uncompressed size or None) for each zstd frame.
+
+    The seek table of the zstd seekable format is used if present; otherwise the
+    frame and block headers are walked, which doesn't require decompression.
+    """
+    if len(data) >= 17 and _u32(data, len(data) - 4) == _zstd_seek_table_magic:
+        count = _u32(data, len(data) - 9)
+        entry_size = 12 if data[len(data) - 5] & 0x80 else 8
+        table = len(data) - 9 - count * entry_size
+        offset = 0
+        for x in range(table, table + count * entry_size, entry_size):
+            size = _u32(data, x)
+            yield offset, size, _u32(data, x + 4)
+            offset += size
+        return
+
+    offset = 0
+    while offset < len(data):
+        magic = _u32(data, offset)
+        if 0x184D2A50 <= magic <= 0x184D2A5F:
+            # skippable frame.
+            offset += 8 + _u32(data, offset + 4)
+            continue
+        elif magic != _zstd_magic:
+            raise ValueError(f"invalid zstd frame at offset {offset}")
+        descriptor = data[offset + 4]
+        single_segment = descriptor & 0x20
+        pos = offset + 5 + (not single_segment) + (0, 1, 2, 4)[descriptor & 3]
+        fcs_size = (1 if single_segment else 0, 2, 4, 8)[descriptor >> 6]
+        length = None
+        if fcs_size:
+            length = int.from_bytes(data[pos : pos + fcs_size], "little")
+            if fcs_size == 2:
+                length += 256
+        pos += fcs_size
+        while True:
+            header = int.from_bytes(data[pos : pos + 3], "little")
+            # RLE blocks are a single byte, regardless of their size.
+            pos += 3 + (1 if (header >> 1) & 3 == 1 else header >> 3)
+            if header & 1:
+                break
+        if descriptor & 0x4:
+            # content checksum.
+            pos += 4
+        yield offset, pos - offset, length
+        offset = pos
+
+
+def _find_bits(data, magic):
+    """Return the bit offsets of a 48 bit magic anywhere in data."""
+    offsets = []
+    for shift in range(8):
+        # the magic starts shift bits into the first of these bytes.
+        pattern = (magic << (8 - shift)).to_bytes(7)
+        if not shift:
+            offset = data.find(pattern[:6])
+            while offset != -1:
+                offsets.append(offset * 8)
+                offset = data.find(pattern[:6], offset + 1)
+            continue
+        # search for the fully determined bytes, then check the partial ones.
+        first_mask = (1 << (8 - shift)) - 1
+        last_mask = (0xFF << (8 - shift)) & 0xFF
+        middle = pattern[1:6]
+        offset = data.find(middle, 1)
+        while offset != -1:
+            if (
+                offset + 5 < len(data)
+                and data[offset - 1] & first_mask == pattern[0]
+                and data[offset + 5] & last_mask == pattern[6]
+            ):
+                offsets.append((offset - 1) * 8 + shift)
+            offset = data.find(middle, offset + 1)
+    return offsets
+
+
+def _bits(data, offset, size):
+    """Return size bits from the given bit offset of data as an int."""
+    start = offset // 8
+    end = (offset + size + 7) // 8
+    value = int.from_bytes(data[start:end])
+    return (value >> (end * 8 - offset - size)) & ((1 << size) - 1)
+
+
+def _decompress_bzip2_block(data, offset, size):
+    """Decompress a lone bzip2 block by wrapping it in a stream of its own."""
+    from . import decompress_data
+
+    block = _bits(data, offset, size)
+    # a single block stream's combined CRC is the block CRC.
+    crc = (block >> (size - 80)) & 0xFFFFFFFF
+    value = (((block << 48) | _bzip2_eos_magic) << 32) | crc
+    size += 80
+    value <<= -size % 8
+    return decompress_data("bzip2", b"BZh9" + value.to_bytes((size + 7) // 8))
+
+
+def _bzip2_blocks(data):
+    """Yield (bit offset, bit size, decompressed data) for each bzip2 block.
+
+    Block boundaries are found by searching for the block and end of stream
+    magics, which aren't byte aligned.  A spurious match within compressed data
+    is extremely unlikely, but is handled by extending the block over it if
+    the block fails to decompress.
+    """
+    markers = sorted(
+        [(x, False) for x in _find_bits(data, _bzip2_block_magic)]
+        + [(x, True) for x in _find_bits(data, _bzip2_eos_magic)]
+    )
+    i = 0
+    while i < len(markers):
+        start, eos = markers[i]
+        i += 1
+        if eos:
+            continue
+        # the closest following marker that ends a valid block.
+        for end, _ in markers[i:]:
+            try:
+                decompressed = _decompress_bzip2_block(data, start, end - start)
+            except (EOFError, OSError, ValueError):
+                i += 1
+                continue
+            break
+        else:
+            raise ValueError(f"invalid bzip2 block at bit offset {start}")
+        yield start, end - start, decompressed
+
+
+def _sniff(data):
+    data = data[:6]
+    if data.startswith(_xz_magic):
+        return "xz"
+    elif data.startswith(b"BZh"):
+        return "bzip2"
+    elif data.startswith(b"\x1f\x8b"):
+        return "gzip"
+    elif _u32(data) == _zstd_magic or 0x184D2A50 <= _u32(data) <= 0x184D2A5F:
+        return "zstd"
+    raise ValueError("unknown compression format")
+
+
+class SeekableReader(io.RawIOBase):
+    """Read only, seekable file object for a compressed file.
+
+    Only the blocks covering a read are decompressed; the most recently used are
+    kept in an LRU cache.  The index of blocks is built from the file itself:
+    xz indexes, zstd seek tables or frame headers, and bzip2 block boundaries.
+    Building a bzip2 index requires decompressing the file once, as does a zstd
+    file whose frames lack a content size; pass a previously built :attr:`index`
+    to avoid that.  Gzip files are treated as a single block unless an index is
+    given.
+
+    :param path: compressed file path.
+    :param compressor_type: compression format; detected from the file if not
+        given.
+    :param index: either :obj:`SeekableBlock` instances from the :attr:`index`
+        of a previous reader, or the (compressed offset, uncompressed offset)
+        pairs produced by :func:`snakeoil.compression.compress_chunks`.
+    :param cache_size: the maximum number of decompressed blocks to keep.
+    """
+
+    def __init__(self, path, compressor_type=None, index=None, cache_size=8):
+        super().__init__()
+        self._cache = OrderedDict()
+        self._cache_size = max(cache_size, 1)
+        self._position = 0
+        self._data = None
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                raise ValueError(f"{path!r}: empty file")
+            self._data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            if compressor_type is None:
+                compressor_type = _sniff(self._data)
+            self.compressor_type = compressor_type
+            if index is None:
+                self._index = self._build_index()
+            elif index and not isinstance(index[0], SeekableBlock):
+                self._index = self._index_from_streams(index)
+            else:
+                self._index = tuple(index)
+        except BaseException:
+            self._data.close()
+            raise
+        self._positions = [x.position for x in self._index]
+        self.size = self._index[-1].position + self._index[-1].length
+
+    @property
+    def index(self):
+        """Tuple of :obj:`SeekableBlock` instances for the file."""
+        return self._index
+
+    def _decompress_stream(self, data):
+        from . import decompress_data
+
+        return decompress_data(self.compressor_type, data)
+
+    def _build_index(self):
+        blocks = []
+        position = 0
+        if self.compressor_type == "xz":
+            for offset, size, length, flags in _xz_blocks(self._data):
+                blocks.append(
+                    SeekableBlock(offset, size, position, length, "xz", flags)
+                )
+                position += length
+        elif self.compressor_type == "bzip2":
+            for offset, size, data in _bzip2_blocks(self._data):
+                block = SeekableBlock(offset, size, position, len(data), "bzip2")
+                self._cache_block(len(blocks), data)
+                blocks.append(block)
+                position += len(data)
+        else:
+            if self.compressor_type == "zstd":
+                frames = _zstd_frames(self._data)
+            else:
+                frames = ((0, len(self._data), None),)
+            for offset, size, length in frames:
+                if length is None:
+                    data = self._decompress_stream(self._data[offset : offset + size])
+                    self._cache_block(len(blocks), data)
+                    length = len(data)
+                blocks.append(SeekableBlock(offset, size, position, length))
+                position += length
+        if not blocks:
+            # an empty, but valid, file.
+            blocks.append(SeekableBlock(0, len(self._data), 0, 0))
+        return tuple(blocks)
+
+    def _index_from_streams(self, pairs):
+        pairs = sorted(pairs)
+        blocks = []
+        ends = [x[0] for x in pairs[1:]] + [len(self._data)]
+        lengths = [y[1] - x[1] for x, y in zip(pairs, pairs[1:])]
+        for (offset, position), end, length in zip(pairs, ends, lengths + [None]):
+            if length is None:
+                data = self._decompress_stream(self._data[offset:end])
+                self._cache_block(len(blocks), data)
+                length = len(data)
+            blocks.append(SeekableBlock(offset, end - offset, position, length))
+        return tuple(blocks)
+
+    def _cache_block(self, i, data):
+        self._cache[i] = data
+        self._cache.move_to_end(i)
+        while len(self._cache) > self._cache_size:
+            self._cache.popitem(last=False)
+
+    def _block(self, i):
+        """Return the decompressed data of block i."""
+        try:
+            data = self._cache[i]
+            self._cache.move_to_end(i)
+            return data
+        except KeyError:
+            pass
+        block = self._index[i]
+        if block.kind == "bzip2":
+            data = _decompress_bzip2_block(self._data, block.offset, block.size)
+        else:
+            size = block.size
+            if block.kind == "xz":
+                # block padding precedes the check, thus must be included.
+                size += -size % 4
+            raw = self._data[block.offset : block.offset + size]
+            if block.kind == "xz":
+                data = _decompress_xz_block(raw, block.size, block.length, block.flags)
+            else:
+                data = self._decompress_stream(raw)
+        if len(data) != block.length:
+            raise ValueError(
+                f"block {i} decompressed to {len(data)} bytes, expected {block.length}"
+            )
+        self._cache_block(i, data)
+        return data
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._position
+
+    def seek(self, offset, whence=os.SEEK_SET):
+        if whence == os.SEEK_CUR:
+            offset += self._position
+        elif whence == os.SEEK_END:
+            offset += self.size
+        elif whence != os.SEEK_SET:
+            raise ValueError(f"invalid whence: {whence!r}")
+        if offset < 0:
+            raise ValueError(f"negative seek position {offset}")
+        self._position = offset
+        return offset
+
+    def readinto(self, buffer):
+        if self.closed:
+            raise ValueError("I/O operation on closed file")
+        view = memoryview(buffer).cast("B")
+        written = 0
+        while written < len(view) and self._position < self.size:
+            i = bisect.bisect_right(self._positions, self._position) - 1
+            block = self._index[i]
+            data = self._block(i)
+            start = self._position - block.position
+            count = min(len(view) - written, block.length - start)
+            view[written : written + count] = data[start : start + count]
+            written += count
+            self._position += count
+        return written
+
+    def close(self):
+        if not self.closed and self._data is not None:
+            self._cache.clear()
+            self._data.close()
+        super().close()
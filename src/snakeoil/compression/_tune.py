@@ -0,0 +1,220 @@
+"""
+compression level benchmarking and selection
+
+Higher levels trade throughput for ratio, and where the tradeoff stops paying off
+depends heavily on the data.  This measures it for a given corpus, and picks
+levels from those measurements.
+"""
+
+__all__ = ("LevelBenchmark", "auto_level", "benchmark", "pick_level")
+
+import os
+import threading
+import time
+import typing
+from functools import partial
+
+# auto_level only measures this much of the data it's given.
+_sample_size = 256 << 10
+# the ratio a level must reach, relative to the best measured, when auto_level is
+# given no targets.
+_default_ratio_fraction = 0.9
+
+_auto_levels = {}
+_auto_levels_lock = threading.Lock()
+
+
+class LevelBenchmark(typing.NamedTuple):
+    """Measurements of a compressor at a given level."""
+
+    compressor_type: str
+    level: int
+    #: uncompressed size divided by compressed size.
+    ratio: float
+    #: uncompressed megabytes (10**6 bytes) compressed per second.
+    compress_mbps: float
+    #: uncompressed megabytes (10**6 bytes) decompressed per second.
+    decompress_mbps: float
+
+
+def _transforms():
+    from . import _transforms
+
+    return _transforms
+
+
+def _sample_corpus(size=1 << 20):
+    """Return up to roughly size bytes of python source from this package."""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    corpus = []
+    total = 0
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for name in sorted(filenames):
+            if not name.endswith(".py"):
+                continue
+            with open(os.path.join(dirpath, name), "rb") as f:
+                corpus.append(f.read())
+            total += len(corpus[-1])
+            if total >= size:
+                return corpus
+    return corpus
+
+
+def _best_time(func, arg, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(arg)
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    # guard against timer resolution for tiny inputs.
+    return result, max(best, 1e-9)
+
+
+def _compress_all(transform, level, corpus):
+    return [transform.compress_data(x, level) for x in corpus]
+
+
+def _decompress_all(transform, corpus):
+    return [transform.decompress_data(x) for x in corpus]
+
+
+def benchmark(corpus=None, compressor_types=None, levels=None, repeat=3):
+    """Measure ratio and throughput of compressors across their levels.
+
+    :param corpus: bytes, or an iterable of bytes samples that are each
+        compressed separately- as independent cache entries would be.  Defaults
+        to a sample of python source.
+    :param compressor_types: the compressors to measure; defaults to all
+        available ones.
+    :param levels: the levels to measure; defaults to each compressor's full
+        range of supported levels.
+    :param repeat: the number of timings to take the best of.
+    :return: list of :class:`LevelBenchmark`, in compressor and level order.
+    """
+    if corpus is None:
+        corpus = _sample_corpus()
+    elif isinstance(corpus, (bytes, bytearray, memoryview)):
+        corpus = [corpus]
+    corpus = [bytes(x) for x in corpus]
+    size = sum(map(len, corpus))
+    if not size:
+        raise ValueError("empty corpus")
+
+    transforms = _transforms()
+    if compressor_types is None:
+        from . import capabilities
+
+        compressor_types = [
+            name for name, x in capabilities().items() if x.native or x.binary
+        ]
+
+    results = []
+    for name in compressor_types:
+        transform = transforms[name]
+        for level in transform.module.levels if levels is None else levels:
+            compressed, compress_time = _best_time(
+                partial(_compress_all, transform, level), corpus, repeat
+            )
+            _, decompress_time = _best_time(
+                partial(_decompress_all, transform), compressed, repeat
+            )
+            results.append(
+                LevelBenchmark(
+                    name,
+                    level,
+                    size / sum(map(len, compressed)),
+                    size / compress_time / 1e6,
+                    size / decompress_time / 1e6,
+                )
+            )
+    return results
+
+
+def pick_level(
+    results, min_ratio=None, min_compress_mbps=None, min_decompress_mbps=None
+):
+    """Pick the level that best meets the given targets.
+
+    With a ratio target, the fastest compressing level reaching it is picked;
+    otherwise the best ratio level meeting the throughput targets.  If no level
+    meets them, the closest is picked: the best ratio if the ratio target was
+    missed, else the fastest.  With no targets at all, the ratio target is
+    90% of the best ratio measured.
+
+    :param results: :class:`LevelBenchmark` instances for a single compressor.
+    :return: the chosen :class:`LevelBenchmark`.
+    """
+    results = list(results)
+    if not results:
+        raise ValueError("no benchmark results")
+    if min_ratio is min_compress_mbps is min_decompress_mbps is None:
+        min_ratio = max(x.ratio for x in results) * _default_ratio_fraction
+
+    def fast_enough(result):
+        return (
+            min_compress_mbps is None or result.compress_mbps >= min_compress_mbps
+        ) and (
+            min_decompress_mbps is None or result.decompress_mbps >= min_decompress_mbps
+        )
+
+    def by_ratio(result):
+        return (result.ratio, result.compress_mbps)
+
+    def by_speed(result):
+        return (result.compress_mbps, result.ratio)
+
+    candidates = [x for x in results if fast_enough(x)]
+    if min_ratio is not None:
+        if matches := [x for x in candidates if x.ratio >= min_ratio]:
+            return max(matches, key=by_speed)
+        if not any(x.ratio >= min_ratio for x in results):
+            return max(results, key=by_ratio)
+        # the ratio is reachable, just not within the throughput targets.
+        return max(results, key=by_speed)
+    if candidates:
+        return max(candidates, key=by_ratio)
+    return max(results, key=by_speed)
+
+
+def auto_level(
+    compressor_type,
+    data,
+    data_class=None,
+    min_ratio=None,
+    min_compress_mbps=None,
+    min_decompress_mbps=None,
+):
+    """Return the compression level for data, measuring levels if needed.
+
+    The choice is cached per data class and targets: the first data seen for a
+    class is the sample the levels are measured on, so data of a class should be
+    alike- cache entries of a given kind, for example.  Only the first 256KiB of
+    data is measured.
+
+    See :func:`pick_level` for the targets.
+    """
+    key = (
+        compressor_type,
+        data_class,
+        min_ratio,
+        min_compress_mbps,
+        min_decompress_mbps,
+    )
+    if (level := _auto_levels.get(key)) is not None:
+        return level
+    if not data:
+        # nothing to measure; don't cache that as the choice for the class.
+        return _transforms()[compressor_type].module.levels[0]
+    with _auto_levels_lock:
+        if (level := _auto_levels.get(key)) is None:
+            results = benchmark(
+                bytes(data[:_sample_size]), (compressor_type,), repeat=1
+            )
+            level = pick_level(
+                results, min_ratio, min_compress_mbps, min_decompress_mbps
+            ).level
+            _auto_levels[key] = level
+    return level
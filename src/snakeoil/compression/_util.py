@@ -1,8 +1,72 @@
-__all__ = ("compress_data", "decompress_data")
+__all__ = (
+    "compress_data",
+    "decompress_data",
+    "compress_chunks",
+    "decompress_chunks",
+)
 
+import bisect
 import errno
+import multiprocessing
 import os
 import subprocess
+import tempfile
+import threading
+import typing
+from collections import deque
+from contextlib import contextmanager
+from operator import itemgetter
+
+from .. import _async, process
+from .._async import offload
+
+_unset = object()
+
+
+class lazy_binary:
+    """An external binary, looked up on first use rather than at import.
+
+    The result- found or not- is cached.
+    """
+
+    __slots__ = ("name", "_path")
+
+    def __init__(self, name):
+        self.name = name
+        self._path = _unset
+
+    @property
+    def path(self):
+        """The path of the binary, or None if it isn't found."""
+        if self._path is _unset:
+            try:
+                self._path = process.find_binary(self.name)
+            except process.CommandNotFound:
+                self._path = None
+        return self._path
+
+    def require(self):
+        """Return the path of the binary, raising CommandNotFound if missing."""
+        if (path := self.path) is None:
+            raise process.CommandNotFound(self.name)
+        return path
+
+
+class Capabilities(typing.NamedTuple):
+    """What a compressor supports in this environment."""
+
+    #: whether the python module is available, compressing in process.
+    native: bool
+    #: path of the compressor binary, or None if it isn't found.
+    binary: typing.Optional[str]
+    #: path of the binary used for parallel compression, or None.
+    parallel_binary: typing.Optional[str]
+    #: whether parallelize=True actually parallelizes.
+    parallel: bool
+
+
+# read size used when streaming process output.
+chunk_size = 64 * 1024
 
 
 def _drive_process(args, mode, data):
@@ -38,21 +102,327 @@ def decompress_data(binary, data, extra_args=()):
     return _drive_process(args, "decompression", data)
 
 
+def _feed_process(stdin, chunks, errors):
+    try:
+        for chunk in chunks:
+            stdin.write(chunk)
+    except BrokenPipeError:
+        # the process exited early; its exit code explains why.
+        pass
+    except BaseException as e:
+        errors.append(e)
+    finally:
+        try:
+            stdin.close()
+        except BrokenPipeError:
+            pass
+
+
+def filter_chunks(args, mode, chunks):
+    """Stream an iterable of chunks through a process, yielding its output.
+
+    The input is fed from a background thread so neither end of the pipes can
+    deadlock; the pipes themselves provide the backpressure, thus memory usage is
+    bounded regardless of the size of the data.  Note the chunks iterable is
+    consumed from that thread.
+    """
+    with tempfile.TemporaryFile() as stderr:
+        p = subprocess.Popen(
+            args,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=stderr,
+            close_fds=True,
+        )
+        errors = []
+        writer = threading.Thread(
+            target=_feed_process, args=(p.stdin, chunks, errors), daemon=True
+        )
+        writer.start()
+        try:
+            while data := p.stdout.read1(chunk_size):
+                yield data
+            writer.join()
+            if errors:
+                raise errors[0]
+            if p.wait() != 0:
+                stderr.seek(0)
+                args = " ".join(args)
+                raise ValueError(
+                    f"{mode} returned {p.returncode} exitcode from '{args}', stderr={stderr.read().decode()}"
+                )
+        finally:
+            if p.returncode is None:
+                p.kill()
+                p.wait()
+            p.stdout.close()
+
+
+def compress_chunks(
+    binary, chunks, compresslevel=9, extra_args=(), checkpoint=None, index=None
+):
+    if checkpoint is not None or index is not None:
+        raise ValueError(f"{binary}: checkpoints require native compression")
+    args = [binary, f"-{compresslevel}c"]
+    args.extend(extra_args)
+    return filter_chunks(args, "compression", chunks)
+
+
+def decompress_chunks(binary, chunks, extra_args=()):
+    args = [binary, "-dc"]
+    args.extend(extra_args)
+    return filter_chunks(args, "decompression", chunks)
+
+
+def native_compress_chunks(compressor, chunks, checkpoint=None, index=None):
+    """Compress an iterable of chunks via compressor objects, yielding output.
+
+    :param compressor: callable returning a new compressor object, with
+        compress and flush methods; for example `bz2.BZ2Compressor`.
+    :param checkpoint: if given, start a new stream every checkpoint bytes of
+        input.  Each stream is independently decompressible, allowing random
+        access to the data; see :obj:`decompress_handle`.
+    :param index: if given, a list that (compressed offset, uncompressed offset)
+        pairs are appended to for the start of each stream.
+    """
+    stream = compressor()
+    if index is not None:
+        index.append((0, 0))
+    compressed = uncompressed = remaining = 0
+    for chunk in chunks:
+        view = memoryview(chunk)
+        while view:
+            if stream is None:
+                stream = compressor()
+                if index is not None:
+                    index.append((compressed, uncompressed))
+            if checkpoint:
+                if not remaining:
+                    remaining = checkpoint
+                size = min(len(view), remaining)
+                remaining -= size
+            else:
+                size = len(view)
+            data = stream.compress(view[:size])
+            view = view[size:]
+            uncompressed += size
+            if checkpoint and not remaining:
+                data += stream.flush()
+                stream = None
+            if data:
+                compressed += len(data)
+                yield data
+    if stream is not None:
+        yield stream.flush()
+
+
+def parallel_compress_chunks(compress, chunks, block_size, workers=None, index=None):
+    """Compress an iterable of chunks as independent streams on a thread pool.
+
+    Output is yielded in order.  At most a couple of blocks per worker are in
+    flight at any time; a slow consumer stalls the consumption of chunks rather
+    than growing memory usage.
+
+    :param index: if given, a list that (compressed offset, uncompressed offset)
+        pairs are appended to for the start of each stream.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    workers = workers or multiprocessing.cpu_count()
+    pending = deque()
+    compressed = uncompressed = 0
+    buffer = bytearray()
+
+    def drain(limit):
+        nonlocal compressed
+        while len(pending) > limit:
+            offset, future = pending.popleft()
+            data = future.result()
+            if index is not None:
+                index.append((compressed, offset))
+            compressed += len(data)
+            yield data
+
+    pool = ThreadPoolExecutor(workers)
+    try:
+        for chunk in chunks:
+            buffer += chunk
+            while len(buffer) >= block_size:
+                block = bytes(buffer[:block_size])
+                del buffer[:block_size]
+                pending.append((uncompressed, pool.submit(compress, block)))
+                uncompressed += block_size
+                yield from drain(workers * 2)
+        if buffer or not uncompressed:
+            # an empty input still needs a valid (empty) stream.
+            pending.append((uncompressed, pool.submit(compress, bytes(buffer))))
+        yield from drain(0)
+    finally:
+        pool.shutdown(cancel_futures=True)
+
+
+def native_decompress_chunks(decompressor, chunks):
+    """Decompress an iterable of chunks via decompressor objects, yielding output.
+
+    Concatenated streams are supported; decompressor is called to create an
+    object for each stream.
+    """
+    stream = decompressor()
+    for chunk in chunks:
+        while chunk:
+            if stream.eof:
+                stream = decompressor()
+            if data := stream.decompress(chunk):
+                yield data
+            chunk = stream.unused_data if stream.eof else b""
+    if not stream.eof:
+        raise EOFError("compressed data ended before the end-of-stream marker")
+
+
+async def _adrive_process(args, mode, data):
+    import asyncio
+
+    async with _async.limit():
+        p = await asyncio.create_subprocess_exec(
+            *args,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+        try:
+            stdout, stderr = await p.communicate(data)
+        finally:
+            if p.returncode is None:
+                p.kill()
+                await p.wait()
+    if p.returncode != 0:
+        args = " ".join(args)
+        raise ValueError(
+            f"{mode} returned {p.returncode} exitcode from '{args}', stderr={stderr.decode()}"
+        )
+    return stdout
+
+
+async def acompress_data(binary, data, compresslevel=9, extra_args=()):
+    args = [binary, f"-{compresslevel}c"]
+    args.extend(extra_args)
+    return await _adrive_process(args, "compression", data)
+
+
+async def adecompress_data(binary, data, extra_args=()):
+    args = [binary, "-dc"]
+    args.extend(extra_args)
+    return await _adrive_process(args, "decompression", data)
+
+
+async def _aiter_chunks(chunks):
+    if hasattr(chunks, "__aiter__"):
+        async for chunk in chunks:
+            yield chunk
+    else:
+        for chunk in chunks:
+            yield chunk
+
+
+async def _afeed_process(stdin, chunks):
+    try:
+        async for chunk in _aiter_chunks(chunks):
+            stdin.write(chunk)
+            await stdin.drain()
+    except (BrokenPipeError, ConnectionResetError):
+        # the process exited early; its exit code explains why.
+        pass
+    finally:
+        stdin.close()
+
+
+async def afilter_chunks(args, mode, chunks):
+    """Async version of :func:`filter_chunks`.
+
+    chunks may be an iterable or an async iterable; it's fed to the process from
+    a separate task.  The process holds one of the operations in flight for its
+    lifetime, so chained streams need a concurrency limit above their count.
+    """
+    import asyncio
+
+    async with _async.limit():
+        with tempfile.TemporaryFile() as stderr:
+            p = await asyncio.create_subprocess_exec(
+                *args, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=stderr
+            )
+            writer = asyncio.ensure_future(_afeed_process(p.stdin, chunks))
+            try:
+                while data := await p.stdout.read(chunk_size):
+                    yield data
+                await writer
+                if await p.wait() != 0:
+                    stderr.seek(0)
+                    args = " ".join(args)
+                    raise ValueError(
+                        f"{mode} returned {p.returncode} exitcode from '{args}', stderr={stderr.read().decode()}"
+                    )
+            finally:
+                writer.cancel()
+                if p.returncode is None:
+                    p.kill()
+                    await p.wait()
+
+
+def acompress_chunks(binary, chunks, compresslevel=9, extra_args=()):
+    args = [binary, f"-{compresslevel}c"]
+    args.extend(extra_args)
+    return afilter_chunks(args, "compression", chunks)
+
+
+def adecompress_chunks(binary, chunks, extra_args=()):
+    args = [binary, "-dc"]
+    args.extend(extra_args)
+    return afilter_chunks(args, "decompression", chunks)
+
+
+async def anative_compress_chunks(compressor, chunks):
+    """Async version of :func:`native_compress_chunks`, lacking checkpoints.
+
+    The compression itself is offloaded to the shared thread pool.
+    """
+    stream = compressor()
+    async for chunk in _aiter_chunks(chunks):
+        if data := await offload(stream.compress, chunk):
+            yield data
+    yield await offload(stream.flush)
+
+
+async def anative_decompress_chunks(decompressor, chunks):
+    """Async version of :func:`native_decompress_chunks`."""
+    stream = decompressor()
+    async for chunk in _aiter_chunks(chunks):
+        while chunk:
+            if stream.eof:
+                stream = decompressor()
+            if data := await offload(stream.decompress, chunk):
+                yield data
+            chunk = stream.unused_data if stream.eof else b""
+    if not stream.eof:
+        raise EOFError("compressed data ended before the end-of-stream marker")
+
+
 class _process_handle:
-    def __init__(self, handle, args, is_read=False):
+    def __init__(self, handle, args, is_read=False, index=None):
         self.mode = "rb" if is_read else "wb"
 
         self.args = tuple(args)
         self.is_read = is_read
+        self._index = sorted(index) if index else None
         self._open_handle(handle)
 
-    def _open_handle(self, handle):
+    def _open_handle(self, handle, checkpoint=(0, 0)):
         self._allow_reopen = None
         close = False
         if isinstance(handle, str):
             if self.is_read:
                 self._allow_reopen = handle
             handle = open(handle, mode=self.mode)
+            handle.seek(checkpoint[0])
             close = True
         elif not isinstance(handle, int):
             if not hasattr(handle, "fileno"):
@@ -66,9 +436,9 @@ class _process_handle:
         finally:
             if close:
                 handle.close()
+        self.position = checkpoint[1]
 
     def _setup_process(self, handle):
-        self.position = 0
         stderr = open(os.devnull, "wb")
         kwds = dict(stderr=stderr)
         if self.is_read:
@@ -104,17 +474,27 @@ class _process_handle:
     def tell(self):
         return self.position
 
+    def _checkpoint(self, position):
+        """Return the last (compressed, uncompressed) stream offsets before position."""
+        if self._index is None:
+            return (0, 0)
+        i = bisect.bisect_right(self._index, position, key=itemgetter(1))
+        return self._index[i - 1] if i else (0, 0)
+
     def seek(self, position=0):
         fwd_seek = position - self.position
+        if self._allow_reopen is not None:
+            # restart from the closest stream if that avoids decompressing data.
+            checkpoint = self._checkpoint(position)
+            if fwd_seek < 0 or checkpoint[1] > self.position:
+                self._terminate()
+                self._open_handle(self._allow_reopen, checkpoint)
+                return self.seek(position)
         if fwd_seek < 0:
-            if self._allow_reopen is None:
-                raise TypeError(
-                    f"instance {self} can't do negative seeks: "
-                    f"asked for {position}, was at {self.position}"
-                )
-            self._terminate()
-            self._open_handle(self._allow_reopen)
-            return self.seek(position)
+            raise TypeError(
+                f"instance {self} can't do negative seeks: "
+                f"asked for {position}, was at {self.position}"
+            )
         elif fwd_seek > 0:
             if self.is_read:
                 self._read_seek(fwd_seek)
@@ -175,7 +555,216 @@ def compress_handle(binary_path, handle, compresslevel=9, extra_args=()):
     return _process_handle(handle, args, False)
 
 
-def decompress_handle(binary_path, handle, extra_args=()):
+def decompress_handle(binary_path, handle, extra_args=(), index=None):
+    """Return a file-like object decompressing handle via binary_path.
+
+    :param index: (compressed offset, uncompressed offset) pairs of independent
+        streams within the file, as recorded by :obj:`native_compress_chunks`.
+        If given and handle is a path, seeks restart decompression from the
+        closest stream rather than the start of the file.
+    """
     args = [binary_path, "-dc"]
     args.extend(extra_args)
-    return _process_handle(handle, args, True)
+    return _process_handle(handle, args, True, index=index)
+
+
+def seekable_handle(compressor_type, path, index):
+    """Return a buffered reader of path that seeks via a checkpoint index.
+
+    Only the streams covering a read are decompressed; see
+    :class:`snakeoil.compression.SeekableReader`.
+    """
+    import io
+
+    from ._seekable import SeekableReader
+
+    return io.BufferedReader(SeekableReader(path, compressor_type, index=index))
+
+
+def fd_fileobj(handle, mode):
+    """Return an unbuffered file object for a non path handle, leaving it open on close.
+
+    This is used by the native compressors when no binary is available; like
+    :class:`_process_handle`, it operates on the underlying fd, bypassing any
+    python level buffering of the passed in object.
+    """
+    if not isinstance(handle, int):
+        if not hasattr(handle, "fileno"):
+            raise TypeError(
+                f"handle {handle!r} isn't a string, integer, and lacks a fileno method"
+            )
+        handle = handle.fileno()
+    return open(handle, mode, buffering=0, closefd=False)
+
+
+def _blocks(data, block_size):
+    view = memoryview(data)
+    return [view[x : x + block_size] for x in range(0, len(view), block_size)]
+
+
+def parallel_compress_data(compress, data, block_size, workers=None):
+    """Compress data as independent streams of block_size, concatenated.
+
+    The compression of each block is done on a thread pool; this relies on
+    compress releasing the GIL, which bz2 and lzma do.  The result is a valid
+    multi-stream file.
+    """
+    blocks = _blocks(data, block_size)
+    if len(blocks) <= 1:
+        return compress(data)
+    from concurrent.futures import ThreadPoolExecutor
+
+    workers = min(len(blocks), workers or multiprocessing.cpu_count())
+    with ThreadPoolExecutor(workers) as pool:
+        return b"".join(pool.map(compress, blocks))
+
+
+def parallel_decompress_data(decompress, data, offsets, workers=None):
+    """Decompress a multi-stream file, decompressing streams in parallel.
+
+    :param offsets: candidate stream start offsets, in ascending order.  These
+        needn't be exact; if a segment fails to decompress, the whole of data is
+        decompressed serially instead.
+    """
+    workers = workers or multiprocessing.cpu_count()
+    # group streams into roughly equal segments, a few per worker.
+    minimum = len(data) // (workers * 4)
+    bounds = [0]
+    for offset in offsets:
+        if offset - bounds[-1] >= minimum and offset > 0:
+            bounds.append(offset)
+    if len(bounds) == 1 or (offsets and offsets[0] != 0):
+        return decompress(data)
+    view = memoryview(data)
+    segments = [view[x:y] for x, y in zip(bounds, bounds[1:] + [len(view)])]
+    from concurrent.futures import ThreadPoolExecutor
+
+    try:
+        with ThreadPoolExecutor(min(len(segments), workers)) as pool:
+            return b"".join(pool.map(decompress, segments))
+    except (EOFError, OSError, ValueError):
+        # a false positive stream boundary; let the serial path sort it out.
+        return decompress(data)
+
+
+class parallel_compress_handle:
+    """File-like writer compressing fixed size blocks on a thread pool.
+
+    Each block is written as an independent stream, in order.  At most a couple
+    of blocks per worker are held in memory at any time.
+    """
+
+    def __init__(self, handle, compress, block_size, workers=None):
+        if isinstance(handle, str):
+            self._handle = open(handle, "wb")
+            self._close_handle = True
+        else:
+            self._handle = fd_fileobj(handle, "wb")
+            self._close_handle = False
+        from concurrent.futures import ThreadPoolExecutor
+
+        self._workers = workers or multiprocessing.cpu_count()
+        self._pool = ThreadPoolExecutor(self._workers)
+        self._compress = compress
+        self._block_size = block_size
+        self._buffer = bytearray()
+        self._pending = deque()
+        self.position = 0
+
+    def _flush_pending(self, limit):
+        while len(self._pending) > limit:
+            self._handle.write(self._pending.popleft().result())
+
+    def write(self, data):
+        self._buffer += data
+        self.position += len(data)
+        while len(self._buffer) >= self._block_size:
+            block = bytes(self._buffer[: self._block_size])
+            del self._buffer[: self._block_size]
+            self._pending.append(self._pool.submit(self._compress, block))
+            self._flush_pending(self._workers * 2)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def close(self):
+        if self._pool is None:
+            return
+        try:
+            if self._buffer or not self.position:
+                # an empty input still needs a valid (empty) stream.
+                self._pending.append(
+                    self._pool.submit(self._compress, bytes(self._buffer))
+                )
+                self._buffer.clear()
+            self._flush_pending(0)
+        finally:
+            self._pool.shutdown()
+            self._pool = None
+            if self._close_handle:
+                self._handle.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class ContextPool:
+    """Thread safe pool of reusable compressor or decompressor contexts.
+
+    Contexts are created on demand, and returned to the pool once used- after
+    being reset, if a reset function is given.  A context that raised while in
+    use is discarded rather than trusted to be in a sane state.
+    """
+
+    __slots__ = ("_factory", "_reset", "_idle", "_max_idle", "_lock")
+
+    def __init__(self, factory, reset=None, max_idle=None):
+        self._factory = factory
+        self._reset = reset
+        self._idle = []
+        self._max_idle = (os.cpu_count() or 1) if max_idle is None else max_idle
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def context(self):
+        with self._lock:
+            context = self._idle.pop() if self._idle else None
+        if context is None:
+            context = self._factory()
+        yield context
+        if self._reset is not None:
+            self._reset(context)
+        with self._lock:
+            if len(self._idle) < self._max_idle:
+                self._idle.append(context)
+
+    def clear(self):
+        with self._lock:
+            self._idle.clear()
+
+
+_context_pools = {}
+_context_pools_lock = threading.Lock()
+
+
+def context_pool(key, factory, reset=None):
+    """Return the shared :class:`ContextPool` for key, creating it if needed.
+
+    Keys are conventionally (backend, kind, level) tuples.
+    """
+    if (pool := _context_pools.get(key)) is None:
+        with _context_pools_lock:
+            if (pool := _context_pools.get(key)) is None:
+                pool = _context_pools[key] = ContextPool(factory, reset)
+    return pool
+
+
+def clear_context_pools():
+    """Drop all idle pooled contexts, releasing their memory."""
+    with _context_pools_lock:
+        for pool in _context_pools.values():
+            pool.clear()
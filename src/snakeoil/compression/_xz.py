@@ -6,27 +6,33 @@ it defers to executing xz with tempfile arguments to do decompression
 and compression.
 
 Use this module unless it's absolutely critical that lzma module be used.
+
+Parallel compression and decompression of data is done in process via a thread
+pool if the lzma module is available, splitting the data into independent streams.
+Parallel handles use xz's own threading if the binary is available, falling back
+to the thread pool for compression.
 """
 
 __all__ = ("compress_data", "decompress_data")
 
-import multiprocessing
+import zlib
 from functools import partial
 
-from .. import process
 from ..compression import _util
 
 # Unused import
 # pylint: disable=W0611
 
-# if xz can't be found, throw an error.
-xz_path = process.find_binary("xz")
-xz_compress_args = (f"-T{multiprocessing.cpu_count()}",)
+# binaries are looked up on first use, rather than scanning PATH at import.
+xz_binary = _util.lazy_binary("xz")
+# xz picks the number of threads to match the cpus.
+xz_compress_args = ("-T0",)
 xz_decompress_args = xz_compress_args
-parallelizable = True
+# the supported compression levels, fastest first.
+levels = range(10)
 
 try:
-    from lzma import LZMAFile
+    from lzma import FILTER_LZMA2, LZMACompressor, LZMADecompressor, LZMAFile
     from lzma import compress as _compress_data
     from lzma import decompress as _decompress_data
 
@@ -36,42 +42,201 @@ except ImportError:
     # (and some code needs to be able to check that).
     native = False
 
-    _compress_data = partial(_util.compress_data, xz_path)
-    _decompress_data = partial(_util.decompress_data, xz_path)
+    def _compress_data(data, compresslevel=9):
+        return _util.compress_data(xz_binary.require(), data, compresslevel)
+
+    def _decompress_data(data):
+        return _util.decompress_data(xz_binary.require(), data)
+
+
+def _compress_handle(handle, compresslevel=9):
+    return _util.compress_handle(xz_binary.require(), handle, compresslevel)
+
+
+def _decompress_handle(handle, index=None):
+    return _util.decompress_handle(xz_binary.require(), handle, index=index)
+
+
+def _parallelizable():
+    return native or xz_binary.path is not None
+
+
+def __getattr__(name):
+    # these used to be determined at import; they're now computed on access.
+    if name == "parallelizable":
+        return _parallelizable()
+    elif name == "xz_path":
+        return xz_binary.path
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+_stream_magic = b"\xfd7zXZ\x00"
+# large enough that the dictionary of the lower presets is rarely the limit.
+parallel_block_size = 4 << 20
 
-_compress_handle = partial(_util.compress_handle, xz_path)
-_decompress_handle = partial(_util.decompress_handle, xz_path)
+
+# the dictionary size of each preset.
+_preset_dict_sizes = (
+    256 << 10,
+    1 << 20,
+    2 << 20,
+    4 << 20,
+    4 << 20,
+    8 << 20,
+    8 << 20,
+    16 << 20,
+    32 << 20,
+    64 << 20,
+)
+
+
+def _filters(level, size):
+    """Return the filter chain for compressing size bytes at the given preset.
+
+    The dictionary is shrunk to fit the data, since a larger one can't find
+    anything more.  Setting up the higher presets' dictionaries otherwise
+    dominates the cost of compressing small data- tens of milliseconds, and
+    hundreds of megabytes of allocations for -9.
+    """
+    dict_size = _preset_dict_sizes[level & 0xF]
+    # xz's minimum dictionary size is 4KiB.
+    dict_size = min(dict_size, max(4096, 1 << (size - 1).bit_length()))
+    return [{"id": FILTER_LZMA2, "preset": level, "dict_size": dict_size}]
+
+
+def capabilities():
+    # xz threads on its own.
+    return _util.Capabilities(native, xz_binary.path, xz_binary.path, _parallelizable())
+
+
+def _stream_offsets(data):
+    """Return the offsets of anything looking like a stream header.
+
+    The stream flags are CRC32 protected, which weeds out nearly all of the
+    false positives found within compressed data.
+    """
+    offsets = []
+    find = data.find
+    offset = find(_stream_magic)
+    while offset != -1:
+        flags = data[offset + 6 : offset + 8]
+        if zlib.crc32(flags) == int.from_bytes(
+            data[offset + 8 : offset + 12], "little"
+        ):
+            offsets.append(offset)
+        offset = find(_stream_magic, offset + 1)
+    return offsets
 
 
 def compress_data(data, level=9, parallelize=False):
-    if parallelize and parallelizable:
+    if parallelize and native:
+        return _util.parallel_compress_data(
+            partial(_compress_data, preset=level), data, parallel_block_size
+        )
+    elif parallelize and xz_binary.path is not None:
         return _util.compress_data(
-            xz_path, data, compresslevel=level, extra_args=xz_compress_args
+            xz_binary.path, data, compresslevel=level, extra_args=xz_compress_args
         )
     if native:
-        return _compress_data(data, preset=level)
+        return _compress_data(data, filters=_filters(level, len(data)))
     return _compress_data(data, compresslevel=level)
 
 
 def decompress_data(data, parallelize=False):
-    if parallelize and parallelizable:
-        return _util.decompress_data(xz_path, data, extra_args=xz_decompress_args)
+    if parallelize and native:
+        return _util.parallel_decompress_data(
+            _decompress_data, data, _stream_offsets(data)
+        )
+    elif parallelize and xz_binary.path is not None:
+        return _util.decompress_data(
+            xz_binary.path, data, extra_args=xz_decompress_args
+        )
     return _decompress_data(data)
 
 
 def compress_handle(handle, level=9, parallelize=False):
-    if parallelize and parallelizable:
+    if parallelize and xz_binary.path is not None:
         return _util.compress_handle(
-            xz_path, handle, compresslevel=level, extra_args=xz_compress_args
+            xz_binary.path,
+            handle,
+            compresslevel=level,
+            extra_args=xz_compress_args,
+        )
+    elif parallelize and native:
+        return _util.parallel_compress_handle(
+            handle, partial(_compress_data, preset=level), parallel_block_size
         )
     elif native and isinstance(handle, str):
         return LZMAFile(handle, mode="w", preset=level)
     return _compress_handle(handle, compresslevel=level)
 
 
-def decompress_handle(handle, parallelize=False):
-    if parallelize and parallelizable:
-        return _util.decompress_handle(xz_path, handle, extra_args=xz_decompress_args)
+def decompress_handle(handle, parallelize=False, index=None):
+    if index is not None and native and isinstance(handle, str):
+        return _util.seekable_handle("xz", handle, index)
+    elif parallelize and xz_binary.path is not None:
+        return _util.decompress_handle(
+            xz_binary.path, handle, extra_args=xz_decompress_args, index=index
+        )
     elif native and isinstance(handle, str):
         return LZMAFile(handle, mode="r")
-    return _decompress_handle(handle)
+    return _decompress_handle(handle, index)
+
+
+def compress_chunks(chunks, level=9, parallelize=False, checkpoint=None, index=None):
+    if native and parallelize:
+        return _util.parallel_compress_chunks(
+            partial(_compress_data, preset=level),
+            chunks,
+            checkpoint or parallel_block_size,
+            index=index,
+        )
+    elif native:
+        return _util.native_compress_chunks(
+            partial(LZMACompressor, preset=level), chunks, checkpoint, index
+        )
+    extra_args = xz_compress_args if parallelize else ()
+    return _util.compress_chunks(
+        xz_binary.require(), chunks, level, extra_args, checkpoint, index
+    )
+
+
+def decompress_chunks(chunks, parallelize=False):
+    if native:
+        return _util.native_decompress_chunks(LZMADecompressor, chunks)
+    extra_args = xz_decompress_args if parallelize else ()
+    return _util.decompress_chunks(xz_binary.require(), chunks, extra_args)
+
+
+async def acompress_data(data, level=9, parallelize=False):
+    if native:
+        return await _util.offload(compress_data, data, level, parallelize)
+    extra_args = xz_compress_args if parallelize else ()
+    return await _util.acompress_data(
+        xz_binary.require(), data, compresslevel=level, extra_args=extra_args
+    )
+
+
+async def adecompress_data(data, parallelize=False):
+    if native:
+        return await _util.offload(decompress_data, data, parallelize)
+    extra_args = xz_decompress_args if parallelize else ()
+    return await _util.adecompress_data(
+        xz_binary.require(), data, extra_args=extra_args
+    )
+
+
+def acompress_chunks(chunks, level=9, parallelize=False):
+    if native:
+        return _util.anative_compress_chunks(
+            partial(LZMACompressor, preset=level), chunks
+        )
+    extra_args = xz_compress_args if parallelize else ()
+    return _util.acompress_chunks(xz_binary.require(), chunks, level, extra_args)
+
+
+def adecompress_chunks(chunks, parallelize=False):
+    if native:
+        return _util.anative_decompress_chunks(LZMADecompressor, chunks)
+    extra_args = xz_decompress_args if parallelize else ()
+    return _util.adecompress_chunks(xz_binary.require(), chunks, extra_args)
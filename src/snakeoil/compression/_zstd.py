@@ -0,0 +1,225 @@
+"""
+zstd decompression/compression
+
+Where possible, this module defers to python 3.14's `compression.zstd` module, or
+the zstandard module for older pythons- if neither is available, it defers to
+executing zstd to do decompression and compression.
+
+Natively, parallel compression is done via zstd's own worker threads rather than
+a separate process.
+"""
+
+__all__ = ("compress_data", "decompress_data")
+
+import io
+import multiprocessing
+from functools import partial
+
+from ..compression import _util
+
+# Unused import
+# pylint: disable=W0611
+
+# the binary is looked up on first use, rather than scanning PATH at import.
+zstd_binary = _util.lazy_binary("zstd")
+zstd_compress_args = ("-T0",)
+zstd_decompress_args = ()
+
+try:
+    import compression.zstd as _zstd
+
+    zstandard = None
+    native = True
+except ImportError:
+    _zstd = None
+    try:
+        import zstandard
+
+        native = True
+    except ImportError:
+        # without either module, the zstd binary is required once used.
+        zstandard = None
+        native = False
+
+
+def _parallelizable():
+    return native or zstd_binary.path is not None
+
+
+def __getattr__(name):
+    # these used to be determined at import; they're now computed on access.
+    if name == "parallelizable":
+        return _parallelizable()
+    elif name == "zstd_path":
+        return zstd_binary.path
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# the supported compression levels, fastest first; 20 and above require more
+# memory than is sensible by default.
+levels = range(1, 20)
+
+
+def capabilities():
+    # zstd threads on its own.
+    return _util.Capabilities(
+        native, zstd_binary.path, zstd_binary.path, _parallelizable()
+    )
+
+
+def _compressor(level, parallelize):
+    """Return a native compressor for the given level.
+
+    Return either a `compression.zstd.ZstdCompressor` or a
+    `zstandard.ZstdCompressor`.
+    """
+    threads = multiprocessing.cpu_count() if parallelize else 0
+    if _zstd is not None:
+        options = {_zstd.CompressionParameter.compression_level: level}
+        if threads:
+            options[_zstd.CompressionParameter.nb_workers] = threads
+        return _zstd.ZstdCompressor(options=options)
+    return zstandard.ZstdCompressor(level=level, threads=threads)
+
+
+def _zstd_file(fileobj, mode, level=None, parallelize=False, closefd=True):
+    """Wrap a binary file object with native zstd compression or decompression."""
+    if _zstd is not None:
+        if mode == "rb":
+            return _zstd.ZstdFile(fileobj, mode)
+        options = {_zstd.CompressionParameter.compression_level: level}
+        if parallelize:
+            options[_zstd.CompressionParameter.nb_workers] = multiprocessing.cpu_count()
+        return _zstd.ZstdFile(fileobj, mode, options=options)
+    if mode == "rb":
+        # the reader isn't an io object; buffering makes it one.
+        return io.BufferedReader(
+            zstandard.ZstdDecompressor().stream_reader(
+                fileobj, read_across_frames=True, closefd=closefd
+            )
+        )
+    return _compressor(level, parallelize).stream_writer(fileobj, closefd=closefd)
+
+
+def _native_handle(handle, mode, **kwargs):
+    if isinstance(handle, str):
+        return _zstd_file(open(handle, mode), mode, **kwargs)
+    return _zstd_file(_util.fd_fileobj(handle, mode), mode, closefd=False, **kwargs)
+
+
+def _compressor_pool(level, parallelize):
+    return _util.context_pool(
+        ("zstd", "compress", level, parallelize),
+        partial(_compressor, level, parallelize),
+    )
+
+
+def compress_data(data, level=9, parallelize=False):
+    if native:
+        # both compressors reset themselves once a frame is complete.
+        with _compressor_pool(level, parallelize).context() as compressor:
+            if _zstd is not None:
+                return compressor.compress(data, compressor.FLUSH_FRAME)
+            return compressor.compress(data)
+    extra_args = zstd_compress_args if parallelize else ()
+    return _util.compress_data(
+        zstd_binary.require(), data, compresslevel=level, extra_args=extra_args
+    )
+
+
+def decompress_data(data, parallelize=False):
+    # zstd decompression is inherently single threaded.
+    if native:
+        if _zstd is not None:
+            return _zstd.decompress(data)
+        # unlike ZstdDecompressor.decompress, this handles multiple frames and
+        # frames lacking a content size.
+        pool = _util.context_pool(("zstd", "decompress"), zstandard.ZstdDecompressor)
+        with pool.context() as decompressor:
+            reader = decompressor.stream_reader(
+                io.BytesIO(data), read_across_frames=True
+            )
+            return reader.readall()
+    return _util.decompress_data(
+        zstd_binary.require(), data, extra_args=zstd_decompress_args
+    )
+
+
+def compress_handle(handle, level=9, parallelize=False):
+    if native and (isinstance(handle, str) or zstd_binary.path is None):
+        return _native_handle(handle, "wb", level=level, parallelize=parallelize)
+    extra_args = zstd_compress_args if parallelize else ()
+    return _util.compress_handle(
+        zstd_binary.require(), handle, compresslevel=level, extra_args=extra_args
+    )
+
+
+def decompress_handle(handle, parallelize=False, index=None):
+    if index is not None and native and isinstance(handle, str):
+        return _util.seekable_handle("zstd", handle, index)
+    elif native and (isinstance(handle, str) or zstd_binary.path is None):
+        return _native_handle(handle, "rb")
+    return _util.decompress_handle(
+        zstd_binary.require(), handle, extra_args=zstd_decompress_args, index=index
+    )
+
+
+def compress_chunks(chunks, level=9, parallelize=False, checkpoint=None, index=None):
+    if native:
+        if _zstd is not None:
+            compressor = partial(_compressor, level, parallelize)
+        else:
+            compressor = _compressor(level, parallelize).compressobj
+        return _util.native_compress_chunks(compressor, chunks, checkpoint, index)
+    extra_args = zstd_compress_args if parallelize else ()
+    return _util.compress_chunks(
+        zstd_binary.require(), chunks, level, extra_args, checkpoint, index
+    )
+
+
+def decompress_chunks(chunks, parallelize=False):
+    if native:
+        if _zstd is not None:
+            decompressor = _zstd.ZstdDecompressor
+        else:
+            decompressor = zstandard.ZstdDecompressor().decompressobj
+        return _util.native_decompress_chunks(decompressor, chunks)
+    return _util.decompress_chunks(zstd_binary.require(), chunks, zstd_decompress_args)
+
+
+async def acompress_data(data, level=9, parallelize=False):
+    if native:
+        return await _util.offload(compress_data, data, level, parallelize)
+    extra_args = zstd_compress_args if parallelize else ()
+    return await _util.acompress_data(
+        zstd_binary.require(), data, compresslevel=level, extra_args=extra_args
+    )
+
+
+async def adecompress_data(data, parallelize=False):
+    if native:
+        return await _util.offload(decompress_data, data)
+    return await _util.adecompress_data(
+        zstd_binary.require(), data, extra_args=zstd_decompress_args
+    )
+
+
+def acompress_chunks(chunks, level=9, parallelize=False):
+    if native:
+        if _zstd is not None:
+            compressor = partial(_compressor, level, parallelize)
+        else:
+            compressor = _compressor(level, parallelize).compressobj
+        return _util.anative_compress_chunks(compressor, chunks)
+    extra_args = zstd_compress_args if parallelize else ()
+    return _util.acompress_chunks(zstd_binary.require(), chunks, level, extra_args)
+
+
+def adecompress_chunks(chunks, parallelize=False):
+    if native:
+        if _zstd is not None:
+            decompressor = _zstd.ZstdDecompressor
+        else:
+            decompressor = zstandard.ZstdDecompressor().decompressobj
+        return _util.anative_decompress_chunks(decompressor, chunks)
+    return _util.adecompress_chunks(zstd_binary.require(), chunks, zstd_decompress_args)
@@ -35,20 +35,29 @@ we caught the exception.
 __all__ = (
     "base",
     "bz2_source",
+    "gzip_source",
+    "xz_source",
+    "zstd_source",
     "data_source",
     "local_source",
     "text_data_source",
     "bytes_data_source",
     "invokable_data_source",
+    "set_async_concurrency",
 )
 
 import abc
 import errno
 import io
+import os
+import stat
 from functools import partial
 
-from . import compression, fileutils, stringio
+from . import fileutils, stringio
+from ._async import offload as _offload
+from ._async import set_async_concurrency
 from .currying import post_curry
+from .klass import GetAttrProxy
 
 
 def _mk_writable_cls(base, name):
@@ -162,24 +171,45 @@ class base(abc.ABC):
         :return: file handle like object
         """
 
-    def transfer_to_path(self, path):
+    # read size used when the transfer can't be done in kernel.
+    transfer_bufsize = 1 << 20
+
+    def transfer_to_path(self, path, bufsize=None):
         return self.transfer_to_data_source(
-            local_source(path, mutable=True, encoding=None)
+            local_source(path, mutable=True, encoding=None), bufsize=bufsize
         )
 
-    def transfer_to_data_source(self, write_source):
+    def transfer_to_data_source(self, write_source, bufsize=None):
+        """write the raw content of this source into another source
+
+        If both ends are files on disk the copy is done in kernel via
+        :py:func:`os.copy_file_range` (which can reflink on supporting filesystems)
+        or :py:func:`os.sendfile`, falling back to copying through userspace.
+
+        :param write_source: data source to write to
+        :param bufsize: read size to use if the data must be copied through
+          userspace; defaults to :py:attr:`transfer_bufsize`.
+        """
+        if bufsize is None:
+            bufsize = self.transfer_bufsize
         read_f, m, write_f = None, None, None
         try:
-            write_f = write_source.bytes_fileobj(True)
+            write_f = write_source._transfer_fileobj()
+            if self.path is not None and _transfer_in_kernel(self.path, write_f):
+                return
             if self.path is not None:
                 m, read_f = fileutils.mmap_or_open_for_read(self.path)
             else:
                 read_f = self.bytes_fileobj()
 
             if read_f is not None:
-                transfer_between_files(read_f, write_f)
+                transfer_between_files(read_f, write_f, bufsize)
             else:
                 write_f.write(m)
+        except BaseException:
+            if (discard := getattr(write_f, "discard", None)) is not None:
+                discard()
+            raise
         finally:
             for x in (read_f, write_f, m):
                 if x is None:
@@ -189,6 +219,35 @@ class base(abc.ABC):
                 except EnvironmentError:
                     pass
 
+    def _transfer_fileobj(self):
+        # the handle transfer_to_data_source writes into.
+        return self.bytes_fileobj(True)
+
+    def read_bytes(self) -> bytes:
+        """return the full content of this data source as bytes"""
+        with self.bytes_fileobj() as f:
+            return f.read()
+
+    def read_text(self) -> str:
+        """return the full content of this data source as text"""
+        with self.text_fileobj() as f:
+            return f.read()
+
+    async def aread_bytes(self) -> bytes:
+        """async form of :py:meth:`read_bytes`; the read is done in a worker thread"""
+        return await _offload(self.read_bytes)
+
+    async def aread_text(self) -> str:
+        """async form of :py:meth:`read_text`; the read is done in a worker thread"""
+        return await _offload(self.read_text)
+
+    async def atransfer_to_data_source(self, write_source, bufsize=None) -> None:
+        """async form of :py:meth:`transfer_to_data_source`
+
+        The transfer is done in a worker thread.
+        """
+        await _offload(self.transfer_to_data_source, write_source, bufsize)
+
 
 class local_source(base):
     """locally accessible data source
@@ -242,48 +301,217 @@ class local_source(base):
                 raise
             return open_file(self.path, "wb+", self.buffering_window)
 
+    def read_bytes(self):
+        return fileutils.readfile_bytes(self.path)
+
 
-class bz2_source(base):
+class _atomic_compressed_writer:
     """
-    locally accessible bz2 archive
+    streaming writer compressing into a temporary file, atomically replacing the target on close
 
-    Literally a bz2 file on disk.
+    If an exception occurs within a `with` block the changes are discarded.
+    """
+
+    __slots__ = ("_target", "_handle")
+    exceptions = (EnvironmentError, ValueError)
+
+    def __init__(self, target, handle):
+        self._target = target
+        self._handle = handle
+
+    __getattr__ = GetAttrProxy("_handle")
+
+    def close(self):
+        """flush the compressed stream and atomically replace the target"""
+        self._handle.close()
+        self._target.close()
+
+    def discard(self):
+        """close without updating the target"""
+        try:
+            self._handle.close()
+        except self.exceptions:
+            pass
+        finally:
+            self._target.discard()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc is not None:
+            self.discard()
+        else:
+            self.close()
+
+
+class _compressed_source(base):
+    """
+    compressed file on disk
+
+    Reads are streamed through a decompressor, so memory use doesn't scale with the
+    size of the file.  Writable handles have the same read-modify-write semantics as
+    other data sources and hold the content in memory; for streaming writes that
+    replace the content use :py:meth:`atomic_bytes_fileobj` or
+    :py:meth:`atomic_text_fileobj`.
+
+    Note that :py:attr:`path` is the path to the compressed file.
     """
 
-    __slots__ = ("path", "mutable")
+    __slots__ = ("path", "mutable", "level")
 
-    def __init__(self, path, mutable=False):
+    # compression level used when writing if one isn't given.
+    default_level = 9
+    encoding = "utf8"
+
+    def __init__(self, path, mutable=False, level=None):
         """
         :param path: file path of the data source
         :param mutable: whether this data source is considered modifiable or not
+        :param level: compression level to use for writes
         """
         base.__init__(self)
         self.path = path
         self.mutable = mutable
+        self.level = self.default_level if level is None else level
+
+    @staticmethod
+    @abc.abstractmethod
+    def _open(target, mode, level):
+        """open a binary (de)compressing stream
+
+        :param target: either a path, or a binary file object that must not be closed
+            when the returned stream is closed.
+        :param mode: `rb` or `wb`
+        :param level: compression level; None for reads.
+        """
+
+    def _check_mutable(self):
+        if not self.mutable:
+            raise TypeError(f"data source {self} is not mutable")
 
     def text_fileobj(self, writable=False):
-        data = compression.decompress_data(
-            "bzip2", fileutils.readfile_bytes(self.path)
-        ).decode()
         if writable:
-            if not self.mutable:
-                raise TypeError(f"data source {self} is not mutable")
-            return text_wr_StringIO(self._set_data, data)
-        return text_ro_StringIO(data)
+            self._check_mutable()
+            return text_wr_StringIO(self._set_data, self.read_text())
+        handle = io.TextIOWrapper(self.bytes_fileobj(), encoding=self.encoding)
+        handle.exceptions = _atomic_compressed_writer.exceptions + (EOFError,)
+        return handle
 
     def bytes_fileobj(self, writable=False):
-        data = compression.decompress_data("bzip2", fileutils.readfile_bytes(self.path))
         if writable:
-            if not self.mutable:
-                raise TypeError(f"data source {self} is not mutable")
-            return bytes_wr_StringIO(self._set_data, data)
-        return bytes_ro_StringIO(data)
+            self._check_mutable()
+            return bytes_wr_StringIO(self._set_data, self.read_bytes())
+        handle = self._open(os.fspath(self.path), "rb", None)
+        handle.exceptions = _atomic_compressed_writer.exceptions + (EOFError,)
+        return handle
+
+    def atomic_bytes_fileobj(self):
+        """streaming bytes writer replacing the content of this source once closed
+
+        :raise: TypeError if immutable
+        """
+        self._check_mutable()
+        target = fileutils.AtomicWriteFile(self.path, binary=True)
+        try:
+            return _atomic_compressed_writer(
+                target, self._open(target, "wb", self.level)
+            )
+        except BaseException:
+            target.discard()
+            raise
+
+    def atomic_text_fileobj(self):
+        """streaming text writer replacing the content of this source once closed
+
+        :raise: TypeError if immutable
+        """
+        writer = self.atomic_bytes_fileobj()
+        writer._handle = io.TextIOWrapper(writer._handle, encoding=self.encoding)
+        return writer
+
+    def _transfer_fileobj(self):
+        return self.atomic_bytes_fileobj()
 
     def _set_data(self, data):
         if isinstance(data, str):
-            data = data.encode()
-        with open(self.path, "wb") as f:
-            f.write(compression.compress_data("bzip2", data))
+            data = data.encode(self.encoding)
+        with self.atomic_bytes_fileobj() as f:
+            f.write(data)
+
+
+class bz2_source(_compressed_source):
+    """
+    locally accessible bz2 archive
+
+    Literally a bz2 file on disk.
+    """
+
+    __slots__ = ()
+
+    @staticmethod
+    def _open(target, mode, level):
+        import bz2
+
+        return bz2.BZ2File(target, mode, compresslevel=9 if level is None else level)
+
+
+class xz_source(_compressed_source):
+    """locally accessible xz compressed file"""
+
+    __slots__ = ()
+    default_level = 6
+
+    @staticmethod
+    def _open(target, mode, level):
+        import lzma
+
+        return lzma.LZMAFile(target, mode, preset=level)
+
+
+class gzip_source(_compressed_source):
+    """locally accessible gzip compressed file"""
+
+    __slots__ = ()
+
+    @staticmethod
+    def _open(target, mode, level):
+        import gzip
+
+        level = 9 if level is None else level
+        if isinstance(target, str):
+            return gzip.GzipFile(target, mode, level)
+        # an empty filename keeps the temporary file's name out of the gzip header.
+        return gzip.GzipFile("", mode, level, fileobj=target)
+
+
+class zstd_source(_compressed_source):
+    """
+    locally accessible zstd compressed file
+
+    This requires either python 3.14's `compression.zstd` or the zstandard module.
+    """
+
+    __slots__ = ()
+    default_level = 3
+
+    @staticmethod
+    def _open(target, mode, level):
+        try:
+            from compression import zstd
+        except ImportError:
+            import zstandard
+
+            if level is None:
+                # the reader isn't an io object; buffering makes it one.
+                return io.BufferedReader(zstandard.open(target, mode))
+            return zstandard.open(
+                target,
+                mode,
+                cctx=zstandard.ZstdCompressor(level=level),
+                closefd=isinstance(target, str),
+            )
+        return zstd.ZstdFile(target, mode, level=level)
 
 
 class data_source(base):
@@ -342,6 +570,19 @@ class data_source(base):
             return bytes_wr_StringIO(self._reset_data, self._convert_data("bytes"))
         return bytes_ro_StringIO(self._convert_data("bytes"))
 
+    def read_bytes(self):
+        return self._convert_data("bytes")
+
+    def read_text(self):
+        return self._convert_data("text")
+
+    # the data is already in memory; there is nothing to gain from a worker thread.
+    async def aread_bytes(self):
+        return self.read_bytes()
+
+    async def aread_text(self):
+        return self.read_text()
+
 
 class text_data_source(data_source):
     """Text data source.
@@ -410,6 +651,12 @@ class invokable_data_source(data_source):
             raise TypeError(f"data source {self} data is immutable")
         return self.data(False)
 
+    # the invokable may block, so these must go through the executor.
+    read_bytes = base.read_bytes
+    read_text = base.read_text
+    aread_bytes = base.aread_bytes
+    aread_text = base.aread_text
+
     @classmethod
     def wrap_function(
         cls, invokable, returns_text=True, returns_handle=False, encoding_hint=None
@@ -469,3 +716,68 @@ class invokable_data_source(data_source):
 def transfer_between_files(read_file, write_file, bufsize=(32 * 1024)):
     while data := read_file.read(bufsize):
         write_file.write(data)
+
+
+# errnos meaning the in kernel copy isn't possible for this pair of files, rather
+# than an actual IO failure.
+_in_kernel_unsupported = frozenset(
+    getattr(errno, x)
+    for x in (
+        "EXDEV",
+        "ENOSYS",
+        "EINVAL",
+        "EOPNOTSUPP",
+        "ENOTSUP",
+        "ENOTSOCK",
+        "EBADF",
+        "EPERM",
+    )
+    if hasattr(errno, x)
+)
+
+
+def _sendfile(src, dest, count):
+    return os.sendfile(dest, src, None, count)
+
+
+# preference order; copy_file_range can reflink rather than copy.
+_in_kernel_copiers: tuple = ()
+if hasattr(os, "copy_file_range"):
+    _in_kernel_copiers += (os.copy_file_range,)
+if hasattr(os, "sendfile"):
+    _in_kernel_copiers += (_sendfile,)
+
+
+def _transfer_in_kernel(path, write_f) -> bool:
+    """copy path into write_f without passing the data through userspace
+
+    :return: False if the copy wasn't possible, in which case nothing was written.
+    """
+    # anything else may transform what's written; compressors for example.
+    if not _in_kernel_copiers or not isinstance(
+        write_f, (io.BufferedRandom, io.BufferedWriter, io.FileIO)
+    ):
+        return False
+    dest = write_f.fileno()
+    src = os.open(path, os.O_RDONLY)
+    try:
+        st = os.fstat(src)
+        # pseudo files (procfs for example) claim a zero size; leave them to the
+        # generic path.
+        if not stat.S_ISREG(st.st_mode) or not st.st_size:
+            return False
+        write_f.flush()
+        for copier in _in_kernel_copiers:
+            copied = 0
+            try:
+                while n := copier(src, dest, 1 << 30):
+                    copied += n
+            except OSError as e:
+                if copied or e.errno not in _in_kernel_unsupported:
+                    raise
+                continue
+            if copied:
+                return True
+        return False
+    finally:
+        os.close(src)
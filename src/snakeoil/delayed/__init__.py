@@ -1,19 +1,132 @@
-__all__ = ("regexp", "import_module", "is_delayed")
+__all__ = (
+    "regexp",
+    "import_module",
+    "is_delayed",
+    "reify",
+    "rebind_globals",
+    "ReificationRecord",
+    "ReificationTrace",
+    "trace_reification",
+)
 
 import functools
 import importlib
+import os
 import re
 import sys
+import time
 import types
 import typing
 
-from ..obj import BaseDelayedObject, DelayedInstantiation
+from .. import obj as _obj
+from ..obj import BaseDelayedObject, DelayedInstantiation, rebind_globals, reify
+
+# Setting this environment variable to a non empty value traces every reification
+# for the life of the process, writing the report to stderr at exit.
+TRACE_ENV_VAR: typing.Final = "SNAKEOIL_DELAYED_TRACE"
+
+
+class ReificationRecord(typing.NamedTuple):
+    """A single delayed object being reified while tracing was active"""
+
+    kind: str
+    target: str
+    # seconds, relative to when the trace started.
+    started: float
+    # seconds spent reifying, inclusive of anything it triggered in turn.
+    duration: float
+    # file:line (function) of the code that forced reification.
+    trigger: str
+
+
+class ReificationTrace:
+    """Collection of reifications recorded by :py:func:`trace_reification`
+
+    This is a context manager; reifications are recorded while it's entered.
+    """
+
+    __slots__ = ("records", "_start")
+
+    def __init__(self) -> None:
+        self.records: list[ReificationRecord] = []
+        self._start = time.perf_counter()
+
+    def __enter__(self) -> "ReificationTrace":
+        _active_traces.append(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        _active_traces.remove(self)
+
+    def sorted(self) -> list[ReificationRecord]:
+        """Records ordered by most expensive first"""
+        return sorted(self.records, key=lambda r: r.duration, reverse=True)
+
+    def report(self, out: typing.TextIO | None = None) -> None:
+        """Write a human readable report, most expensive first"""
+        out = sys.stderr if out is None else out
+        records = self.sorted()
+        total = sum(r.duration for r in records)
+        out.write(
+            f"delayed reification: {len(records)} objects, {total * 1000:.3f}ms total\n"
+        )
+        for r in records:
+            out.write(
+                f"  {r.duration * 1000:9.3f}ms  +{r.started * 1000:.1f}ms  "
+                f"{r.kind:<6}  {r.target}  <- {r.trigger}\n"
+            )
+
+
+_active_traces: list[ReificationTrace] = []
+
+
+def trace_reification() -> ReificationTrace:
+    """Record every delayed module import and regexp compilation reified within the context
+
+    >>> from snakeoil import delayed
+    >>> with delayed.trace_reification() as trace:
+    ...     delayed.regexp("^foo").pattern
+    '^foo'
+    >>> [(r.kind, r.target) for r in trace.records]
+    [('regexp', "'^foo'")]
+    """
+    return ReificationTrace()
+
+
+def _find_trigger() -> str:
+    # walk past the proxy machinery to whatever actually accessed the proxy.
+    internal = (__file__, _obj.__file__)
+    frame = sys._getframe(2)
+    while frame is not None and frame.f_code.co_filename in internal:
+        frame = frame.f_back
+    if frame is None:
+        return "<unknown>"
+    return f"{frame.f_code.co_filename}:{frame.f_lineno} ({frame.f_code.co_name})"
+
+
+def _reify(kind: str, target: str, func: typing.Callable, *args):
+    if not _active_traces:
+        return func(*args)
+    trigger = _find_trigger()
+    start = time.perf_counter()
+    try:
+        return func(*args)
+    finally:
+        end = time.perf_counter()
+        for trace in _active_traces:
+            trace.records.append(
+                ReificationRecord(
+                    kind, target, start - trace._start, end - start, trigger
+                )
+            )
 
 
 @functools.wraps(re.compile)
 def regexp(pattern: str, flags: int = 0):
     """Lazily compile a regexp; reify it only when it's needed"""
-    return DelayedInstantiation(re.Pattern, re.compile, pattern, flags)
+    return DelayedInstantiation(
+        re.Pattern, _reify, "regexp", repr(pattern), re.compile, pattern, flags
+    )
 
 
 def import_module(target: str, force_proxy=False) -> types.ModuleType:
@@ -25,10 +138,19 @@ def import_module(target: str, force_proxy=False) -> types.ModuleType:
     """
     if not force_proxy and (module := sys.modules.get(target, None)) is not None:
         return module
-    return DelayedInstantiation(types.ModuleType, importlib.import_module, target)
+    return DelayedInstantiation(
+        types.ModuleType, _reify, "module", target, importlib.import_module, target
+    )
 
 
 # Convert this to a type guard when py3.14 is min.
 def is_delayed(obj: typing.Any) -> bool:
     cls = object.__getattribute__(obj, "__class__")
-    return isinstance(cls, BaseDelayedObject)
+    return issubclass(cls, BaseDelayedObject)
+
+
+if os.environ.get(TRACE_ENV_VAR):
+    import atexit
+
+    _active_traces.append(_process_trace := ReificationTrace())
+    atexit.register(_process_trace.report)
@@ -5,7 +5,9 @@ file related operations, mainly reading
 import abc
 import mmap
 import os
-from functools import partial
+import time
+import typing
+from functools import cache, partial
 
 from . import _fileutils, data_source
 from .compatibility import IGNORED_EXCEPTIONS
@@ -52,6 +54,31 @@ def mmap_or_open_for_read(path: str):
         raise
 
 
+def _fsync_path(path, data_only: bool = False) -> None:
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        if data_only and hasattr(os, "fdatasync"):
+            os.fdatasync(fd)
+        else:
+            os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class AtomicWriteTiming(typing.NamedTuple):
+    """Seconds spent in each phase of closing an :py:class:`AtomicWriteFile`"""
+
+    path: str
+    durability: str
+    # flushing and closing the temp file.
+    close: float
+    # syncing the temp file's data to disk.
+    sync: float
+    rename: float
+    # syncing the directory so the rename is durable.
+    directory_sync: float
+
+
 class AtomicWriteFile_mixin(abc.ABC):
     """File class that stores the changes in a tempfile.
 
@@ -67,9 +94,27 @@ class AtomicWriteFile_mixin(abc.ABC):
 
     If this object falls out of memory without ever being discarded nor
     closed, the contents are discarded and a warning is issued.
+
+    How durable the update is against a crash is controlled by `durability`:
+
+    * `none`: nothing is synced; after a crash the target may be empty or missing
+      its new content.
+    * `data`: the new content is synced to disk before the rename, so the target
+      is either the old or the new content- but the rename itself may be lost.
+    * `full`: additionally the directory is synced after the rename, so once close
+      returns the update survives a crash.
     """
 
-    __slots__ = ("_is_finalized", "_computed_mode", "_original_fp", "_temp_fp")
+    __slots__ = (
+        "_is_finalized",
+        "_computed_mode",
+        "_original_fp",
+        "_temp_fp",
+        "_durability",
+        "_timing_hook",
+    )
+
+    durability_modes: typing.ClassVar = ("none", "data", "full")
 
     @abc.abstractmethod
     def _actual_init(self) -> None: ...
@@ -77,15 +122,33 @@ class AtomicWriteFile_mixin(abc.ABC):
     @abc.abstractmethod
     def _real_close(self) -> None: ...
 
-    def __init__(self, fp, binary=False, perms=None, uid=-1, gid=-1):
+    def __init__(
+        self,
+        fp,
+        binary=False,
+        perms=None,
+        uid=-1,
+        gid=-1,
+        durability: typing.Literal["none", "data", "full"] = "none",
+        timing_hook: typing.Callable[[AtomicWriteTiming], None] | None = None,
+    ):
         """
         :param fp: filepath to write to upon close
         :param binary: should we open the file in binary mode?
         :param perms: if specified, permissions we should force for the file.
         :param uid: if specified, the uid to force for the file.
         :param gid: if specified, the uid to force for the file.
+        :param durability: one of `none`, `data`, or `full`; see the class docs.
+        :param timing_hook: if given, invoked with an :py:class:`AtomicWriteTiming`
+            after a successful close.
         """
         self._is_finalized = True
+        if durability not in self.durability_modes:
+            raise ValueError(
+                f"durability must be one of {self.durability_modes}: {durability!r}"
+            )
+        self._durability = durability
+        self._timing_hook = timing_hook
         if binary:
             file_mode = "wb"
         else:
@@ -133,10 +196,34 @@ class AtomicWriteFile_mixin(abc.ABC):
 
         Note that if we're already closed, this method does nothing
         """
-        if not self._is_finalized:
-            self._real_close()
-            os.rename(self._temp_fp, self._original_fp)
-            self._is_finalized = True
+        if self._is_finalized:
+            return
+        start = time.perf_counter()
+        self._real_close()
+        closed = time.perf_counter()
+        if self._durability != "none":
+            _fsync_path(self._temp_fp, data_only=True)
+        synced = time.perf_counter()
+        self._rename()
+        renamed = time.perf_counter()
+        if self._durability == "full":
+            _fsync_path(os.path.dirname(self._original_fp))
+        if self._timing_hook is not None:
+            self._timing_hook(
+                AtomicWriteTiming(
+                    self._original_fp,
+                    self._durability,
+                    closed - start,
+                    synced - closed,
+                    renamed - synced,
+                    time.perf_counter() - renamed,
+                )
+            )
+
+    def _rename(self):
+        """Rename the closed temp file over the target"""
+        os.rename(self._temp_fp, self._original_fp)
+        self._is_finalized = True
 
     def __del__(self):
         self.discard()
@@ -157,6 +244,283 @@ class AtomicWriteFile(AtomicWriteFile_mixin):
     __getattr__ = GetAttrProxy("raw")
 
 
+@cache
+def _get_syncfs():
+    # python doesn't expose syncfs(2); it's linux only.
+    try:
+        import ctypes
+
+        func = ctypes.CDLL(None, use_errno=True).syncfs
+    except (ImportError, OSError, AttributeError):
+        return None
+    func.argtypes = (ctypes.c_int,)
+    return func
+
+
+def _syncfs_path(path) -> bool:
+    """syncfs the filesystem holding path, returning False if syncfs isn't available"""
+    if (syncfs := _get_syncfs()) is None:
+        return False
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        if syncfs(fd) != 0:
+            import ctypes
+
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err), path)
+    finally:
+        os.close(fd)
+    return True
+
+
+class AtomicWriteBatch:
+    """Stage writes to many files, atomically replacing each target on commit
+
+    This is :py:class:`AtomicWriteFile` for bulk updates.  Each file is written to a
+    temp file in the target's directory.  On :py:meth:`commit` all staged files are
+    flushed to disk, renamed over their targets, and then each directory touched is
+    synced once.  That's a single durability barrier for the whole batch rather than
+    one per file.
+
+    Each file is replaced atomically, but the batch as a whole is not; if a crash
+    occurs during commit, some targets may be updated and others not.
+
+    Used as a context manager the batch is committed on success, and discarded if an
+    exception is raised.
+
+    >>> with AtomicWriteBatch() as batch:  # doctest: +SKIP
+    ...     for path, data in entries:
+    ...         batch.write(path, data)
+    """
+
+    __slots__ = ("durable", "syncfs", "workers", "_staged", "_is_finalized")
+
+    def __init__(self, durable: bool = True, syncfs: bool = False, workers=None):
+        """
+        :param durable: if False, nothing is synced to disk; renames are still atomic.
+        :param syncfs: if True, sync each touched filesystem via `syncfs(2)` instead of
+            fsyncing each file.  This is faster for large batches, but also flushes
+            any unrelated dirty data on those filesystems.  Falls back to fsync if
+            syncfs isn't available.
+        :param workers: number of threads used to fsync files in parallel.  Defaults
+            to what :py:class:`concurrent.futures.ThreadPoolExecutor` picks.
+        """
+        self.durable = durable
+        self.syncfs = syncfs
+        self.workers = workers
+        self._staged: dict[str, AtomicWriteFile] = {}
+        self._is_finalized = False
+
+    def open(self, fp, binary=False, perms=None, uid=-1, gid=-1) -> typing.IO:
+        """Stage a file, returning a file handle to write its content to
+
+        If the target was already staged in this batch, the earlier staging is
+        discarded.  The returned handle may be closed by the caller, but needn't be;
+        it's closed when the next file is staged, so only one is open at a time
+        regardless of the batch size.  Write its content before then.
+
+        :param fp: filepath to write to upon commit
+        :param binary: should we open the file in binary mode?
+        :param perms: if specified, permissions we should force for the file.
+        :param uid: if specified, the uid to force for the file.
+        :param gid: if specified, the uid to force for the file.
+        """
+        if self._is_finalized:
+            raise ValueError("batch was already committed or discarded")
+        fp = os.path.realpath(fp)
+        if self._staged:
+            # staged files are synced by path on commit; their handles aren't needed.
+            next(reversed(self._staged.values()))._real_close()
+        if fp in self._staged:
+            self._staged.pop(fp).discard()
+        # syncing is done for the batch as a whole on commit.
+        self._staged[fp] = AtomicWriteFile(
+            fp, binary=binary, perms=perms, uid=uid, gid=gid
+        )
+        return self._staged[fp].raw
+
+    def write(self, fp, data: str | bytes, **kwargs) -> None:
+        """Stage a file with the given content; see :py:meth:`open` for arguments"""
+        with self.open(fp, binary=isinstance(data, bytes), **kwargs) as f:
+            f.write(data)
+
+    def __len__(self) -> int:
+        return len(self._staged)
+
+    def discard(self) -> None:
+        """Discard all staged files without updating any target"""
+        if self._is_finalized:
+            return
+        self._is_finalized = True
+        staged, self._staged = self._staged, {}
+        for atomic in staged.values():
+            atomic.discard()
+
+    def _sync_files(self, temp_fps) -> None:
+        if self.syncfs:
+            # one syncfs per filesystem.  This only fails if syncfs is unavailable,
+            # in which case fall back to fsync.
+            devices = {}
+            for temp_fp in temp_fps:
+                devices.setdefault(os.stat(temp_fp).st_dev, temp_fp)
+            if all(_syncfs_path(path) for path in devices.values()):
+                return
+        if len(temp_fps) == 1:
+            _fsync_path(temp_fps[0])
+            return
+        from concurrent import futures
+
+        with futures.ThreadPoolExecutor(
+            self.workers, thread_name_prefix="AtomicWriteBatch"
+        ) as executor:
+            # consume the results so failures are raised.
+            for _ in executor.map(_fsync_path, temp_fps):
+                pass
+
+    def commit(self) -> None:
+        """Flush all staged files to disk and atomically rename them over their targets
+
+        If a failure occurs, any staged files not yet renamed are discarded.
+        """
+        if self._is_finalized:
+            return
+        self._is_finalized = True
+        staged, self._staged = self._staged, {}
+        try:
+            for atomic in staged.values():
+                atomic._real_close()
+            if self.durable and staged:
+                self._sync_files([atomic._temp_fp for atomic in staged.values()])
+            directories = set()
+            for fp, atomic in list(staged.items()):
+                atomic._rename()
+                del staged[fp]
+                directories.add(os.path.dirname(fp))
+            if self.durable:
+                # make the renames themselves durable.
+                for directory in directories:
+                    _fsync_path(directory)
+        finally:
+            for atomic in staged.values():
+                atomic.discard()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc is not None:
+            self.discard()
+        else:
+            self.commit()
+
+    def __del__(self):
+        self.discard()
+
+
+def _read_whole(path, binary: bool, encoding: str):
+    fd = os.open(path, os.O_RDONLY | os.O_CLOEXEC)
+    try:
+        data = _fileutils._read_fd(fd, os.fstat(fd).st_size)
+    finally:
+        os.close(fd)
+    return data if binary else data.decode(encoding)
+
+
+def _hint_willneed(path):
+    # start readahead of a queued file before a worker gets to it.  Failures are
+    # left for the worker to report.
+    try:
+        fd = os.open(path, os.O_RDONLY | os.O_CLOEXEC)
+    except OSError:
+        return
+    try:
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _read_whole_or_exception(path, binary: bool, encoding: str):
+    try:
+        return _read_whole(path, binary, encoding)
+    except Exception as e:
+        return e
+
+
+def read_many(
+    paths: typing.Iterable[str | os.PathLike[str]],
+    mode: str = "r",
+    encoding: str = "utf8",
+    workers: int | None = None,
+    ordered: bool = True,
+    readahead: int | None = None,
+) -> typing.Iterator[tuple[typing.Any, str | bytes | Exception]]:
+    """Read many files in parallel threads, yielding `(path, content)` pairs
+
+    This is intended for reading large numbers of small files, where reading them one
+    after another is latency bound- cold caches or network filesystems for example.
+    Files are read in a thread pool, each in full with a single read sized from
+    `fstat`, so reads across files are overlapped.  Where available, a
+    `posix_fadvise(WILLNEED)` hint is issued for each file as it's queued, so the
+    kernel starts fetching it before a worker is free to read it.
+
+    Failures do not stop iteration; instead the exception is yielded as the content
+    for that path.  Check via `isinstance(content, Exception)`.
+
+    Paths are consumed lazily; at most `readahead` reads are in flight at once, so
+    this is safe to use with very large or unbounded iterables.  If the consumer stops
+    iterating early, pending reads are cancelled.
+
+    :param paths: paths to read
+    :param mode: `"r"` for text, `"rb"` for bytes
+    :param encoding: encoding used for text mode
+    :param workers: number of reader threads.  Defaults to what
+        :py:class:`concurrent.futures.ThreadPoolExecutor` picks.
+    :param ordered: if True, results are yielded in the order of `paths`.  If False
+        they're yielded as they complete, which avoids one slow file stalling the rest.
+    :param readahead: maximum reads in flight; defaults to four times the worker count.
+    """
+    from concurrent import futures
+
+    if mode not in ("r", "rb"):
+        raise ValueError(f"mode must be 'r' or 'rb', got {mode!r}")
+    binary = mode == "rb"
+    if workers is None:
+        # same default as ThreadPoolExecutor.
+        workers = min(32, (os.cpu_count() or 1) + 4)
+    if readahead is None:
+        readahead = workers * 4
+    paths = iter(paths)
+    executor = futures.ThreadPoolExecutor(workers, thread_name_prefix="read_many")
+    # insertion order is submission order, which is what ordered mode relies on.
+    pending: dict[futures.Future, typing.Any] = {}
+    hint = hasattr(os, "posix_fadvise")
+
+    def fill():
+        for path in paths:
+            if hint:
+                _hint_willneed(path)
+            future = executor.submit(_read_whole_or_exception, path, binary, encoding)
+            pending[future] = path
+            if len(pending) >= readahead:
+                break
+
+    try:
+        fill()
+        while pending:
+            if ordered:
+                done = (next(iter(pending)),)
+            else:
+                done, _ = futures.wait(pending, return_when=futures.FIRST_COMPLETED)
+            for future in done:
+                path = pending.pop(future)
+                yield path, future.result()
+            fill()
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
 def _mk_pretty_derived_func(func, name_base: str, name: str, *args, **kwds):
     if name:
         name = "_" + name
@@ -178,3 +542,13 @@ _mk_readlines = partial(
 readlines_ascii = _mk_readlines("ascii", "r", encoding="ascii")
 readlines_utf8 = _mk_readlines("utf8", "r", encoding="utf8")
 readlines = readlines_utf8
+
+
+_mk_readlines_bulk = partial(
+    _mk_pretty_derived_func, _fileutils.native_readlines_bulk, "readlines_bulk"
+)
+
+readlines_bulk_ascii = _mk_readlines_bulk("ascii", "r", encoding="ascii")
+readlines_bulk_bytes = _mk_readlines_bulk("bytes", "rb")
+readlines_bulk_utf8 = _mk_readlines_bulk("utf8", "r", encoding="utf8")
+readlines_bulk = readlines_bulk_utf8
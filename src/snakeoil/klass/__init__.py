@@ -39,6 +39,8 @@ __all__ = (
 
 import abc
 import inspect
+import keyword
+import types
 import typing
 from collections import deque
 from operator import attrgetter
@@ -167,6 +169,162 @@ def abstractclassvar(_: type[T]) -> T:
     return typing.cast(T, _abstractclassvar())
 
 
+class _Missing:
+    """Stand in for an absent attribute during comparisons; orders before everything else"""
+
+    __slots__ = ()
+
+    def __eq__(self, other):
+        return self is other
+
+    __hash__ = object.__hash__
+
+    def __lt__(self, other):
+        return self is not other
+
+    def __le__(self, other):
+        return True
+
+    def __gt__(self, other):
+        return False
+
+    def __ge__(self, other):
+        return self is other
+
+    def __repr__(self):
+        return "<missing attribute>"
+
+
+_missing = _Missing()
+
+
+def _attr_comparison_key(obj, attrs: tuple[str, ...]) -> tuple:
+    """The tuple of attributes that comparisons are performed against"""
+    return tuple(getattr(obj, attr, _missing) for attr in attrs)
+
+
+# Templates for the methods generated by _compile_attr_comparison.  {attrs}
+# and {value_attrs} are the tuple displays of the compared attributes, IE
+# "(self.x, self.y,)".  Should any attribute be missing the generated code
+# falls back to _attr_comparison_key, which orders missing attributes first.
+_attr_comparison_templates = {
+    "__eq__": """
+def __eq__(self, value):
+    if self is value:
+        return True
+    try:
+        return {attrs} == {value_attrs}
+    except AttributeError:
+        return _key(self, _attrs) == _key(value, _attrs)
+""",
+    "__hash__": """
+def __hash__(self):
+    try:
+        return hash({attrs})
+    except AttributeError:
+        return hash(_key(self, _attrs))
+""",
+    "__sort_key__": """
+def __sort_key__(self):
+    try:
+        return {attrs}
+    except AttributeError:
+        return _key(self, _attrs)
+""",
+}
+# the cache_sort_key=True variants; the key is stored in _sort_key.
+_cached_sort_key_templates = {
+    "__sort_key__": """
+def __sort_key__(self):
+    try:
+        return self._sort_key
+    except AttributeError:
+        pass
+    try:
+        key = {attrs}
+    except AttributeError:
+        key = _key(self, _attrs)
+    object.__setattr__(self, "_sort_key", key)
+    return key
+""",
+}
+for _name, _op, _identity in (
+    ("__lt__", "<", False),
+    ("__le__", "<=", True),
+    ("__gt__", ">", False),
+    ("__ge__", ">=", True),
+):
+    _attr_comparison_templates[_name] = f"""
+def {_name}(self, value, attr_comparison_override=None):
+    if attr_comparison_override is not None:
+        return _generic(self, value, attr_comparison_override)
+    if self is value:
+        return {_identity}
+    try:
+        return {{attrs}} {_op} {{value_attrs}}
+    except AttributeError:
+        return _key(self, _attrs) {_op} _key(value, _attrs)
+"""
+    _cached_sort_key_templates[_name] = f"""
+def {_name}(self, value, attr_comparison_override=None):
+    if attr_comparison_override is not None:
+        return _generic(self, value, attr_comparison_override)
+    if self is value:
+        return {_identity}
+    try:
+        return self.__sort_key__() {_op} value.__sort_key__()
+    except AttributeError:
+        return _key(self, _attrs) {_op} _key(value, _attrs)
+"""
+del _name, _op, _identity
+
+
+def _attr_comparison_hash(self) -> int:
+    """hash of the attributes listed in self.__attr_comparison__"""
+    return hash(_attr_comparison_key(self, self.__attr_comparison__))
+
+
+def _is_generated(func) -> bool:
+    return getattr(func, "__generated_attr_comparison__", False)
+
+
+def _compile_attr_comparison(
+    cls: type,
+    name: str,
+    generic: typing.Callable[..., typing.Any],
+    templates: dict[str, str] = _attr_comparison_templates,
+) -> None:
+    """Generate a comparison method specialized to cls.__attr_comparison__
+
+    This is the equivalent of what dataclasses does; the attribute walk is
+    unrolled into a tuple comparison so the cost is near native tuple speed.
+    If the attributes can't be expressed as code (a property controlling
+    __attr_comparison__ for example), generic is used instead.
+    """
+    attrs = cls.__attr_comparison__
+    if not isinstance(attrs, tuple) or not all(
+        isinstance(attr, str) and attr.isidentifier() and not keyword.iskeyword(attr)
+        for attr in attrs
+    ):
+        setattr(cls, name, generic)
+        return
+    display = "({},)".format
+    scope = {"_attrs": attrs, "_key": _attr_comparison_key, "_generic": generic}
+    exec(
+        templates[name].format(
+            attrs=display(", ".join(f"self.{attr}" for attr in attrs)),
+            value_attrs=display(", ".join(f"value.{attr}" for attr in attrs)),
+        ),
+        scope,
+    )
+    func = scope[name]
+    func.__qualname__ = f"{cls.__qualname__}.{name}"
+    func.__module__ = cls.__module__
+    func.__doc__ = generic.__doc__
+    func.__generated_attr_comparison__ = True
+    setattr(cls, name, func)
+
+
 class GenericEquality(abc.ABC):
     """
     implement simple __eq__/__ne__ comparison via a list of attributes to compare
@@ -177,6 +335,10 @@ class GenericEquality(abc.ABC):
     If you need to extend the logic beyond just adding an attribute, override __eq__; __ne__
     is just a negated reflection of that methods result.
 
+    For each concrete subclass a specialized __eq__ is generated that compares a tuple
+    of the attributes, rather than walking __attr_comparison__ per comparison.  Pass
+    `hashable=True` in the class creation to also generate a matching __hash__.
+
     >>> from snakeoil.klass import GenericEquality
     >>> class kls(GenericEquality):
     ...   __attr_comparison__ = ("a", "b", "c")
@@ -198,6 +360,8 @@ class GenericEquality(abc.ABC):
 
     __attr_comparison__: typing.ClassVar[tuple[str, ...]]
 
+    __compiled_comparisons__: typing.ClassVar[tuple[str, ...]] = ("__eq__",)
+
     def __eq__(self, value) -> bool:
         """
         Comparison is down via comparing attributes listed in self.__attr_comparison__,
@@ -214,6 +378,7 @@ class GenericEquality(abc.ABC):
     def __init_subclass__(
         cls,
         compare_slots=False,
+        hashable=False,
         **kwargs,
     ) -> None:
         if compare_slots:
@@ -231,66 +396,110 @@ class GenericEquality(abc.ABC):
                     )
                 all_slots.extend(slot.slots)
             cls.__attr_comparison__ = tuple(unique_stable(all_slots))
-            return super().__init_subclass__(**kwargs)
 
-        if inspect.isabstract(cls):
+        elif inspect.isabstract(cls):
             return super().__init_subclass__(**kwargs)
 
         elif not isinstance(cls.__attr_comparison__, (tuple, property)):
             raise TypeError(
                 f"__attr_comparison__ must be a tuple, received {cls.__attr_comparison__!r}"
             )
+        for base in reversed(cls.__mro__):
+            for name in base.__dict__.get("__compiled_comparisons__", ()):
+                # only replace the generic implementation or one we generated;
+                # anything explicitly overridden in the MRO is left alone.
+                if name not in cls.__dict__ and (
+                    getattr(cls, name) is getattr(base, name)
+                    or _is_generated(getattr(cls, name))
+                ):
+                    _compile_attr_comparison(cls, name, getattr(base, name))
+        if "__hash__" not in cls.__dict__ or cls.__dict__["__hash__"] is None:
+            if hashable or _is_generated(cls.__hash__):
+                _compile_attr_comparison(cls, "__hash__", _attr_comparison_hash)
         return super().__init_subclass__(**kwargs)
 
 
 class GenericRichComparison(GenericEquality):
+    """
+    :py:class:`GenericEquality` extended with ordering comparisons.
+
+    Ordering is lexicographic across __attr_comparison__, just as tuples are;
+    an attribute that is missing orders before any value.  For sorting, use
+    `key=kls.__sort_key__` which returns the tuple being compared.
+
+    Pass `cache_sort_key=True` in the class creation to compute that tuple once
+    per instance, storing it in `_sort_key`; ordering comparisons then compare
+    the cached keys.  This is only valid if the compared attributes never
+    change; slotted classes must provide a `_sort_key` slot, which must not be
+    compared.
+    """
+
     __slots__ = ()
 
-    def __lt__(self, value, attr_comparison_override: tuple[str, ...] | None = None):
-        if self is value:
-            return False
+    __compiled_comparisons__ = ("__lt__", "__le__", "__gt__", "__ge__", "__sort_key__")
+
+    __cache_sort_key__: typing.ClassVar[bool] = False
+
+    def __init_subclass__(cls, cache_sort_key=False, **kwargs) -> None:
+        super().__init_subclass__(**kwargs)
+        if cache_sort_key:
+            cls.__cache_sort_key__ = True
+        if not cls.__cache_sort_key__ or inspect.isabstract(cls):
+            return
+        if not cls.__dictoffset__ and not isinstance(
+            getattr(cls, "_sort_key", None), types.MemberDescriptorType
+        ):
+            raise TypeError(
+                f"cache_sort_key=True requires {cls!r} to have a __dict__ or a _sort_key slot"
+            )
+        for name in GenericRichComparison.__compiled_comparisons__:
+            # like the uncached versions, explicit overrides are left alone.
+            if name not in cls.__dict__ or _is_generated(cls.__dict__[name]):
+                if _is_generated(getattr(cls, name)):
+                    _compile_attr_comparison(
+                        cls,
+                        name,
+                        getattr(GenericRichComparison, name),
+                        _cached_sort_key_templates,
+                    )
+
+    def __sort_key__(self) -> tuple:
+        """The tuple of attributes used for ordering comparisons"""
+        return _attr_comparison_key(self, self.__attr_comparison__)
+
+    def _compare_keys(self, value, attr_comparison_override):
         attrlist = (
             self.__attr_comparison__
             if attr_comparison_override is None
             else attr_comparison_override
         )
-        for attr in attrlist:
-            obj1, obj2 = getattr(self, attr, sentinel), getattr(value, attr, sentinel)
-            if obj1 is sentinel:
-                if obj2 is sentinel:
-                    continue
-                return True
-            elif obj2 is sentinel:
-                return False
-            if not (obj1 >= obj2):  # pyright: ignore[reportOperatorIssue]
-                return True
-        return False
+        return _attr_comparison_key(self, attrlist), _attr_comparison_key(
+            value, attrlist
+        )
+
+    def __lt__(self, value, attr_comparison_override: tuple[str, ...] | None = None):
+        if self is value:
+            return False
+        key1, key2 = self._compare_keys(value, attr_comparison_override)
+        return key1 < key2
 
     def __le__(self, value, attr_comparison_override: tuple[str, ...] | None = None):
         if self is value:
             return True
-        attrlist = (
-            self.__attr_comparison__
-            if attr_comparison_override is None
-            else attr_comparison_override
-        )
-        for attr in attrlist:
-            obj1, obj2 = getattr(self, attr, sentinel), getattr(value, attr, sentinel)
-            if obj1 is sentinel:
-                if obj2 is sentinel:
-                    continue
-                return True
-            elif obj2 is sentinel:
-                return False
-            if not (obj1 > obj2):  # pyright: ignore[reportOperatorIssue]
-                return True
-        return False
+        key1, key2 = self._compare_keys(value, attr_comparison_override)
+        return key1 <= key2
 
     def __gt__(self, value, attr_comparison_override: tuple[str, ...] | None = None):
-        return not self.__le__(value, attr_comparison_override=attr_comparison_override)
+        if self is value:
+            return False
+        key1, key2 = self._compare_keys(value, attr_comparison_override)
+        return key1 > key2
 
     def __ge__(self, value, attr_comparison_override: tuple[str, ...] | None = None):
-        return not self.__lt__(value, attr_comparison_override=attr_comparison_override)
+        if self is value:
+            return True
+        key1, key2 = self._compare_keys(value, attr_comparison_override)
+        return key1 >= key2
 
 
 @deprecated(
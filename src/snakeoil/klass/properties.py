@@ -9,7 +9,9 @@ __all__ = (
 # we suppress the repr since if it's unmodified, it'll expose the id;
 # this annoyingly means our docs have to be recommitted every change,
 # even if no real code changed (since the id() continually moves)...
+import keyword
 import operator
+import types
 import typing
 
 from .._klass import alias_method
@@ -27,38 +29,89 @@ _uncached_singleton = kls()
 del kls
 
 
-def _internal_jit_attr(
-    func, attr_name, singleton=None, use_cls_setattr=False, use_singleton=True, doc=None
-):
-    """Object implementing the descriptor protocol for use in Just In Time access to attributes.
+# Template for the accessor generated for slotted classes; see
+# _internal_jit_attr.__set_name__.  This is compiled per attribute so the
+# storage lookup is a plain attribute load rather than a getattr call.
+_slotted_getter_template = """
+def __get__(self, instance, obj_type):
+    if instance is None:
+        return self
+    try:
+        obj = instance.{storage_attr}
+    except AttributeError:
+        return _generate(instance)
+    if obj is _singleton:
+        return _generate(instance)
+    return obj
+"""
 
-    Consumers should likely be using the :py:func:`jit_func` line of helper functions
-    instead of directly consuming this.
-    """
-    doc = getattr(func, "__doc__", None) if doc is None else doc
 
-    class _internal_jit_attr(_raw_internal_jit_attr):
-        __doc__ = doc
-        __slots__ = ()
+class _slotted_jit_attr:
+    # Base of the accessors generated by _internal_jit_attr.__set_name__.  These
+    # are non data descriptors, as the generic one is, so instances with a
+    # __dict__- of subclasses of the slotted class- can still assign or shadow
+    # the attribute.
 
-    kls = _internal_jit_attr
+    __slots__ = ("function",)
 
-    return kls(
-        func,
-        attr_name,
-        singleton=singleton,
-        use_cls_setattr=use_cls_setattr,
-        use_singleton=use_singleton,
-    )
+    def __init__(self, function):
+        self.function = function
+
+
+def _make_slotted_accessor(owner, name, storage_attr, member, func, singleton, doc):
+    setter = member.__set__
+
+    def _generate(instance):
+        obj = func(instance)
+        setter(instance, obj)
+        return obj
 
+    scope = {"_generate": _generate, "_singleton": singleton}
+    exec(_slotted_getter_template.format(storage_attr=storage_attr), scope)
+    # a class per attribute lets __get__ itself be compiled, and carry the docs.
+    kls = type(
+        name,
+        (_slotted_jit_attr,),
+        {"__slots__": (), "__doc__": doc, "__get__": scope["__get__"]},
+    )
+    kls.__qualname__ = f"{owner.__qualname__}.{name}"
+    return kls(func)
+
+
+class _internal_jit_attr:
+    # Object implementing the descriptor protocol for use in Just In Time access
+    # to attributes.  Consumers should likely be using the :py:func:`jit_attr`
+    # line of helper functions instead of directly consuming this.
+    #
+    # This intentionally has no class docstring; __doc__ is a property so each
+    # descriptor carries the docs of the function it wraps.
+
+    __slots__ = (
+        "storage_attr",
+        "function",
+        "_setter",
+        "singleton",
+        "use_singleton",
+        "_doc",
+    )
 
-class _raw_internal_jit_attr:
-    """See _internal_jit_attr; this is an implementation detail of that"""
+    __doc__ = property(lambda self: self._doc)
 
-    __slots__ = ("storage_attr", "function", "_setter", "singleton", "use_singleton")
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # class creation sets __doc__ to None when there's no docstring, which
+        # would hide the wrapped function's docs on instances.
+        if cls.__dict__.get("__doc__") is None:
+            cls.__doc__ = _internal_jit_attr.__dict__["__doc__"]
 
     def __init__(
-        self, func, attr_name, singleton=None, use_cls_setattr=False, use_singleton=True
+        self,
+        func,
+        attr_name,
+        singleton=None,
+        use_cls_setattr=False,
+        use_singleton=True,
+        doc=None,
     ):
         """
         :param func: function to invoke upon first request for this content
@@ -73,6 +126,7 @@ class _raw_internal_jit_attr:
             (and this is enforced by a __setattr__), use_cls_setattr=True would be warranted
             to bypass that protection for caching the hash value
         :type use_cls_setattr: boolean
+        :param doc: docstring to expose; defaults to the docstring of func
         """
         if bool(use_cls_setattr):
             self._setter = setattr
@@ -82,6 +136,47 @@ class _raw_internal_jit_attr:
         self.storage_attr = attr_name
         self.singleton = singleton
         self.use_singleton = use_singleton
+        self._doc = getattr(func, "__doc__", None) if doc is None else doc
+
+    def __set_name__(self, owner, name):
+        """Replace this descriptor with a compiled accessor if the owner is slotted
+
+        When the storage attribute is a slot of a class whose instances have no
+        __dict__, the generic __get__ is replaced with a generated accessor that
+        loads the slot directly.  Anything else- subclasses of this descriptor,
+        use_cls_setattr, custom __getattribute__, or storage that isn't a slot-
+        keeps the generic path.
+        """
+        if (
+            type(self) is not _internal_jit_attr
+            or not self.use_singleton
+            or self._setter is not object.__setattr__
+            or owner.__dictoffset__
+            or owner.__getattribute__ is not object.__getattribute__
+            or not self.storage_attr.isidentifier()
+            or keyword.iskeyword(self.storage_attr)
+        ):
+            return
+        for base in owner.__mro__:
+            if (member := base.__dict__.get(self.storage_attr)) is not None:
+                break
+        else:
+            return
+        if not isinstance(member, types.MemberDescriptorType):
+            return
+        setattr(
+            owner,
+            name,
+            _make_slotted_accessor(
+                owner,
+                name,
+                self.storage_attr,
+                member,
+                self.function,
+                self.singleton,
+                self._doc,
+            ),
+        )
 
     def __get__(self, instance, obj_type):
         if instance is None:
@@ -102,6 +197,10 @@ class _raw_internal_jit_attr:
         return obj
 
 
+# compatibility alias; this used to be the base of per attribute subclasses.
+_raw_internal_jit_attr = _internal_jit_attr
+
+
 T = typing.TypeVar("T")
 
 
@@ -73,11 +73,10 @@ If that doesn't make sense to the reader, it's probably best that the reader not
 try to proxy builtin objects like tuples, lists, dicts, sets, etc.
 """
 
-__all__ = ("DelayedInstantiation", "make_kls")
+__all__ = ("DelayedInstantiation", "make_kls", "reify", "rebind_globals")
 
 import typing
-
-from ._klass import alias_method
+from collections.abc import MutableMapping
 
 # For our proxy, we have two sets of descriptors-
 # common, "always there" descriptors that come from
@@ -109,6 +108,26 @@ if hasattr(object, "__sizeof__"):
 base_kls_descriptors = frozenset(base_kls_descriptors)
 
 
+def _proxy_method(
+    name: str, doc: str | None = None
+) -> typing.Callable[..., typing.Any]:
+    """Generate a method forwarding to the proxied object, instantiating it if needed
+
+    This reaches directly into the proxy slots rather than bouncing through the
+    proxy's __getattribute__.
+    """
+
+    def _proxied(self, *a, **kw):
+        obj = object.__getattribute__(self, "__obj__")
+        if obj is None:
+            obj = object.__getattribute__(self, "__instantiate_proxy_instance__")()
+        return getattr(obj, name)(*a, **kw)
+
+    _proxied.__name__ = name
+    _proxied.__doc__ = doc if doc is not None else f"Proxy to the instance's {name}"
+    return _proxied
+
+
 class BaseDelayedObject:
     """
     Base proxying object
@@ -119,7 +138,7 @@ class BaseDelayedObject:
     methods.
     """
 
-    __slots__ = ("__delayed__", "__obj__")
+    __slots__ = ("__delayed__", "__obj__", "__rebind__")
 
     def __new__(cls, desired_kls, func, *a, **kwd):
         """
@@ -131,6 +150,7 @@ class BaseDelayedObject:
         o = object.__new__(cls)
         object.__setattr__(o, "__delayed__", (desired_kls, func, a, kwd))
         object.__setattr__(o, "__obj__", None)
+        object.__setattr__(o, "__rebind__", None)
         return o
 
     def __getattribute__(self, attr):
@@ -145,7 +165,7 @@ class BaseDelayedObject:
             obj = object.__getattribute__(self, "__instantiate_proxy_instance__")()
 
         if attr == "__obj__":
-            # special casing for klass.alias_method
+            # special casing for klass.alias_method consumers
             return obj
         return getattr(obj, attr)
 
@@ -154,13 +174,16 @@ class BaseDelayedObject:
         obj = delayed[1](*delayed[2], **delayed[3])
         object.__setattr__(self, "__obj__", obj)
         object.__delattr__(self, "__delayed__")
+        if (rebind := object.__getattribute__(self, "__rebind__")) is not None:
+            object.__setattr__(self, "__rebind__", None)
+            for namespace, name in rebind:
+                if namespace.get(name) is self:
+                    namespace[name] = obj
         return obj
 
     # special case the normal descriptors
     for x in base_kls_descriptors:
-        locals()[x] = alias_method(
-            "__obj__.%s" % (x,), doc=getattr(getattr(object, x), "__doc__", None)
-        )
+        locals()[x] = _proxy_method(x, doc=getattr(getattr(object, x), "__doc__", None))
     # pylint: disable=undefined-loop-variable
     del x
 
@@ -258,7 +281,7 @@ kls_descriptors = frozenset(
 
 
 kls_descriptors = kls_descriptors.difference(base_kls_descriptors)
-descriptor_overrides = {k: alias_method(f"__obj__.{k}") for k in kls_descriptors}
+descriptor_overrides = {k: _proxy_method(k) for k in kls_descriptors}
 
 _method_cache = {}
 
@@ -320,3 +343,58 @@ def DelayedInstantiation(
         o = make_kls(resultant_kls)
         _class_cache[resultant_kls] = o
     return o(resultant_kls, func, *a, **kwd)  # pyright: ignore[reportReturnType]
+
+
+def reify(obj: T) -> T:
+    """Return the real object behind a delayed instantiation proxy
+
+    If the proxy hasn't been instantiated yet, this forces it.  Anything that isn't
+    a proxy is returned as is, so this is safe to use on values that may or may not
+    be delayed.  Use this when a proxy is used in a hot path; accessing attributes
+    through the proxy costs a python level __getattribute__ call per access.
+
+    >>> from snakeoil.obj import DelayedInstantiation, reify
+    >>> import re
+    >>> pattern = DelayedInstantiation(re.Pattern, re.compile, "^foo")
+    >>> type(reify(pattern)) is re.Pattern
+    True
+    """
+    if not issubclass(object.__getattribute__(obj, "__class__"), BaseDelayedObject):
+        return obj
+    if (real := object.__getattribute__(obj, "__obj__")) is None:
+        real = object.__getattribute__(obj, "__instantiate_proxy_instance__")()
+    return real
+
+
+def rebind_globals(
+    namespace: MutableMapping[str, typing.Any],
+    names: typing.Iterable[str] | None = None,
+) -> None:
+    """Replace delayed proxies in a namespace with the real object once they're instantiated
+
+    This is intended to be invoked at the end of a module as
+    `rebind_globals(globals())`.  Each delayed proxy bound in that namespace
+    will, upon instantiation, rebind the name to the real object so
+    subsequent global lookups bypass the proxy entirely.  Proxies that are
+    already instantiated are rebound immediately.
+
+    Only names still bound to the proxy at instantiation time are rebound; if the
+    name was reassigned to something else in the meantime, it's left alone.  References
+    to the proxy held elsewhere continue to work through the proxy.
+
+    :param namespace: mapping to rebind within; typically a module's `globals()`
+    :param names: if given, only these names are considered.
+    """
+    for name in list(namespace) if names is None else names:
+        value = namespace[name]
+        if not issubclass(
+            object.__getattribute__(value, "__class__"), BaseDelayedObject
+        ):
+            continue
+        if (real := object.__getattribute__(value, "__obj__")) is not None:
+            namespace[name] = real
+            continue
+        rebind = object.__getattribute__(value, "__rebind__")
+        if rebind is None:
+            object.__setattr__(value, "__rebind__", rebind := [])
+        rebind.append((namespace, name))
@@ -5,10 +5,15 @@ OS related functionality
 __all__ = (
     "abspath",
     "ensure_dirs",
+    "ensure_dirs_many",
+    "ensure_dirs_invalidate",
     "join",
     "pjoin",
     "listdir_files",
     "listdir_dirs",
+    "listdir_split",
+    "walk_entries",
+    "walk_parallel",
     "listdir",
     "normpath",
     "unlink_if_exists",
@@ -19,10 +24,6 @@ import errno
 import os
 import stat
 import sys
-from stat import (
-    S_ISDIR,
-    S_ISREG,
-)
 
 from snakeoil._internals import deprecated
 
@@ -88,7 +89,102 @@ def _safe_mkdir(path, mode):
     return True
 
 
-def ensure_dirs(path, gid=-1, uid=-1, mode=0o777, minimal=True):
+# (path, gid, uid, mode, minimal) of successful ensure_dirs(cache=True) calls.
+_ensured_dirs = set()
+
+
+def ensure_dirs_invalidate(path=None):
+    """Drop cached :py:func:`ensure_dirs` results
+
+    Required if directories ensured with `cache=True` are removed, or their
+    ownership or permissions changed, by anything other than ensure_dirs.
+
+    :param path: if given, only that directory and anything beneath it is
+        invalidated; otherwise the entire cache is cleared.
+    """
+    if path is None:
+        _ensured_dirs.clear()
+        return
+    path = os.path.abspath(path)
+    prefix = os.path.join(path, "")
+    for key in [x for x in _ensured_dirs if x[0] == path or x[0].startswith(prefix)]:
+        _ensured_dirs.discard(key)
+
+
+def _ensure_existing_dir(path, st, gid, uid, mode, minimal):
+    if not stat.S_ISDIR(st.st_mode):
+        # don't change perms for existing paths that aren't dirs
+        return False
+
+    try:
+        if (gid != -1 and gid != st.st_gid) or (uid != -1 and uid != st.st_uid):
+            os.chown(path, uid, gid)
+        if minimal:
+            if mode != (st.st_mode & mode):
+                os.chmod(path, st.st_mode | mode)
+        elif mode != (st.st_mode & 0o7777):
+            os.chmod(path, mode)
+    except OSError:
+        return False
+    return True
+
+
+def _create_dirs(apath, gid, uid, mode, resets, created):
+    """create apath and any missing parents; the umask must be 0
+
+    Directories whose final permissions must be applied after all creation is
+    done are appended to resets.  Created directories are added to created.
+    """
+    # find the deepest existing ancestor; usually the immediate parent.
+    missing = [apath]
+    current = os.path.dirname(apath)
+    while True:
+        try:
+            st = os.stat(current)
+        except OSError:
+            if current == (parent := os.path.dirname(current)):
+                return False
+            missing.append(current)
+            current = parent
+            continue
+        if not stat.S_ISDIR(st.st_mode):
+            # one of the path components isn't a dir
+            return False
+        sticky_parent = st.st_mode & stat.S_ISGID
+        break
+
+    # if the dir perms would lack +wx, we have to force it
+    force_temp_perms = (mode & 0o300) != 0o300
+    for base in reversed(missing):
+        try:
+            if force_temp_perms:
+                if not _safe_mkdir(base, 0o700):
+                    return False
+                resets.append(base)
+            else:
+                if not _safe_mkdir(base, mode):
+                    return False
+                if base == apath and sticky_parent:
+                    resets.append(base)
+                if gid != -1 or uid != -1:
+                    os.chown(base, uid, gid)
+        except OSError:
+            return False
+        created.add(base)
+    return True
+
+
+def _apply_resets(path, gid, uid, mode):
+    try:
+        os.chmod(path, mode)
+        if gid != -1 or uid != -1:
+            os.chown(path, uid, gid)
+    except OSError:
+        return False
+    return True
+
+
+def ensure_dirs(path, gid=-1, uid=-1, mode=0o777, minimal=True, cache=False):
     """ensure dirs exist, creating as needed with (optional) gid, uid, and mode.
 
     Be forewarned- if mode is specified to a mode that blocks the euid
@@ -102,79 +198,84 @@ def ensure_dirs(path, gid=-1, uid=-1, mode=0o777, minimal=True):
         must be enforced, or is the minimal permissions necessary.  For example,
         if mode=0755, minimal=True, and a directory exists with mode 0707,
         this will restore the missing group perms resulting in 757.
+    :param cache: if True, remember success for this process; later calls for
+        the same path and arguments return immediately without touching the
+        filesystem.  See :py:func:`ensure_dirs_invalidate`.
     :return: True if the directory could be created/ensured to have those
         permissions, False if not.
     """
+    if cache:
+        key = (os.path.abspath(path), gid, uid, mode, minimal)
+        if key in _ensured_dirs:
+            return True
 
-    join = os.path.join
     try:
         st = os.stat(path)
     except OSError:
-        base = os.path.sep
+        resets = []
+        um = os.umask(0)
         try:
-            um = os.umask(0)
-            # if the dir perms would lack +wx, we have to force it
-            force_temp_perms = (mode & 0o300) != 0o300
-            resets = []
-            apath = os.path.normpath(os.path.abspath(path))
-            sticky_parent = False
-
-            for directory in apath.split(os.path.sep):
-                base = join(base, directory)
-                try:
-                    st = os.stat(base)
-                    if not stat.S_ISDIR(st.st_mode):
-                        # one of the path components isn't a dir
-                        return False
-
-                    # if it's a subdir, we need +wx at least
-                    if apath != base:
-                        sticky_parent = st.st_mode & stat.S_ISGID
-
-                except OSError:
-                    # nothing exists.
-                    try:
-                        if force_temp_perms:
-                            if not _safe_mkdir(base, 0o700):
-                                return False
-                            resets.append((base, mode))
-                        else:
-                            if not _safe_mkdir(base, mode):
-                                return False
-                            if base == apath and sticky_parent:
-                                resets.append((base, mode))
-                            if gid != -1 or uid != -1:
-                                os.chown(base, uid, gid)
-                    except OSError:
-                        return False
-
-            try:
-                for base, m in reversed(resets):
-                    os.chmod(base, m)
-                    if gid != -1 or uid != -1:
-                        os.chown(base, uid, gid)
-            except OSError:
-                return False
-
+            ok = _create_dirs(
+                os.path.abspath(path), gid, uid, mode, resets, set()
+            ) and all(_apply_resets(x, gid, uid, mode) for x in reversed(resets))
         finally:
             os.umask(um)
-        return True
     else:
-        if not os.path.isdir(path):
-            # don't change perms for existing paths that aren't dirs
-            return False
+        ok = _ensure_existing_dir(path, st, gid, uid, mode, minimal)
 
-        try:
-            if (gid != -1 and gid != st.st_gid) or (uid != -1 and uid != st.st_uid):
-                os.chown(path, uid, gid)
-            if minimal:
-                if mode != (st.st_mode & mode):
-                    os.chmod(path, st.st_mode | mode)
-            elif mode != (st.st_mode & 0o7777):
-                os.chmod(path, mode)
-        except OSError:
-            return False
-    return True
+    if ok and cache:
+        _ensured_dirs.add(key)
+    return ok
+
+
+def ensure_dirs_many(paths, gid=-1, uid=-1, mode=0o777, minimal=True, cache=False):
+    """:py:func:`ensure_dirs` for many paths at once
+
+    Paths are processed in sorted order so shared parents are only created
+    once, and the final permissions of created directories are applied in a
+    single pass at the end.
+
+    :param paths: iterable of directories to ensure exist on disk
+    :return: sorted list of the absolute paths that couldn't be ensured; empty on
+        success.
+
+    See :py:func:`ensure_dirs` for the other arguments.
+    """
+    failed = set()
+    created = set()
+    # (directory, the requested path it was created for)
+    resets = []
+    todo = sorted({os.path.abspath(x) for x in paths})
+    um = os.umask(0)
+    try:
+        for path in todo:
+            if path in created or (
+                cache and (path, gid, uid, mode, minimal) in _ensured_dirs
+            ):
+                continue
+            try:
+                st = os.stat(path)
+            except OSError:
+                pending = []
+                if not _create_dirs(path, gid, uid, mode, pending, created):
+                    failed.add(path)
+                resets.extend((x, path) for x in pending)
+                continue
+            if not _ensure_existing_dir(path, st, gid, uid, mode, minimal):
+                failed.add(path)
+
+        # deepest first, so restrictive modes don't block resetting children.
+        for directory, path in reversed(resets):
+            if not _apply_resets(directory, gid, uid, mode):
+                failed.add(path)
+    finally:
+        os.umask(um)
+
+    if cache:
+        _ensured_dirs.update(
+            (x, gid, uid, mode, minimal) for x in todo if x not in failed
+        )
+    return sorted(failed)
 
 
 def _abssymlink(path):
@@ -298,15 +399,6 @@ def fstat_mtime_long(fd, st=None):
     return (os.fstat(fd) if st is None else st)[stat.ST_MTIME]
 
 
-def _stat_swallow_enoent(path, check, default=False, stat=os.stat):
-    try:
-        return check(stat(path).st_mode)
-    except OSError as oe:
-        if oe.errno == errno.ENOENT:
-            return default
-        raise
-
-
 def listdir_dirs(path, followSymlinks=True):
     """
     Return a list of all subdirectories within a directory
@@ -317,16 +409,8 @@ def listdir_dirs(path, followSymlinks=True):
         else if False it isn't returned.
     :return: list of directories within `path`
     """
-    scheck = S_ISDIR
-    lstat = os.lstat
-    if followSymlinks:
-        return [
-            x
-            for x in os.listdir(path)
-            if _stat_swallow_enoent(os.path.join(path, x), scheck)
-        ]
-    lstat = os.lstat
-    return [x for x in os.listdir(path) if scheck(lstat(os.path.join(path, x)).st_mode)]
+    with os.scandir(path) as it:
+        return [x.name for x in it if x.is_dir(follow_symlinks=followSymlinks)]
 
 
 def listdir_files(path, followSymlinks=True):
@@ -339,13 +423,201 @@ def listdir_files(path, followSymlinks=True):
         else if False it isn't returned.
     :return: list of files within `path`
     """
+    with os.scandir(path) as it:
+        return [x.name for x in it if x.is_file(follow_symlinks=followSymlinks)]
+
+
+def listdir_split(path, followSymlinks=True):
+    """
+    Classify the contents of a directory in a single pass
+
+    Entry types come from the directory listing itself where the filesystem
+    supports it, so typically no stat calls are needed.
+
+    :param path: directory to scan
+    :param followSymlinks: this controls if symlinks are resolved.  If True,
+        symlinks are classified by what they point at; dangling symlinks are
+        classified as other.  If False, all symlinks are classified as other.
+    :return: tuple of (files, dirs, others) lists of names within `path`
+    """
+    files, dirs, others = [], [], []
+    with os.scandir(path) as it:
+        for x in it:
+            if x.is_file(follow_symlinks=followSymlinks):
+                files.append(x.name)
+            elif x.is_dir(follow_symlinks=followSymlinks):
+                dirs.append(x.name)
+            else:
+                others.append(x.name)
+    return files, dirs, others
+
+
+def walk_entries(path, followSymlinks=False, onerror=None):
+    """
+    Recursively yield :py:class:`os.DirEntry` instances for everything beneath a directory
+
+    Entries are yielded directory by directory, top down; each directory's
+    entries are yielded before its subdirectories are descended into.  DirEntry
+    caches type and stat information, so consumers calling `is_dir()` or `stat()`
+    don't pay for repeated syscalls.
+
+    :param path: directory to walk
+    :param followSymlinks: if True, descend into symlinks to directories.  Beware
+        symlink loops.
+    :param onerror: like :py:func:`os.walk`, errors listing directories are ignored
+        unless this is given, in which case it's invoked with the :py:class:`OSError`.
+    """
+    pending = [os.fspath(path)]
+    while pending:
+        try:
+            with os.scandir(pending.pop()) as it:
+                entries = list(it)
+        except OSError as e:
+            if onerror is not None:
+                onerror(e)
+            continue
+        subdirs = []
+        for entry in entries:
+            yield entry
+            try:
+                if entry.is_dir(follow_symlinks=followSymlinks):
+                    subdirs.append(entry.path)
+            except OSError:
+                pass
+        # reversed so they're descended into in listing order.
+        pending.extend(reversed(subdirs))
+
+
+def _walk_chunk(roots, filter, ordered, followSymlinks, budget, fanout):
+    # walk up to budget directories depth first, in walk_entries order.  The result
+    # is that order's items: a list of entries per directory listed, an OSError for
+    # directories that couldn't be, and tuples of directories left for other chunks.
+    # Batching keeps task overhead from dominating trees of small dirs.
+    items = []
+    pending = list(reversed(roots))
+    while pending:
+        if not budget:
+            # hand back the remainder, split into up to fanout consecutive groups.
+            pending.reverse()
+            step = -(-len(pending) // fanout)
+            items.extend(
+                tuple(pending[x : x + step]) for x in range(0, len(pending), step)
+            )
+            break
+        budget -= 1
+        try:
+            with os.scandir(pending.pop()) as it:
+                entries = list(it)
+        except OSError as e:
+            items.append(e)
+            continue
+        if ordered:
+            entries.sort(key=lambda x: x.name)
+        wanted, subdirs = [], []
+        for entry in entries:
+            if filter is not None and not filter(entry):
+                continue
+            wanted.append(entry)
+            try:
+                if entry.is_dir(follow_symlinks=followSymlinks):
+                    subdirs.append(entry.path)
+            except OSError:
+                pass
+        items.append(wanted)
+        pending.extend(reversed(subdirs))
+    return items
+
+
+def walk_parallel(
+    path,
+    workers=None,
+    filter=None,
+    ordered=False,
+    followSymlinks=False,
+    onerror=None,
+    chunk_size=256,
+):
+    """
+    Recursively yield :py:class:`os.DirEntry` instances, listing directories in parallel
+
+    This is :py:func:`walk_entries` for large trees where listing directories one
+    after another is latency bound- cold caches or network filesystems for example.
+    Subtrees are fanned out across a thread pool as they're discovered, and
+    entries are yielded as listings complete.
+
+    :param path: directory to walk
+    :param workers: number of listing threads.  Defaults to what
+        :py:class:`concurrent.futures.ThreadPoolExecutor` picks.
+    :param filter: if given, invoked with each entry; if it returns False the entry
+        isn't yielded, and if it's a directory it isn't descended into.  This is
+        invoked from the listing threads, thus must be thread safe.
+    :param ordered: if True, yield in a deterministic order- directories are walked
+        top down as :py:func:`walk_entries` does, with each directory's entries
+        sorted by name.  Listings still happen in parallel, but a slow directory
+        stalls everything after it.  If False, entries are yielded in whatever
+        order listings complete, though parents are always yielded before their
+        children.
+    :param followSymlinks: if True, descend into symlinks to directories.  Beware
+        symlink loops.
+    :param onerror: errors listing directories are ignored unless this is given, in
+        which case it's invoked with the :py:class:`OSError`.
+    :param chunk_size: maximum directories a thread lists per task before handing
+        the remainder back for other threads.
+    """
+    import queue
+    from concurrent import futures
+
+    if chunk_size < 1:
+        raise ValueError(f"chunk_size must be at least 1: {chunk_size!r}")
+    if workers is None:
+        # same default as ThreadPoolExecutor.
+        workers = min(32, (os.cpu_count() or 1) + 4)
+    executor = futures.ThreadPoolExecutor(workers, thread_name_prefix="walk_parallel")
+
+    def submit(roots):
+        return executor.submit(
+            _walk_chunk, roots, filter, ordered, followSymlinks, chunk_size, workers
+        )
 
-    scheck = S_ISREG
-    if followSymlinks:
-        return [
-            x
-            for x in os.listdir(path)
-            if _stat_swallow_enoent(os.path.join(path, x), scheck)
-        ]
-    lstat = os.lstat
-    return [x for x in os.listdir(path) if scheck(lstat(os.path.join(path, x)).st_mode)]
+    try:
+        if ordered:
+            # a stack of items in the order they're to be yielded; subtrees left over
+            # by a chunk are submitted immediately so they're listed ahead of need.
+            stack = [submit((os.fspath(path),))]
+            while stack:
+                item = stack.pop()
+                if isinstance(item, futures.Future):
+                    stack.extend(
+                        reversed(
+                            [
+                                x if isinstance(x, (list, OSError)) else submit(x)
+                                for x in item.result()
+                            ]
+                        )
+                    )
+                elif isinstance(item, OSError):
+                    if onerror is not None:
+                        onerror(item)
+                else:
+                    yield from item
+        else:
+            # futures.wait is linear in the number of futures; with many subtrees in
+            # flight, a completion queue is far cheaper.
+            completed = queue.SimpleQueue()
+            submit((os.fspath(path),)).add_done_callback(completed.put)
+            outstanding = 1
+            while outstanding:
+                items = completed.get().result()
+                outstanding -= 1
+                # get leftover subtrees listing before yielding anything.
+                for item in items:
+                    if not isinstance(item, (list, OSError)):
+                        submit(item).add_done_callback(completed.put)
+                        outstanding += 1
+                for item in items:
+                    if isinstance(item, list):
+                        yield from item
+                    elif isinstance(item, OSError) and onerror is not None:
+                        onerror(item)
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
@@ -2,7 +2,7 @@
 
 from collections.abc import Sized
 
-from .delayed import regexp
+from .delayed import rebind_globals, regexp
 
 _whitespace_regex = regexp(r"^(?P<indent>\s+)")
 
@@ -43,3 +43,7 @@ def doc_dedent(s: str) -> str:
                 break
     len_i = len(indent)
     return "\n".join(x[len_i:] if x.startswith(indent) else x for x in lines)
+
+
+# once compiled, the regexps above are looked up directly rather than via proxy.
+rebind_globals(globals())
@@ -0,0 +1,261 @@
+"""Measure the import cost of python modules in fresh interpreters, enforcing budgets
+
+This drives ``python -X importtime`` and cold process timings.  Every measurement is
+taken in a new interpreter so nothing already imported by the caller skews results.
+"""
+
+__all__ = (
+    "ImportRecord",
+    "ImportProfile",
+    "parse_importtime",
+    "profile_import",
+    "cold_start",
+    "DEFERRABLE",
+    "main",
+)
+
+import dataclasses
+import os
+import subprocess
+import sys
+import time
+import typing
+from textwrap import dedent
+
+from snakeoil.cli import arghparse
+from snakeoil.cli.tool import Tool
+
+# stdlib modules that are expensive to import and are rarely needed for the common
+# path; if these are imported eagerly they're candidates for snakeoil.delayed.
+DEFERRABLE: typing.Final = (
+    "bz2",
+    "concurrent.futures",
+    "curses",
+    "email",
+    "hashlib",
+    "http",
+    "lzma",
+    "multiprocessing",
+    "subprocess",
+    "tarfile",
+    "zipfile",
+)
+
+
+class ImportRecord(typing.NamedTuple):
+    """A single line of ``-X importtime`` output; times are in microseconds"""
+
+    name: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+    # the module whose import triggered this one, or None if it was top level.
+    parent: str | None
+
+
+def parse_importtime(output: str) -> list[ImportRecord]:
+    """Parse ``python -X importtime`` stderr into records, in import completion order
+
+    Lines that aren't importtime output are ignored.
+    """
+    parsed: list[tuple[str, int, int, int]] = []
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|", 2)
+        if not self_us.strip().isdigit():
+            # the header line.
+            continue
+        stripped = name.lstrip()
+        depth = (len(name) - len(stripped) - 1) // 2
+        parsed.append((stripped.rstrip(), int(self_us), int(cumulative_us), depth))
+
+    # importtime emits children before their parent; the parent of a record is the
+    # next record emitted at one less depth.
+    parents: list[str | None] = [None] * len(parsed)
+    pending: dict[int, list[int]] = {}
+    for idx, (name, _, _, depth) in enumerate(parsed):
+        for child in pending.pop(depth + 1, ()):
+            parents[child] = name
+        pending.setdefault(depth, []).append(idx)
+    return [
+        ImportRecord(name, self_us, cumulative_us, depth, parent)
+        for (name, self_us, cumulative_us, depth), parent in zip(parsed, parents)
+    ]
+
+
+def _run(code: str, python: str, importtime: bool) -> subprocess.CompletedProcess[str]:
+    env = os.environ.copy()
+    # ensure the child resolves modules the same way this interpreter does.
+    env["PYTHONPATH"] = os.pathsep.join(p for p in sys.path if p)
+    args = (
+        [python, "-X", "importtime", "-c", code] if importtime else [python, "-c", code]
+    )
+    return subprocess.run(args, env=env, capture_output=True, text=True, check=True)
+
+
+@dataclasses.dataclass(slots=True, frozen=True)
+class ImportProfile:
+    """Modules imported for a target, beyond what the bare interpreter imports"""
+
+    module: str
+    records: tuple[ImportRecord, ...]
+
+    @property
+    def total_us(self) -> int:
+        """Total microseconds spent importing the target and everything it pulled in"""
+        return sum(r.self_us for r in self.records)
+
+    def get(self, name: str) -> ImportRecord | None:
+        for record in self.records:
+            if record.name == name:
+                return record
+        return None
+
+    def chain(self, name: str) -> list[str]:
+        """The import chain from a top level import down to the given module"""
+        parents = {r.name: r.parent for r in self.records}
+        chain = []
+        current: str | None = name
+        while current is not None:
+            chain.append(current)
+            current = parents.get(current)
+        return chain[::-1]
+
+    def eager(
+        self, candidates: typing.Iterable[str] = DEFERRABLE
+    ) -> list[ImportRecord]:
+        """Records for candidate modules that were imported, most expensive first"""
+        found = (self.get(name) for name in candidates)
+        return sorted(
+            (r for r in found if r is not None),
+            key=lambda r: r.cumulative_us,
+            reverse=True,
+        )
+
+
+def profile_import(
+    module: str, runs: int = 5, python: str = sys.executable
+) -> ImportProfile:
+    """Import a module in fresh interpreters, returning the fastest run
+
+    An initial run is discarded so bytecode compilation isn't measured.
+    """
+    baseline = {r.name for r in parse_importtime(_run("pass", python, True).stderr)}
+    best: list[ImportRecord] | None = None
+    for _ in range(runs + 1):
+        records = [
+            r
+            for r in parse_importtime(_run(f"import {module}", python, True).stderr)
+            if r.name not in baseline
+        ]
+        if best is None or sum(r.self_us for r in records) < sum(
+            r.self_us for r in best
+        ):
+            best = records
+    return ImportProfile(module, tuple(best or ()))
+
+
+def cold_start(module: str, runs: int = 5, python: str = sys.executable) -> float:
+    """Wall clock seconds a fresh process spends importing module, beyond bare startup"""
+
+    def fastest(code):
+        timings = []
+        for _ in range(runs + 1):
+            start = time.perf_counter()
+            _run(code, python, False)
+            timings.append(time.perf_counter() - start)
+        return min(timings[1:])
+
+    return max(fastest(f"import {module}") - fastest("pass"), 0.0)
+
+
+def _parse_budget(value: str) -> tuple[str, float]:
+    module, sep, budget = value.rpartition("=")
+    if not sep or not module:
+        raise ValueError(f"budget must be of the form module=milliseconds: {value!r}")
+    return module, float(budget)
+
+
+parser = arghparse.ArgumentParser(
+    prog=__name__.rsplit(".", 1)[-1],
+    description=dedent(
+        """\
+        Measure import cost of python modules, and enforce budgets for them
+
+        Each module is imported in a fresh interpreter via `python -X importtime`;
+        the total import cost beyond bare interpreter startup is reported, along with
+        the cold process cost.  Expensive stdlib modules that were imported eagerly are
+        listed with the chain of imports that pulled them in; these are candidates for
+        deferral via snakeoil.delayed.
+
+        The exit status is non zero if any module exceeds its budget.
+        """
+    ),
+)
+parser.add_argument("modules", nargs="+", help="python modules to measure")
+parser.add_argument(
+    "-n",
+    "--runs",
+    type=int,
+    default=5,
+    help="number of fresh interpreters per measurement; the fastest is used",
+)
+parser.add_argument(
+    "--budget",
+    action="append",
+    type=_parse_budget,
+    default=[],
+    help="per module budget in milliseconds, in the form module=ms.  May be repeated.",
+)
+parser.add_argument(
+    "--default-budget",
+    type=float,
+    default=None,
+    help="budget in milliseconds for modules without an explicit --budget",
+)
+parser.add_argument(
+    "--deferrable",
+    action="csv",
+    default=list(DEFERRABLE),
+    help="comma separated modules to flag if imported eagerly",
+)
+parser.add_argument(
+    "--cold",
+    action="store_true",
+    default=False,
+    help="also measure wall clock cold process time",
+)
+
+
+@parser.bind_main_func
+def main(options, out, err) -> int:
+    budgets = dict(options.budget)
+    failed = []
+    for module in options.modules:
+        profile = profile_import(module, runs=options.runs)
+        total_ms = profile.total_us / 1000
+        budget = budgets.get(module, options.default_budget)
+        line = f"{module}: {total_ms:.2f}ms import"
+        if options.cold:
+            line += f", {cold_start(module, runs=options.runs) * 1000:.2f}ms cold"
+        if budget is not None:
+            line += f", budget {budget:.2f}ms"
+            if total_ms > budget:
+                line += " EXCEEDED"
+                failed.append(module)
+        out.write(line)
+        for record in profile.eager(options.deferrable):
+            chain = " -> ".join(profile.chain(record.name))
+            out.write(
+                f"  eager {record.name}: {record.cumulative_us / 1000:.2f}ms via {chain}"
+            )
+
+    if failed:
+        err.write(f"modules over budget: {', '.join(failed)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(Tool(parser)())
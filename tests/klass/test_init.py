@@ -8,7 +8,11 @@ from time import time
 import pytest
 
 from snakeoil import klass
-from snakeoil.klass.properties import _internal_jit_attr, _uncached_singleton
+from snakeoil.klass.properties import (
+    _internal_jit_attr,
+    _slotted_jit_attr,
+    _uncached_singleton,
+)
 
 if sys.version_info >= (3, 13):
     from pytest import deprecated_call
@@ -413,6 +417,98 @@ class Test_jit_attr:
         # pylint: disable=pointless-statement
         obj.attr
 
+    def test_slotted_specialization(self):
+        invokes = []
+
+        class cls:
+            __slots__ = ("_my_attr", "_blah")
+
+            @self.jit_attr
+            def my_attr(self):
+                """my docs"""
+                invokes.append(self)
+                return len(invokes)
+
+            @self.jit_attr_named("_blah", use_cls_setattr=True)
+            def generic(self):
+                return "generic"
+
+        # the slotted storage gets a compiled accessor; use_cls_setattr keeps the generic path.
+        assert isinstance(cls.__dict__["my_attr"], _slotted_jit_attr)
+        assert cls.my_attr.__doc__ == "my docs"
+        assert cls.my_attr.function.__name__ == "my_attr"
+        assert isinstance(cls.__dict__["generic"], self.kls)
+
+        o = cls()
+        assert o.my_attr == 1
+        assert o.my_attr == 1
+        assert o._my_attr == 1
+        del o._my_attr
+        assert o.my_attr == 2
+        o._my_attr = _uncached_singleton
+        assert o.my_attr == 3
+        assert o.generic == "generic"
+        assert o._blah == "generic"
+
+        class subclass(cls):
+            __slots__ = ()
+
+            @self.jit_attr_named("_my_attr")
+            def other(self):
+                return "subclass"
+
+        assert isinstance(subclass.__dict__["other"], _slotted_jit_attr)
+        assert subclass().other == "subclass"
+
+        # instances that still have a __dict__ must use the generic descriptor.
+        class dictful(cls):
+            @self.jit_attr_named("_my_attr")
+            def other(self):
+                return "dictful"
+
+        assert isinstance(dictful.__dict__["other"], self.kls)
+        assert dictful().other == "dictful"
+
+        # the compiled accessor isn't a data descriptor; instances with a
+        # __dict__ can still assign and shadow the attribute.
+        o = dictful()
+        o.my_attr = 5
+        assert o.my_attr == 5
+        assert o.__dict__["my_attr"] == 5
+
+    def test_slotted_specialization_fallbacks(self):
+        gets = []
+
+        class kls(_internal_jit_attr):
+            __slots__ = ()
+
+            def __get__(self, instance, obj_type):
+                gets.append(instance)
+                return super().__get__(instance, obj_type)
+
+        class cls:
+            __slots__ = ("_my_attr", "class")
+
+            @partial(klass.jit_attr, kls=kls)
+            def my_attr(self):
+                """my docs"""
+                return "overridden"
+
+            # keywords can't be compiled into a getter.
+            @self.jit_attr_named("class")
+            def keyword(self):
+                return "keyword"
+
+        # subclasses keep their own __get__, and the wrapped docs.
+        assert isinstance(cls.__dict__["my_attr"], kls)
+        assert cls.__dict__["my_attr"].__doc__ == "my docs"
+        assert isinstance(cls.__dict__["keyword"], self.kls)
+        o = cls()
+        assert o.my_attr == "overridden"
+        assert gets == [o]
+        assert o.keyword == "keyword"
+        assert getattr(o, "class") == "keyword"
+
     def test_cached_property(self):
         l = []  # noqa: E741
 
@@ -635,6 +731,64 @@ class TestGenericEquality:
 
         assert ("b", "c", "a") == kls5.__attr_comparison__
 
+    def test_generated(self):
+        class kls(klass.GenericEquality):
+            __attr_comparison__ = ("x", "y")
+
+            def __init__(self, x, y):
+                self.x, self.y = x, y
+
+        assert kls.__eq__ is not klass.GenericEquality.__eq__
+        assert kls.__eq__.__qualname__.endswith("kls.__eq__")
+        assert kls.__hash__ is None, "__eq__ without hashable=True must stay unhashable"
+
+        class custom(kls):
+            def __eq__(self, value):
+                return True
+
+        class sub(custom):
+            __attr_comparison__ = ("y",)
+
+        assert sub(1, 2) == sub(3, 4), "explicit __eq__ in the MRO was replaced"
+
+        class sub(kls):
+            __attr_comparison__ = ("y",)
+
+        assert sub(1, 2) == sub(3, 2)
+        assert sub(1, 2) != sub(1, 3)
+
+    def test_hashable(self):
+        class kls(klass.GenericEquality, hashable=True):
+            __attr_comparison__ = ("x", "y")
+
+            def __init__(self, x, y):
+                self.x, self.y = x, y
+
+        assert hash(kls(1, 2)) == hash(kls(1, 2)) == hash((1, 2))
+        assert len({kls(1, 2), kls(1, 2), kls(2, 1)}) == 2
+        obj = kls(1, 2)
+        del obj.x
+        assert hash(obj) == hash(obj)
+
+        class sub(kls):
+            __attr_comparison__ = ("y",)
+
+        assert hash(sub(1, 2)) == hash((2,))
+
+    def test_property_attr_comparison(self):
+        class kls(klass.GenericEquality):
+            def __init__(self, attrs, **kwargs):
+                self.attrs = attrs
+                self.__dict__.update(kwargs)
+
+            @property
+            def __attr_comparison__(self):
+                return self.attrs
+
+        assert kls.__eq__ is klass.GenericEquality.__eq__
+        assert kls(("x",), x=1, y=2) == kls(("x",), x=1, y=3)
+        assert kls(("y",), x=1, y=2) != kls(("y",), x=1, y=3)
+
 
 class TestGenericRichComparison:
     def test_it(self):
@@ -675,6 +829,71 @@ class TestGenericRichComparison:
         assert not (obj1 > obj2)
         assert not (obj1 >= obj2)
 
+    def test_lexicographic(self):
+        class kls(klass.GenericRichComparison):
+            __attr_comparison__ = ("x", "y")
+
+            def __init__(self, x, y):
+                self.x, self.y = x, y
+
+        assert kls(1, 2) < kls(2, 1)
+        assert not (kls(2, 1) < kls(1, 2))
+        assert kls(2, 1) > kls(1, 2)
+        assert not (kls(1, 5) <= kls(1, 2))
+        assert kls(1, 5) >= kls(1, 2)
+
+        # the override forces the generic path.
+        assert kls(1, 2).__lt__(kls(0, 3), attr_comparison_override=("y",))
+        assert not kls(1, 2).__lt__(kls(0, 3))
+
+        objs = [kls(x, y) for x in range(3, 0, -1) for y in range(3)]
+        del objs[0].y
+        expected = sorted(objs, key=lambda o: (o.x, getattr(o, "y", -1)))
+        assert sorted(objs) == expected
+        assert sorted(objs, key=kls.__sort_key__) == expected
+        assert kls(1, 2).__sort_key__() == (1, 2)
+
+    def test_cache_sort_key(self):
+        class kls(klass.GenericRichComparison, cache_sort_key=True):
+            __attr_comparison__ = ("x", "y")
+
+            def __init__(self, x, y):
+                self.x, self.y = x, y
+
+        obj = kls(1, 2)
+        assert obj.__sort_key__() == (1, 2)
+        # computed once, and reused from then on.
+        obj.x = 5
+        assert obj.__sort_key__() == (1, 2)
+        assert obj < kls(2, 0)
+        assert kls(2, 0) >= obj
+
+        objs = [kls(x, y) for x in range(3, 0, -1) for y in range(3)]
+        assert sorted(objs) == sorted(objs, key=lambda o: (o.x, o.y))
+
+        # inherited by subclasses.
+        class subclass(kls):
+            __attr_comparison__ = ("y",)
+
+        obj = subclass(1, 2)
+        assert obj.__sort_key__() == (2,)
+        assert obj._sort_key == (2,)
+
+        class slotted(klass.GenericRichComparison, cache_sort_key=True):
+            __slots__ = ("x", "_sort_key")
+            __attr_comparison__ = ("x",)
+
+            def __init__(self, x):
+                self.x = x
+
+        assert slotted(1) < slotted(2)
+
+        with pytest.raises(TypeError, match="_sort_key slot"):
+
+            class unslotted(klass.GenericRichComparison, cache_sort_key=True):
+                __slots__ = ("x",)
+                __attr_comparison__ = ("x",)
+
 
 def test_abstractclassvar():
     class kls1(abc.ABC): ...
@@ -1,4 +1,6 @@
 import abc
+import asyncio
+from functools import partial
 from unittest.mock import patch
 
 import pytest
@@ -8,10 +10,10 @@ from snakeoil.process import CommandNotFound, find_binary
 
 
 def hide_binary(*binaries: str):
-    def mock_find_binary(name):
+    def mock_find_binary(name, *args, **kwargs):
         if name in binaries:
             raise CommandNotFound(name)
-        return find_binary(name)
+        return find_binary(name, *args, **kwargs)
 
     return patch("snakeoil.process.find_binary", side_effect=mock_find_binary)
 
@@ -20,6 +22,8 @@ class Base(abc.ABC):
     module: str = ""
     decompressed_test_data: bytes = b""
     compressed_test_data: bytes = b""
+    # what decompressing corrupt data raises; ValueError for the binaries.
+    corrupt_data_error: type[Exception] = ValueError
 
     @abc.abstractmethod
     def decompress(self, data: bytes) -> bytes: ...
@@ -102,3 +106,172 @@ class Base(abc.ABC):
 
         with pytest.raises(TypeError):
             compression.decompress_handle(self.module, b"", parallelize=parallelize)
+
+    @staticmethod
+    def _chunks(data, size=7):
+        return (data[x : x + size] for x in range(0, len(data), size))
+
+    @pytest.mark.parametrize("parallelize", (True, False))
+    @pytest.mark.parametrize("level", (1, 9))
+    def test_compress_chunks(self, level, parallelize):
+        chunks = compression.compress_chunks(
+            self.module,
+            self._chunks(self.decompressed_test_data),
+            level=level,
+            parallelize=parallelize,
+        )
+        assert self.decompress(b"".join(chunks)) == self.decompressed_test_data
+
+        assert self.decompress(
+            b"".join(compression.compress_chunks(self.module, iter(()), level=level))
+        ) == (b"")
+
+    @pytest.mark.parametrize("parallelize", (True, False))
+    def test_decompress_chunks(self, parallelize):
+        chunks = compression.decompress_chunks(
+            self.module,
+            self._chunks(self.compressed_test_data * 2),
+            parallelize=parallelize,
+        )
+        assert b"".join(chunks) == self.decompressed_test_data * 2
+
+        with pytest.raises((EOFError, ValueError)):
+            b"".join(
+                compression.decompress_chunks(
+                    self.module,
+                    self._chunks(self.compressed_test_data[:-4]),
+                    parallelize=parallelize,
+                )
+            )
+
+    @pytest.mark.parametrize("parallelize", (True, False))
+    def test_compress_chunks_checkpoint(self, parallelize):
+        index = []
+        compress = partial(
+            compression.compress_chunks,
+            self.module,
+            self._chunks(self.decompressed_test_data),
+            parallelize=parallelize,
+            checkpoint=10,
+            index=index,
+        )
+        if not compression._transforms[self.module].module.native:
+            with pytest.raises(ValueError, match="native"):
+                b"".join(compress())
+            return
+        compressed = b"".join(compress())
+        assert self.decompress(compressed) == self.decompressed_test_data
+        assert [x[1] for x in index] == list(
+            range(0, len(self.decompressed_test_data), 10)
+        )
+        # each checkpoint is an independent stream.
+        for (offset, position), (end, _) in zip(index, index[1:] + [(None, None)]):
+            assert (
+                self.decompress(compressed[offset:end])
+                == self.decompressed_test_data[position : position + 10]
+            )
+
+    @pytest.mark.parametrize("parallelize", (True, False))
+    def test_decompress_handle_index(self, tmp_path, parallelize):
+        if not compression._transforms[self.module].module.native:
+            pytest.skip("checkpoints require the native module")
+        data = self.decompressed_test_data * 20
+        index = []
+        path = tmp_path / f"test.{self.module}"
+        path.write_bytes(
+            b"".join(
+                compression.compress_chunks(
+                    self.module,
+                    self._chunks(data, 1000),
+                    checkpoint=len(data) // 4,
+                    index=index,
+                )
+            )
+        )
+        assert len(index) > 1
+
+        stream = compression.decompress_handle(
+            self.module, str(path), parallelize=parallelize, index=index
+        )
+        position = index[-1][1] + 1
+        stream.seek(position)
+        assert stream.read(10) == data[position : position + 10]
+        stream.seek(0)
+        assert stream.read() == data
+        stream.close()
+
+    @pytest.mark.parametrize("parallelize", (True, False))
+    def test_acompress_data(self, parallelize):
+        async def run():
+            return await asyncio.gather(
+                *(
+                    compression.acompress_data(
+                        self.module,
+                        self.decompressed_test_data * x,
+                        level=1,
+                        parallelize=parallelize,
+                    )
+                    for x in range(1, 4)
+                )
+            )
+
+        for x, compressed in enumerate(asyncio.run(run()), 1):
+            assert self.decompress(compressed) == self.decompressed_test_data * x
+
+    @pytest.mark.parametrize("parallelize", (True, False))
+    def test_adecompress_data(self, parallelize):
+        async def run():
+            return await compression.adecompress_data(
+                self.module, self.compressed_test_data, parallelize=parallelize
+            )
+
+        assert asyncio.run(run()) == self.decompressed_test_data
+
+        async def corrupt():
+            return await compression.adecompress_data(
+                self.module, b"corrupt", parallelize=parallelize
+            )
+
+        with pytest.raises(self.corrupt_data_error):
+            asyncio.run(corrupt())
+
+    @pytest.mark.parametrize("parallelize", (True, False))
+    def test_acompress_chunks(self, parallelize):
+        async def chunks(data):
+            for chunk in self._chunks(data, 1000):
+                yield chunk
+
+        async def run():
+            compressed = [
+                x
+                async for x in compression.acompress_chunks(
+                    self.module,
+                    chunks(self.decompressed_test_data),
+                    level=1,
+                    parallelize=parallelize,
+                )
+            ]
+            # sync iterables are accepted too.
+            return [
+                x
+                async for x in compression.adecompress_chunks(
+                    self.module,
+                    self._chunks(b"".join(compressed) * 2, 1000),
+                    parallelize=parallelize,
+                )
+            ]
+
+        assert b"".join(asyncio.run(run())) == self.decompressed_test_data * 2
+
+    @pytest.mark.parametrize("parallelize", (True, False))
+    def test_adecompress_chunks_truncated(self, parallelize):
+        async def run():
+            async for _ in compression.adecompress_chunks(
+                self.module,
+                self._chunks(self.compressed_test_data[:-4]),
+                parallelize=parallelize,
+            ):
+                pass
+
+        with pytest.raises((EOFError, ValueError)):
+            asyncio.run(run())
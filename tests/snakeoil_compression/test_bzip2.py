@@ -3,7 +3,7 @@ from bz2 import decompress
 
 import pytest
 
-from snakeoil.compression import _bzip2
+from snakeoil.compression import _bzip2, _util
 from snakeoil.process import CommandNotFound, find_binary
 from snakeoil.test import hide_imports
 
@@ -17,19 +17,34 @@ def test_no_native():
 
 
 def test_missing_bzip2_binary():
+    data = b"Some text here\n"
     with hide_binary("bzip2"):
-        with pytest.raises(CommandNotFound, match="bzip2"):
+        # the binary is only looked for once it's needed.
+        importlib.reload(_bzip2)
+        assert decompress(_bzip2.compress_data(data)) == data
+        assert not _bzip2.capabilities().binary
+        # like the other compatibility attributes, missing is None.
+        assert _bzip2.bz2_path is None
+        with hide_imports("bz2"):
             importlib.reload(_bzip2)
+            with pytest.raises(CommandNotFound, match="bzip2"):
+                _bzip2.compress_data(data)
 
 
 def test_missing_lbzip2_binary():
     with hide_binary("lbzip2"):
         importlib.reload(_bzip2)
-        assert not _bzip2.parallelizable
+        # parallelism is done in process.
+        assert _bzip2.parallelizable
+        with hide_imports("bz2"):
+            importlib.reload(_bzip2)
+            assert not _bzip2.parallelizable
 
 
 class Bzip2Base(Base):
     module = "bzip2"
+    # bz2 is used for async decompression either way.
+    corrupt_data_error = OSError
     decompressed_test_data = b"Some text here\n"
     compressed_test_data = (
         b"BZh91AY&SY\x1bM\x00\x02\x00\x00\x01\xd3\x80\x00\x10@\x00\x08\x00\x02"
@@ -51,6 +66,51 @@ class TestStdlib(Bzip2Base):
             importlib.reload(_bzip2)
             yield
 
+    @pytest.fixture
+    def small_blocks(self, monkeypatch):
+        monkeypatch.setattr(_bzip2, "_block_size", lambda level: 1000)
+        return b"".join(b"%i\n" % x for x in range(2000))
+
+    def test_parallel_blocks(self, small_blocks):
+        compressed = _bzip2.compress_data(small_blocks, parallelize=True)
+        assert len(_bzip2._stream_header.findall(compressed)) == 9
+        assert decompress(compressed) == small_blocks
+        assert _bzip2.decompress_data(compressed, parallelize=True) == small_blocks
+
+    def test_small_level(self):
+        data = b"".join(b"%i\n" % x for x in range(2000))
+        compressed = _bzip2.compress_data(data, 9)
+        assert compressed.startswith(b"BZh1")
+        assert decompress(compressed) == data
+        assert _bzip2._small_level(9, 1_000_000) == 9
+        assert _bzip2._small_level(3, 1_000_000) == 3
+        assert _bzip2._small_level(9, 100_000) == 2
+
+    def test_parallel_decompress_false_boundary(self, small_blocks):
+        compressed = _bzip2.compress_data(small_blocks)
+        # a bogus boundary mid stream falls back to serial decompression.
+        assert (
+            _util.parallel_decompress_data(
+                decompress, compressed, [0, len(compressed) // 2], workers=2
+            )
+            == small_blocks
+        )
+        with pytest.raises((OSError, ValueError)):
+            _bzip2.decompress_data(compressed[:-10], parallelize=True)
+
+    def test_parallel_handle(self, tmp_path, small_blocks):
+        path = tmp_path / "test.bz2"
+        with _bzip2.compress_handle(str(path), parallelize=True) as f:
+            for x in range(0, len(small_blocks), 700):
+                f.write(small_blocks[x : x + 700])
+        compressed = path.read_bytes()
+        assert len(_bzip2._stream_header.findall(compressed)) == 9
+        assert decompress(compressed) == small_blocks
+
+        with _bzip2.compress_handle(str(path), parallelize=True):
+            pass
+        assert decompress(path.read_bytes()) == b""
+
 
 class TestBzip2(Bzip2Base):
     @pytest.fixture(autouse=True, scope="class")
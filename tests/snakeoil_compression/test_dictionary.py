@@ -0,0 +1,108 @@
+import importlib
+import json
+import zlib
+
+import pytest
+
+from snakeoil import compression
+from snakeoil.compression import Dictionary, _dictionary
+
+SAMPLES = [
+    json.dumps(
+        {
+            "name": f"pkg-{x}",
+            "version": f"1.{x % 7}",
+            "depends": ["dev-lang/python", "dev-python/snakeoil"][: x % 3],
+            "description": "a package of assorted things",
+        }
+    ).encode()
+    for x in range(2000)
+]
+
+
+@pytest.fixture(autouse=True, scope="module")
+def _reload_zstd():
+    # other tests leave the backend reloaded with its native modules hidden.
+    importlib.reload(importlib.import_module("snakeoil.compression._zstd"))
+
+
+@pytest.fixture(params=["zstd", "zlib"])
+def compressor_type(request):
+    if request.param == "zstd" and _dictionary._native_zstd() is None:
+        pytest.skip("no native zstd module")
+    return request.param
+
+
+def test_roundtrip(compressor_type):
+    dictionary = compression.train_dictionary(
+        SAMPLES[:500], compressor_type=compressor_type
+    )
+    assert dictionary.compressor_type == compressor_type
+    assert 0 < len(dictionary)
+
+    plain = compression.compress_many(SAMPLES, compressor_type=compressor_type)
+    trained = compression.compress_many(SAMPLES, dictionary)
+    assert compression.decompress_many(plain, compressor_type=compressor_type) == (
+        SAMPLES
+    )
+    assert compression.decompress_many(trained, dictionary) == SAMPLES
+    # the point of the exercise.
+    assert sum(map(len, trained)) * 2 < sum(map(len, plain))
+
+    # serialized dictionaries are usable as is.
+    restored = Dictionary(compressor_type, bytes(dictionary))
+    assert compression.decompress_many(trained, restored) == SAMPLES
+    assert compression.decompress_many([], restored) == []
+
+
+def test_sizes(compressor_type):
+    dictionary = compression.train_dictionary(
+        SAMPLES, 4096, compressor_type=compressor_type
+    )
+    assert len(dictionary) <= 4096
+    if compressor_type == "zlib":
+        # zlib can't use more than its window.
+        dictionary = compression.train_dictionary(
+            SAMPLES, 1 << 20, compressor_type="zlib"
+        )
+        assert len(dictionary) <= 32 << 10
+
+
+def test_few_samples(compressor_type):
+    # too few samples for zstd's trainer; raw content is used instead.
+    dictionary = compression.train_dictionary(
+        SAMPLES[:3], compressor_type=compressor_type
+    )
+    assert len(dictionary) == sum(map(len, SAMPLES[:3]))
+    assert all(x in bytes(dictionary) for x in SAMPLES[:3])
+    compressed = compression.compress_many(SAMPLES[:10], dictionary)
+    assert compression.decompress_many(compressed, dictionary) == SAMPLES[:10]
+
+
+def test_wrong_dictionary():
+    dictionary = compression.train_dictionary(SAMPLES, compressor_type="zlib")
+    compressed = compression.compress_many(SAMPLES[:1], dictionary)
+    with pytest.raises(zlib.error):
+        compression.decompress_many(compressed, compressor_type="zlib")
+    with pytest.raises(zlib.error):
+        compression.decompress_many([compressed[0][:-4]], dictionary)
+    with pytest.raises(ValueError, match="can't be used"):
+        compression.compress_many(SAMPLES, dictionary, compressor_type="zstd")
+
+
+def test_invalid_types():
+    with pytest.raises(ValueError):
+        Dictionary("bzip2", b"")
+    with pytest.raises(ValueError):
+        compression.train_dictionary(SAMPLES, compressor_type="xz")
+    with pytest.raises(ValueError):
+        compression.compress_many(SAMPLES, compressor_type="xz")
+
+
+def test_no_native_zstd(monkeypatch):
+    monkeypatch.setattr(_dictionary, "_native_zstd", lambda: None)
+    assert compression.train_dictionary(SAMPLES).compressor_type == "zlib"
+    compressed = compression.compress_many(SAMPLES[:5])
+    assert [zlib.decompress(x) for x in compressed] == SAMPLES[:5]
+    with pytest.raises(ValueError, match="native zstd"):
+        compression.train_dictionary(SAMPLES, compressor_type="zstd")
@@ -0,0 +1,82 @@
+import importlib
+from gzip import BadGzipFile, decompress
+
+import pytest
+
+from snakeoil.compression import _gzip
+from snakeoil.process import CommandNotFound, find_binary
+from snakeoil.test import hide_imports
+
+from . import Base, hide_binary
+
+
+def test_no_native():
+    try:
+        find_binary("gzip")
+    except CommandNotFound:
+        pytest.skip("gzip binary not found")
+    with hide_imports("gzip"):
+        importlib.reload(_gzip)
+        assert not _gzip.native
+
+
+def test_missing_gzip_binary():
+    with hide_binary("gzip"):
+        importlib.reload(_gzip)
+        assert _gzip.native
+        assert _gzip.gzip_path is None
+
+
+def test_missing_gzip_binary_and_module():
+    with hide_binary("gzip"), hide_imports("gzip"):
+        importlib.reload(_gzip)
+        with pytest.raises(CommandNotFound, match="gzip"):
+            _gzip.compress_data(b"data")
+
+
+def test_missing_pigz_binary():
+    with hide_binary("pigz"):
+        importlib.reload(_gzip)
+        assert not _gzip.parallelizable
+
+
+class GzipBase(Base):
+    module = "gzip"
+    decompressed_test_data = b"Some text here\n" * 2
+    compressed_test_data = (
+        b"\x1f\x8b\x08\x00\x00\x00\x00\x00\x02\x03\x0b\xce\xcfMU(I\xad(Q\xc8H-J"
+        b"\xe5\nF\xe5\x02\x00<\xe2m@\x1e\x00\x00\x00"
+    )
+
+    def decompress(self, data: bytes) -> bytes:
+        return decompress(data)
+
+
+class TestStdlib(GzipBase):
+    corrupt_data_error = BadGzipFile
+
+    @pytest.fixture(autouse=True, scope="class")
+    def _setup(self):
+        importlib.reload(_gzip)
+
+
+class TestStdlibNoBinary(GzipBase):
+    corrupt_data_error = BadGzipFile
+
+    @pytest.fixture(autouse=True, scope="class")
+    def _setup(self):
+        with hide_binary("gzip", "pigz"):
+            importlib.reload(_gzip)
+            yield
+
+
+class TestGzip(GzipBase):
+    @pytest.fixture(autouse=True, scope="class")
+    def _setup(self):
+        try:
+            find_binary("gzip")
+        except CommandNotFound:
+            pytest.skip("gzip binary not found")
+        with hide_imports("gzip"):
+            importlib.reload(_gzip)
+            yield
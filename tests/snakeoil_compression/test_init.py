@@ -1,15 +1,55 @@
+import importlib
+import io
+import os
 import shutil
+import stat
 import subprocess
 import sys
+import tarfile
+import zipfile
 from contextlib import chdir
 
 import pytest
 
+from snakeoil import compression, process
 from snakeoil.compression import ArComp, ArCompError, _TarBZ2
 
 from . import hide_binary
 
 
+def test_lazy_discovery(monkeypatch):
+    found = []
+    find_binary = process.find_binary
+
+    def mock_find_binary(name):
+        found.append(name)
+        return find_binary(name)
+
+    monkeypatch.setattr(process, "find_binary", mock_find_binary)
+    data = b"Some text here\n" * 100
+    for name in ("bzip2", "gzip", "xz", "zstd"):
+        module = importlib.reload(compression._transforms[name].module)
+        if not module.native:
+            continue
+        compressed = compression.compress_data(name, data)
+        assert compression.decompress_data(name, compressed) == data
+    # native codecs never look for binaries.
+    assert found == []
+
+    capabilities = compression.capabilities()
+    assert sorted(capabilities) == ["bzip2", "gzip", "xz", "zstd"]
+    for name, x in capabilities.items():
+        assert isinstance(x, compression.Capabilities)
+        assert x.binary == shutil.which(name)
+    assert capabilities["bzip2"].parallel_binary == shutil.which("lbzip2")
+    assert capabilities["gzip"].parallel_binary == shutil.which("pigz")
+    assert capabilities["gzip"].parallel == (shutil.which("pigz") is not None)
+    # lookups are cached.
+    count = len(found)
+    assert compression.capabilities() == capabilities
+    assert len(found) == count
+
+
 @pytest.mark.skipif(sys.platform == "darwin", reason="darwin fails with bzip2")
 class TestArComp:
     @pytest.fixture(scope="class")
@@ -49,40 +89,235 @@ class TestArComp:
     def test_missing_tar(self, tmp_path, tar_file):
         with hide_binary("gtar", "tar"), chdir(tmp_path):
             with pytest.raises(ArCompError, match="required binary not found"):
-                ArComp(tar_file, ext=".tar").unpack(dest=tmp_path)
+                ArComp(tar_file, ext=".tar").unpack(dest=tmp_path, native=False)
+
+        # in process extraction doesn't need the binaries at all.
+        with hide_binary("gtar", "tar", "bzip2"), chdir(tmp_path):
+            ArComp(tar_file, ext=".tar").unpack(dest=tmp_path, native=True)
+        assert (tmp_path / "file1").read_text() == "Hello world"
 
-    def test_tar(self, tmp_path, tar_file):
+    @pytest.mark.parametrize("native", (True, False))
+    def test_tar(self, tmp_path, tar_file, native):
         with chdir(tmp_path):
-            ArComp(tar_file, ext=".tar").unpack(dest=tmp_path)
+            ArComp(tar_file, ext=".tar").unpack(dest=tmp_path, native=native)
         assert (tmp_path / "file1").read_text() == "Hello world"
         assert (tmp_path / "file2").read_text() == "Larry the Cow"
 
-    def test_tar_bz2(self, tmp_path, tar_bz2_file):
+    @pytest.mark.parametrize("native", (True, False))
+    def test_tar_bz2(self, tmp_path, tar_bz2_file, native):
         with chdir(tmp_path):
-            ArComp(tar_bz2_file, ext=".tar.bz2").unpack(dest=tmp_path)
+            ArComp(tar_bz2_file, ext=".tar.bz2").unpack(dest=tmp_path, native=native)
         assert (tmp_path / "file1").read_text() == "Hello world"
         assert (tmp_path / "file2").read_text() == "Larry the Cow"
 
-    def test_tbz2(self, tmp_path, tbz2_file):
+    @pytest.mark.parametrize("native", (True, False))
+    def test_tbz2(self, tmp_path, tbz2_file, native):
         with chdir(tmp_path):
-            ArComp(tbz2_file, ext=".tbz2").unpack(dest=tmp_path)
+            ArComp(tbz2_file, ext=".tbz2").unpack(dest=tmp_path, native=native)
         assert (tmp_path / "file1").read_text() == "Hello world"
         assert (tmp_path / "file2").read_text() == "Larry the Cow"
 
     def test_fallback_tbz2(self, tmp_path, tbz2_file):
         with hide_binary(*next(zip(*_TarBZ2.compress_binary[:-1]))):
             with chdir(tmp_path):
-                ArComp(tbz2_file, ext=".tbz2").unpack(dest=tmp_path)
+                ArComp(tbz2_file, ext=".tbz2").unpack(dest=tmp_path, native=False)
             assert (tmp_path / "file1").read_text() == "Hello world"
             assert (tmp_path / "file2").read_text() == "Larry the Cow"
 
     def test_no_fallback_tbz2(self, tmp_path, tbz2_file):
         with hide_binary(*next(zip(*_TarBZ2.compress_binary))), chdir(tmp_path):
             with pytest.raises(ArCompError, match="no compression binary"):
-                ArComp(tbz2_file, ext=".tbz2").unpack(dest=tmp_path)
+                ArComp(tbz2_file, ext=".tbz2").unpack(dest=tmp_path, native=False)
 
     def test_lzma(self, tmp_path, lzma_file):
         dest = tmp_path / "file"
         with chdir(tmp_path):
             ArComp(lzma_file, ext=".lzma").unpack(dest=dest)
         assert (dest).read_bytes() == b"Hello world"
+
+    def test_zst(self, tmp_path):
+        if shutil.which("zstd") is None:
+            pytest.skip("zstd binary not found")
+        path = tmp_path / "test 3.zst"
+        with path.open("wb") as f:
+            subprocess.run(["zstd"], check=True, input=b"Hello world", stdout=f)
+        dest = tmp_path / "file"
+        with chdir(tmp_path):
+            ArComp(str(path), ext=".zst").unpack(dest=dest)
+        assert dest.read_bytes() == b"Hello world"
+
+
+def _tar(members):
+    """Build a tar file from (TarInfo, bytes or None) pairs."""
+    data = io.BytesIO()
+    with tarfile.open(fileobj=data, mode="w") as tar:
+        for info, content in members:
+            if content is not None:
+                info.size = len(content)
+                content = io.BytesIO(content)
+            tar.addfile(info, content)
+    return data.getvalue()
+
+
+def _info(name, type=tarfile.REGTYPE, mode=0o644, **kwargs):
+    info = tarfile.TarInfo(name)
+    info.type = type
+    info.mode = mode
+    info.mtime = 1_000_000
+    for k, v in kwargs.items():
+        setattr(info, k, v)
+    return info
+
+
+class TestNativeUnpack:
+    @pytest.fixture
+    def members(self):
+        members = [(_info("dir", tarfile.DIRTYPE, 0o755), None)]
+        members.extend(
+            (_info(f"dir/file{x}", mode=0o640), b"%i\n" % x * x) for x in range(50)
+        )
+        members.append((_info("dir/link", tarfile.SYMTYPE, linkname="file1"), None))
+        members.append(
+            (_info("dir/hard", tarfile.LNKTYPE, 0o640, linkname="dir/file2"), None)
+        )
+        return members
+
+    def check(self, path, members):
+        for info, content in members:
+            if content is not None:
+                assert (path / info.name).read_bytes() == content
+                st = os.stat(path / info.name)
+                assert stat.S_IMODE(st.st_mode) == info.mode
+                assert st.st_mtime == info.mtime
+        assert os.readlink(path / "dir" / "link") == "file1"
+        assert (path / "dir" / "hard").read_bytes() == (path / "dir/file2").read_bytes()
+        # directory attributes are set last, else the mtime would be wrong.
+        assert os.stat(path / "dir").st_mtime == 1_000_000
+
+    @pytest.mark.parametrize("workers", (None, 4))
+    @pytest.mark.parametrize(
+        ("ext", "compressor"),
+        (
+            (".tar", None),
+            (".tar.gz", "gzip"),
+            (".tbz2", "bzip2"),
+            (".txz", "xz"),
+            (".tar.zst", "zstd"),
+        ),
+    )
+    def test_tar(self, tmp_path, members, ext, compressor, workers):
+        data = _tar(members)
+        if compressor is not None:
+            try:
+                data = compression.compress_data(compressor, data)
+            except (ImportError, compression.process.CommandNotFound):
+                pytest.skip(f"{compressor} support unavailable")
+        path = tmp_path / f"test{ext}"
+        path.write_bytes(data)
+        (dest := tmp_path / "dest").mkdir()
+        progress = []
+        with hide_binary("tar", "gtar"):
+            ArComp(str(path), ext=ext).unpack(
+                cwd=str(dest),
+                native=True,
+                workers=workers,
+                progress=lambda name, size: progress.append((name, size)),
+            )
+        self.check(dest, members)
+        assert progress == [(info.name, info.size) for info, _ in members]
+
+    @pytest.mark.parametrize(
+        "info",
+        (
+            _info("../escape"),
+            _info("link", tarfile.SYMTYPE, linkname="../../etc/passwd"),
+            _info("dev", tarfile.CHRTYPE),
+        ),
+    )
+    def test_tar_unsafe(self, tmp_path, info):
+        path = tmp_path / "test.tar"
+        path.write_bytes(_tar([(info, None if info.type != tarfile.REGTYPE else b"")]))
+        (dest := tmp_path / "dest").mkdir()
+        with pytest.raises(ArCompError, match="unpacking failed"):
+            ArComp(str(path), ext=".tar").unpack(cwd=str(dest), native=True)
+        assert not list(dest.iterdir())
+
+    def test_tar_fallback(self, tmp_path, monkeypatch, members):
+        path = tmp_path / "test.tar.Z"
+        path.write_bytes(b"")
+        calls = []
+        monkeypatch.setattr(
+            compression._Archive, "unpack", lambda *a, **kw: calls.append(kw)
+        )
+        # no python support for compress(1).
+        ArComp(str(path), ext=".tar.Z").unpack(native=True)
+        # nor for spawn arguments.
+        ArComp(str(path), ext=".tar").unpack(native=True, env={})
+        # and it's opt in.
+        ArComp(str(path), ext=".tar").unpack()
+        assert calls == [{}, {"env": {}}, {}]
+
+    @pytest.mark.parametrize("workers", (None, 4))
+    def test_zip(self, tmp_path, workers):
+        path = tmp_path / "test.zip"
+        with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zf:
+            zf.writestr("dir/", b"")
+            for x in range(50):
+                info = zipfile.ZipInfo(f"dir/file{x}")
+                info.external_attr = (stat.S_IFREG | 0o4775) << 16
+                zf.writestr(info, b"%i\n" % x * x)
+            info = zipfile.ZipInfo("dir/link")
+            info.external_attr = (stat.S_IFLNK | 0o777) << 16
+            zf.writestr(info, "file1")
+            zf.writestr("../escape", b"sanitized")
+        (dest := tmp_path / "dest").mkdir()
+        progress = []
+        with hide_binary("unzip"):
+            ArComp(str(path), ext=".zip").unpack(
+                cwd=str(dest),
+                native=True,
+                workers=workers,
+                progress=lambda name, size: progress.append(name),
+            )
+        for x in range(50):
+            file = dest / "dir" / f"file{x}"
+            assert file.read_bytes() == b"%i\n" % x * x
+            # setuid and group/other write are dropped.
+            assert stat.S_IMODE(file.stat().st_mode) == 0o755
+        assert os.readlink(dest / "dir" / "link") == "file1"
+        assert (dest / "escape").read_bytes() == b"sanitized"
+        assert len(progress) == 53
+
+    def test_zip_no_directory_entries(self, tmp_path):
+        # parent directories only implied by member names; workers mustn't race
+        # creating them.
+        path = tmp_path / "test.zip"
+        names = [f"a{x % 3}/b{x % 5}/c{x % 7}/file{x}" for x in range(200)]
+        with zipfile.ZipFile(path, "w") as zf:
+            for name in names:
+                zf.writestr(name, name)
+        for attempt in range(5):
+            (dest := tmp_path / f"dest{attempt}").mkdir()
+            ArComp(str(path), ext=".zip").unpack(cwd=str(dest), native=True, workers=8)
+            for name in names:
+                assert (dest / name).read_text() == name
+
+    def test_zip_unsafe_link(self, tmp_path):
+        path = tmp_path / "test.zip"
+        with zipfile.ZipFile(path, "w") as zf:
+            info = zipfile.ZipInfo("link")
+            info.external_attr = (stat.S_IFLNK | 0o777) << 16
+            zf.writestr(info, "../../etc")
+        (dest := tmp_path / "dest").mkdir()
+        with pytest.raises(ArCompError, match="leaves"):
+            ArComp(str(path), ext=".zip").unpack(cwd=str(dest), native=True)
+        ArComp(str(path), ext=".zip").unpack(
+            cwd=str(dest), native=True, filter="fully_trusted"
+        )
+        assert os.readlink(dest / "link") == "../../etc"
+
+    def test_corrupt(self, tmp_path):
+        path = tmp_path / "test.zip"
+        path.write_bytes(b"not a zip file")
+        with pytest.raises(ArCompError, match="unpacking failed"):
+            ArComp(str(path), ext=".zip").unpack(cwd=str(tmp_path), native=True)
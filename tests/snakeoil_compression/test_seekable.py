@@ -0,0 +1,190 @@
+import bz2
+import importlib
+import io
+import lzma
+import os
+import random
+import shutil
+import struct
+import subprocess
+import tarfile
+
+import pytest
+
+from snakeoil import compression
+from snakeoil.compression import SeekableBlock, SeekableReader
+
+
+@pytest.fixture(autouse=True, scope="module")
+def _reload_backends():
+    # other tests leave the backends reloaded with their native modules hidden.
+    for module in ("_bzip2", "_gzip", "_xz", "_zstd"):
+        importlib.reload(importlib.import_module(f"snakeoil.compression.{module}"))
+
+
+DATA = b"".join(b"%i %s\n" % (x, os.urandom(4).hex().encode()) for x in range(40000))
+
+
+def check_reader(reader, data=DATA):
+    assert reader.size == len(data)
+    rng = random.Random(0)
+    for _ in range(20):
+        offset = rng.randrange(len(data))
+        size = rng.randrange(len(data) // 4)
+        assert reader.seek(offset) == offset
+        assert reader.read(size) == data[offset : offset + size]
+        assert reader.tell() == min(offset + size, len(data))
+    reader.seek(0)
+    assert reader.read() == data
+    assert reader.read(10) == b""
+
+
+@pytest.fixture
+def write(tmp_path):
+    def f(data, name="data"):
+        path = tmp_path / name
+        path.write_bytes(data)
+        return str(path)
+
+    return f
+
+
+class TestSeekableReader:
+    def test_bzip2_blocks(self, write):
+        # level 1 is 100k blocks.
+        path = write(bz2.compress(DATA, 1))
+        with SeekableReader(path) as reader:
+            assert reader.compressor_type == "bzip2"
+            assert len(reader.index) == len(DATA) // 100_000 + 1
+            assert all(x.kind == "bzip2" for x in reader.index)
+            check_reader(reader)
+            index = reader.index
+
+        # a previously built index avoids decompressing everything.
+        with SeekableReader(path, index=index) as reader:
+            assert not reader._cache
+            reader.seek(len(DATA) - 10)
+            assert reader.read() == DATA[-10:]
+            assert list(reader._cache) == [len(index) - 1]
+
+    def test_bzip2_streams(self, write, monkeypatch):
+        from snakeoil.compression import _bzip2
+
+        monkeypatch.setattr(_bzip2, "_block_size", lambda level: 50_000)
+        path = write(compression.compress_data("bzip2", DATA, parallelize=True))
+        with SeekableReader(path) as reader:
+            assert len(reader.index) == len(DATA) // 50_000 + 1
+            check_reader(reader)
+
+    def test_xz_blocks(self, write):
+        if shutil.which("xz") is None:
+            pytest.skip("xz binary not found")
+        path = write(DATA)
+        subprocess.run(["xz", "-1", "--block-size=100000", path], check=True)
+        with SeekableReader(path + ".xz") as reader:
+            assert reader.compressor_type == "xz"
+            assert len(reader.index) == len(DATA) // 100_000 + 1
+            assert all(x.kind == "xz" for x in reader.index)
+            check_reader(reader)
+
+    def test_xz_streams(self, write):
+        streams = [
+            lzma.compress(DATA[x : x + 70_000]) for x in range(0, len(DATA), 70_000)
+        ]
+        # stream padding is allowed between streams.
+        path = write(b"\0\0\0\0".join(streams))
+        with SeekableReader(path) as reader:
+            assert len(reader.index) == len(streams)
+            check_reader(reader)
+
+    def test_zstd_frames(self, write):
+        pytest.importorskip("zstandard")
+        chunks = compression.compress_chunks("zstd", iter([DATA]), checkpoint=100_000)
+        path = write(b"".join(chunks))
+        with SeekableReader(path) as reader:
+            assert reader.compressor_type == "zstd"
+            assert len(reader.index) == len(DATA) // 100_000 + 1
+            check_reader(reader)
+
+    def test_zstd_seek_table(self, write):
+        zstandard = pytest.importorskip("zstandard")
+        cctx = zstandard.ZstdCompressor()
+        frames = [
+            cctx.compress(DATA[x : x + 100_000]) for x in range(0, len(DATA), 100_000)
+        ]
+        table = b"".join(
+            struct.pack("<II", len(frame), len(DATA[x * 100_000 : (x + 1) * 100_000]))
+            for x, frame in enumerate(frames)
+        )
+        table += struct.pack("<IBI", len(frames), 0, 0x8F92EAB1)
+        skippable = struct.pack("<II", 0x184D2A5E, len(table)) + table
+        path = write(b"".join(frames) + skippable)
+        with SeekableReader(path) as reader:
+            assert len(reader.index) == len(frames)
+            check_reader(reader)
+
+    def test_stream_index(self, write):
+        index = []
+        chunks = compression.compress_chunks(
+            "gzip", iter([DATA]), checkpoint=100_000, index=index
+        )
+        path = write(b"".join(chunks))
+        with SeekableReader(path, index=index) as reader:
+            assert reader.compressor_type == "gzip"
+            assert [(x.offset, x.position) for x in reader.index] == index
+            check_reader(reader)
+
+        # without an index, it's a single block.
+        with SeekableReader(path) as reader:
+            assert reader.index == (
+                SeekableBlock(0, os.path.getsize(path), 0, len(DATA)),
+            )
+            check_reader(reader)
+
+    def test_cache_size(self, write):
+        path = write(bz2.compress(DATA, 1))
+        with SeekableReader(path, cache_size=2) as reader:
+            reader.read()
+            assert len(reader._cache) == 2
+            assert list(reader._cache) == [len(reader.index) - 2, len(reader.index) - 1]
+            reader.seek(0)
+            reader.read(1)
+            assert list(reader._cache) == [len(reader.index) - 1, 0]
+
+    def test_seek(self, write):
+        path = write(lzma.compress(DATA))
+        with SeekableReader(path) as reader:
+            assert reader.seekable() and reader.readable()
+            assert reader.seek(-10, os.SEEK_END) == len(DATA) - 10
+            assert reader.seek(-10, os.SEEK_CUR) == len(DATA) - 20
+            assert reader.read() == DATA[-20:]
+            assert reader.seek(len(DATA) + 10) == len(DATA) + 10
+            assert reader.read() == b""
+            with pytest.raises(ValueError):
+                reader.seek(-1)
+            with pytest.raises(ValueError):
+                reader.seek(0, 5)
+        with pytest.raises(ValueError):
+            reader.read()
+
+    def test_tarfile(self, tmp_path, write):
+        data = io.BytesIO()
+        with tarfile.open(fileobj=data, mode="w") as tar:
+            for x in range(20):
+                info = tarfile.TarInfo(f"file{x}")
+                content = DATA[x * 10_000 : (x + 1) * 10_000]
+                info.size = len(content)
+                tar.addfile(info, io.BytesIO(content))
+        path = write(bz2.compress(data.getvalue(), 1))
+        with SeekableReader(path) as reader:
+            with tarfile.open(fileobj=io.BufferedReader(reader), mode="r:") as tar:
+                member = tar.extractfile("file15")
+                assert member.read() == DATA[150_000:160_000]
+
+    def test_invalid(self, write):
+        with pytest.raises(ValueError, match="empty"):
+            SeekableReader(write(b""))
+        with pytest.raises(ValueError, match="unknown compression format"):
+            SeekableReader(write(b"not compressed"))
+        with pytest.raises(ValueError, match="xz"):
+            SeekableReader(write(lzma.compress(DATA)[:-10]))
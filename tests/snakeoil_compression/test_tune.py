@@ -0,0 +1,111 @@
+import gzip
+
+import pytest
+
+from snakeoil import compression
+from snakeoil.compression import LevelBenchmark, _tune
+
+DATA = b"".join(b"%i %s\n" % (x, b"abc" * (x % 7)) for x in range(20000))
+
+
+def results(*values):
+    return [LevelBenchmark("gzip", level, *x) for level, x in enumerate(values, 1)]
+
+
+@pytest.fixture(autouse=True)
+def _clear_auto_levels():
+    _tune._auto_levels.clear()
+    yield
+    _tune._auto_levels.clear()
+
+
+def test_benchmark():
+    measured = compression.benchmark([DATA, DATA[:1000]], ("gzip",), (1, 9), repeat=1)
+    assert [(x.compressor_type, x.level) for x in measured] == [
+        ("gzip", 1),
+        ("gzip", 9),
+    ]
+    for x in measured:
+        assert x.ratio > 1
+        assert x.compress_mbps > 0
+        assert x.decompress_mbps > 0
+    assert measured[1].ratio >= measured[0].ratio
+
+    # levels default to those the backend supports.
+    measured = compression.benchmark(DATA, ("gzip",), repeat=1)
+    assert [x.level for x in measured] == list(range(1, 10))
+
+    with pytest.raises(ValueError, match="empty"):
+        compression.benchmark([b""], ("gzip",))
+
+
+def test_benchmark_default_corpus():
+    assert _tune._sample_corpus()
+    assert sum(map(len, _tune._sample_corpus(1000))) < 100_000
+    assert compression.benchmark(compressor_types=("gzip",), levels=(1,), repeat=1)
+
+
+def test_pick_level():
+    measured = results(
+        (2.0, 100.0, 300.0),
+        (2.5, 50.0, 300.0),
+        (3.0, 10.0, 200.0),
+        (3.1, 1.0, 100.0),
+    )
+    assert compression.pick_level(measured, min_ratio=2.4).level == 2
+    assert compression.pick_level(measured, min_ratio=3.1).level == 4
+    assert compression.pick_level(measured, min_compress_mbps=20).level == 2
+    assert compression.pick_level(measured, min_decompress_mbps=250).level == 2
+    assert (
+        compression.pick_level(measured, min_ratio=2.4, min_compress_mbps=5).level == 2
+    )
+    assert compression.pick_level(measured, min_ratio=3, min_compress_mbps=5).level == 3
+    # defaults to reaching 90% of the best ratio.
+    assert compression.pick_level(measured).level == 3
+
+    # nothing meets the targets; the closest is picked.
+    assert compression.pick_level(measured, min_ratio=5).level == 4
+    assert compression.pick_level(measured, min_compress_mbps=1000).level == 1
+    assert (
+        compression.pick_level(measured, min_ratio=3, min_compress_mbps=50).level == 1
+    )
+
+    with pytest.raises(ValueError):
+        compression.pick_level([])
+
+
+def test_auto_level(monkeypatch):
+    calls = []
+
+    def benchmark(data, compressor_types, repeat):
+        calls.append((len(data), compressor_types))
+        return results((2.0, 100.0, 300.0), (3.0, 10.0, 200.0))
+
+    monkeypatch.setattr(_tune, "benchmark", benchmark)
+    assert compression.auto_level("gzip", DATA, min_ratio=2.5) == 2
+    assert calls == [(min(len(DATA), _tune._sample_size), ("gzip",))]
+    # cached per data class and targets.
+    assert compression.auto_level("gzip", b"other", min_ratio=2.5) == 2
+    assert len(calls) == 1
+    assert compression.auto_level("gzip", DATA, min_compress_mbps=50) == 1
+    assert compression.auto_level("gzip", DATA, "blobs", min_ratio=2.5) == 2
+    assert len(calls) == 3
+    # empty data has nothing to measure, and isn't cached.
+    assert compression.auto_level("gzip", b"", "empty") == 1
+    assert len(calls) == 3
+    assert ("gzip", "empty", None, None, None) not in _tune._auto_levels
+
+
+def test_compress_data_auto(monkeypatch):
+    levels = []
+    transform = compression._transforms["gzip"]
+    orig = transform.compress_data
+    monkeypatch.setattr(
+        transform,
+        "compress_data",
+        lambda data, level, **kwds: levels.append(level) or orig(data, level, **kwds),
+    )
+    data = compression.compress_data("gzip", DATA, level="auto", data_class="test")
+    assert gzip.decompress(data) == DATA
+    assert levels[-1] in range(1, 10)
+    assert ("gzip", "test", None, None, None) in _tune._auto_levels
@@ -0,0 +1,226 @@
+import asyncio
+import bz2
+import shutil
+
+import pytest
+
+from snakeoil import _async, compression, data_source
+from snakeoil.compression import _util
+
+
+@pytest.fixture
+def bzip2():
+    if (path := shutil.which("bzip2")) is None:
+        pytest.skip("bzip2 binary not found")
+    return path
+
+
+DATA = b"".join(b"%i\n" % x for x in range(20000))
+
+
+def test_filter_chunks(bzip2):
+    # large enough to deadlock if the pipes weren't serviced concurrently.
+    chunks = (DATA[x : x + 1000] for x in range(0, len(DATA), 1000))
+    compressed = b"".join(_util.compress_chunks(bzip2, chunks, 1))
+    assert bz2.decompress(compressed) == DATA
+    assert b"".join(_util.decompress_chunks(bzip2, iter([compressed]))) == DATA
+
+
+def test_filter_chunks_errors(bzip2):
+    with pytest.raises(ValueError, match="decompression returned"):
+        b"".join(_util.decompress_chunks(bzip2, iter([b"not bzip2 data"])))
+
+    def chunks():
+        yield DATA
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError, match="boom"):
+        b"".join(_util.compress_chunks(bzip2, chunks()))
+
+    # abandoning the output mustn't leave anything behind.
+    output = _util.compress_chunks(bzip2, iter([DATA] * 100))
+    next(output)
+    output.close()
+
+
+def test_parallel_compress_chunks():
+    index = []
+    chunks = (DATA[x : x + 999] for x in range(0, len(DATA), 999))
+    compressed = b"".join(
+        _util.parallel_compress_chunks(
+            bz2.compress, chunks, 10000, workers=2, index=index
+        )
+    )
+    assert bz2.decompress(compressed) == DATA
+    assert [x[1] for x in index] == list(range(0, len(DATA), 10000))
+    offsets = [x[0] for x in index] + [len(compressed)]
+    for x, y in zip(offsets, offsets[1:]):
+        assert bz2.decompress(compressed[x:y])
+
+
+def test_decompress_handle_index(tmp_path, bzip2):
+    index = []
+    path = tmp_path / "data.bz2"
+    path.write_bytes(
+        b"".join(
+            _util.native_compress_chunks(
+                bz2.BZ2Compressor, iter([DATA]), checkpoint=10000, index=index
+            )
+        )
+    )
+    handle = _util.decompress_handle(bzip2, str(path), index=index)
+    try:
+        handle.seek(len(DATA) - 100)
+        assert handle.read() == DATA[-100:]
+        handle.seek(10005)
+        assert handle.read(10) == DATA[10005:10015]
+        handle.seek(5)
+        assert handle.read(10) == DATA[5:15]
+    finally:
+        handle.close()
+
+    # without an index, it still works; it just starts from the beginning.
+    handle = _util.decompress_handle(bzip2, str(path))
+    try:
+        handle.seek(10005)
+        assert handle.read(10) == DATA[10005:10015]
+        handle.seek(5)
+        assert handle.read(10) == DATA[5:15]
+    finally:
+        handle.close()
+
+
+def test_async_binary(bzip2, monkeypatch):
+    # the event loop must not be blocked driving a process synchronously.
+    monkeypatch.setattr(_util, "_drive_process", None)
+    monkeypatch.setattr(_util, "filter_chunks", None)
+
+    async def chunks():
+        for x in range(0, len(DATA), 1000):
+            yield DATA[x : x + 1000]
+
+    async def run():
+        compressed = await _util.acompress_data(bzip2, DATA, 1)
+        streamed = b"".join(
+            [x async for x in _util.acompress_chunks(bzip2, chunks(), 1)]
+        )
+        decompressed = [
+            x async for x in _util.adecompress_chunks(bzip2, [compressed, streamed])
+        ]
+        return compressed, streamed, b"".join(decompressed)
+
+    compressed, streamed, decompressed = asyncio.run(run())
+    assert bz2.decompress(compressed) == DATA
+    assert bz2.decompress(streamed) == DATA
+    assert decompressed == DATA * 2
+
+    with pytest.raises(ValueError, match="decompression returned"):
+        asyncio.run(_util.adecompress_data(bzip2, b"not bzip2 data"))
+
+    async def corrupt():
+        async for _ in _util.adecompress_chunks(bzip2, [b"not bzip2 data"]):
+            pass
+
+    with pytest.raises(ValueError, match="decompression returned"):
+        asyncio.run(corrupt())
+
+
+def test_set_async_concurrency():
+    with pytest.raises(ValueError):
+        compression.set_async_concurrency(0)
+
+    async def run():
+        return await asyncio.gather(
+            *(_util.offload(bz2.compress, DATA[:x]) for x in range(10))
+        )
+
+    original = _async._concurrency
+    try:
+        compression.set_async_concurrency(2)
+        assert [bz2.decompress(x) for x in asyncio.run(run())] == [
+            DATA[:x] for x in range(10)
+        ]
+        # the pool and the limit are shared with data_source.
+        assert compression.set_async_concurrency is data_source.set_async_concurrency
+        assert _async._executor._max_workers == 2
+    finally:
+        compression.set_async_concurrency(1)
+        _async._concurrency = original
+
+
+def test_afilter_chunks_limit(bzip2):
+    async def run():
+        stream = _util.acompress_chunks(bzip2, [DATA])
+        await anext(stream)
+        # a running process holds a slot until it exits.
+        assert _async.limit()._value == 1
+        async for _ in stream:
+            pass
+        assert _async.limit()._value == 2
+
+    original = _async._concurrency
+    try:
+        compression.set_async_concurrency(2)
+        asyncio.run(run())
+    finally:
+        compression.set_async_concurrency(1)
+        _async._concurrency = original
+
+
+class TestContextPool:
+    def test_reuse(self):
+        created = []
+        reset = []
+
+        def factory():
+            created.append(object())
+            return created[-1]
+
+        pool = _util.ContextPool(factory, reset.append, max_idle=1)
+        with pool.context() as first:
+            with pool.context() as second:
+                assert first is not second
+        assert reset == [second, first]
+        # only max_idle contexts are kept.
+        with pool.context() as context:
+            assert context is second
+        with pool.context() as context:
+            assert context is second
+        assert len(created) == 2
+
+        pool.clear()
+        with pool.context() as context:
+            assert context is created[-1]
+        assert len(created) == 3
+
+    def test_discard_on_error(self):
+        pool = _util.ContextPool(object)
+        with pytest.raises(ValueError):
+            with pool.context() as failed:
+                raise ValueError()
+        with pool.context() as context:
+            assert context is not failed
+
+    def test_threads(self):
+        from concurrent.futures import ThreadPoolExecutor
+
+        pool = _util.ContextPool(list, list.clear, max_idle=8)
+
+        def use(x):
+            with pool.context() as context:
+                assert not context
+                context.append(x)
+                return x
+
+        with ThreadPoolExecutor(4) as executor:
+            assert list(executor.map(use, range(1000))) == list(range(1000))
+
+    def test_shared_pools(self):
+        pool = _util.context_pool(("test", "compress", 1), object)
+        assert _util.context_pool(("test", "compress", 1), list) is pool
+        assert _util.context_pool(("test", "compress", 2), object) is not pool
+        with pool.context() as context:
+            pass
+        _util.clear_context_pools()
+        with pool.context() as new:
+            assert new is not context
@@ -1,5 +1,5 @@
 import importlib
-from lzma import decompress
+from lzma import LZMAError, decompress
 
 import pytest
 
@@ -17,9 +17,37 @@ def test_no_native():
 
 
 def test_missing_xz_binary():
+    data = b"Some text here\n"
     with hide_binary("xz"):
-        with pytest.raises(CommandNotFound, match="xz"):
+        # the binary is only looked for once it's needed.
+        importlib.reload(_xz)
+        assert decompress(_xz.compress_data(data)) == data
+        assert not _xz.capabilities().binary
+        # like the other compatibility attributes, missing is None.
+        assert _xz.xz_path is None
+        with hide_imports("lzma"):
             importlib.reload(_xz)
+            with pytest.raises(CommandNotFound, match="xz"):
+                _xz.compress_data(data)
+
+
+def test_parallel_handles_without_binary(tmp_path):
+    data = b"".join(b"%i\n" % x for x in range(2000))
+    path = str(tmp_path / "data.xz")
+    with hide_binary("xz"):
+        importlib.reload(_xz)
+        # parallelism falls back to in process rather than needing xz.
+        assert _xz.parallelizable
+        handle = _xz.compress_handle(path, parallelize=True)
+        handle.write(data)
+        handle.close()
+        assert decompress((tmp_path / "data.xz").read_bytes()) == data
+        with _xz.decompress_handle(path, parallelize=True) as f:
+            assert f.read() == data
+        with hide_imports("lzma"):
+            importlib.reload(_xz)
+            assert not _xz.parallelizable
+    importlib.reload(_xz)
 
 
 class XzBase(Base):
@@ -37,6 +65,8 @@ class XzBase(Base):
 
 
 class TestStdlib(XzBase):
+    corrupt_data_error = LZMAError
+
     @pytest.fixture(autouse=True, scope="class")
     def _setup(self):
         try:
@@ -45,6 +75,29 @@ class TestStdlib(XzBase):
             pytest.skip("xz binary not found")
         importlib.reload(_xz)
 
+    @pytest.fixture
+    def small_blocks(self, monkeypatch):
+        monkeypatch.setattr(_xz, "parallel_block_size", 1000)
+        return b"".join(b"%i\n" % x for x in range(2000))
+
+    def test_parallel_blocks(self, small_blocks):
+        compressed = _xz.compress_data(small_blocks, parallelize=True)
+        assert len(_xz._stream_offsets(compressed)) == 9
+        assert decompress(compressed) == small_blocks
+        assert _xz.decompress_data(compressed, parallelize=True) == small_blocks
+
+    def test_small_dictionary(self):
+        import lzma
+
+        data = b"".join(b"%i\n" % x for x in range(2000))
+        assert _xz._filters(9, len(data))[0]["dict_size"] == 16 << 10
+        assert _xz._filters(9, 0)[0]["dict_size"] == 4096
+        assert _xz._filters(1, 100 << 20)[0]["dict_size"] == 1 << 20
+        # shrinking the dictionary to the data doesn't cost any ratio.
+        compressed = _xz.compress_data(data, 9)
+        assert len(compressed) == len(lzma.compress(data, preset=9))
+        assert decompress(compressed) == data
+
 
 class TestXz(XzBase):
     @pytest.fixture(autouse=True, scope="class")
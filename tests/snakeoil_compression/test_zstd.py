@@ -0,0 +1,93 @@
+import importlib
+
+import pytest
+
+from snakeoil.compression import _zstd
+from snakeoil.process import CommandNotFound, find_binary
+from snakeoil.test import hide_imports
+
+from . import Base, hide_binary
+
+try:
+    from compression.zstd import ZstdError, decompress
+except ImportError:
+    zstandard = pytest.importorskip("zstandard")
+    ZstdError = zstandard.ZstdError
+
+    def decompress(data):
+        reader = zstandard.ZstdDecompressor().stream_reader(
+            data, read_across_frames=True
+        )
+        return reader.read()
+
+
+def _require_binary():
+    try:
+        find_binary("zstd")
+    except CommandNotFound:
+        pytest.skip("zstd binary not found")
+
+
+def test_no_native():
+    _require_binary()
+    with hide_imports("compression.zstd", "zstandard"):
+        importlib.reload(_zstd)
+        assert not _zstd.native
+
+
+def test_missing_zstd_binary_and_module():
+    with hide_binary("zstd"), hide_imports("compression.zstd", "zstandard"):
+        importlib.reload(_zstd)
+        assert not _zstd.parallelizable
+        with pytest.raises(CommandNotFound, match="zstd"):
+            _zstd.compress_data(b"data")
+
+
+def test_missing_zstd_binary():
+    with hide_binary("zstd"):
+        importlib.reload(_zstd)
+        assert _zstd.native
+        # threading is done in process.
+        assert _zstd.parallelizable
+
+
+class ZstdBase(Base):
+    module = "zstd"
+    decompressed_test_data = b"Some text here\n" * 2
+    compressed_test_data = (
+        b"(\xb5/\xfd \x1e\xad\x00\x00xSome text here\n\x01\x00\xd2\xcd:"
+    )
+
+    def decompress(self, data: bytes) -> bytes:
+        return decompress(data)
+
+    def test_decompress_multiple_frames(self):
+        data = self.compressed_test_data * 2
+        assert self.decompressed_test_data * 2 == _zstd.decompress_data(data)
+
+
+class TestNative(ZstdBase):
+    corrupt_data_error = ZstdError
+
+    @pytest.fixture(autouse=True, scope="class")
+    def _setup(self):
+        importlib.reload(_zstd)
+
+
+class TestNativeNoBinary(ZstdBase):
+    corrupt_data_error = ZstdError
+
+    @pytest.fixture(autouse=True, scope="class")
+    def _setup(self):
+        with hide_binary("zstd"):
+            importlib.reload(_zstd)
+            yield
+
+
+class TestZstd(ZstdBase):
+    @pytest.fixture(autouse=True, scope="class")
+    def _setup(self):
+        _require_binary()
+        with hide_imports("compression.zstd", "zstandard"):
+            importlib.reload(_zstd)
+            yield
@@ -1,7 +1,9 @@
+import re
 from io import StringIO
 
 import pytest
 
+from snakeoil import bash
 from snakeoil.bash import (
     BashParseError,
     read_bash,
@@ -234,3 +236,9 @@ class TestReadBashDict:
 
     def test_wordchards(self):
         assert self.invoke_and_close(StringIO("x=-*")) == {"x": "-*"}
+
+
+def test_regexps_rebound():
+    # once reified, the module globals are the compiled patterns, not proxies.
+    assert bash.var_find.pattern
+    assert type(bash.var_find) is re.Pattern
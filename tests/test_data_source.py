@@ -1,8 +1,14 @@
+import asyncio
+import errno
+import gzip
+import io
+import lzma
+import sys
 from functools import partial
 
 import pytest
 
-from snakeoil import compression, data_source
+from snakeoil import _async, compression, data_source
 
 
 class TestDataSource:
@@ -69,8 +75,9 @@ class TestDataSource:
     def test_transfer_to_path(self, tmp_path):
         data = self._mk_data()
         reader = self.get_obj(data=data)
-        if isinstance(reader, data_source.bz2_source):
-            writer = data_source.bz2_source(tmp_path / "transfer_to_path", mutable=True)
+        if isinstance(reader, data_source._compressed_source):
+            # the compressed file itself is transferred.
+            writer = type(reader)(tmp_path / "transfer_to_path", mutable=True)
         else:
             writer = data_source.local_source(
                 tmp_path / "transfer_to_path", mutable=True
@@ -93,6 +100,30 @@ class TestDataSource:
 
         self.assertContents(reader, writer)
 
+    def test_read(self):
+        obj = self.get_obj()
+        assert obj.read_bytes() == b"foonani"
+        assert obj.read_text() == "foonani"
+
+    def test_aread(self):
+        obj = self.get_obj()
+
+        async def run():
+            return await asyncio.gather(obj.aread_bytes(), obj.aread_text())
+
+        assert asyncio.run(run()) == [b"foonani", "foonani"]
+
+    def test_atransfer_to_data_source(self):
+        data = self._mk_data()
+        reader = self.get_obj(data=data)
+        if self.supports_mutable:
+            writer = self.get_obj(data="", mutable=True)
+        else:
+            writer = data_source.data_source("", mutable=True)
+        asyncio.run(reader.atransfer_to_data_source(writer))
+
+        self.assertContents(reader, writer)
+
 
 class TestLocalSource(TestDataSource):
     def get_obj(self, data="foonani", mutable=False, test_creation=False):
@@ -124,16 +155,57 @@ class TestLocalSource(TestDataSource):
         with obj.bytes_fileobj() as f:
             assert f.read() == data
 
+    def test_transfer_in_kernel(self, tmp_path, monkeypatch):
+        data = self._mk_data()
+        reader = self.get_obj(data=data)
+        calls = []
+        real = data_source._in_kernel_copiers[0]
+
+        def copier(src, dest, count):
+            calls.append(count)
+            return real(src, dest, count)
+
+        monkeypatch.setattr(data_source, "_in_kernel_copiers", (copier,))
+        reader.transfer_to_path(tmp_path / "dest")
+        assert calls
+        assert (tmp_path / "dest").read_text() == data
+
+    def test_transfer_in_kernel_fallback(self, tmp_path, monkeypatch):
+        data = self._mk_data()
+        reader = self.get_obj(data=data)
+
+        def unsupported(src, dest, count):
+            raise OSError(errno.EXDEV, "cross device")
+
+        def failed(src, dest, count):
+            raise OSError(errno.EIO, "io error")
+
+        monkeypatch.setattr(data_source, "_in_kernel_copiers", (unsupported,))
+        reader.transfer_to_path(tmp_path / "dest", bufsize=1024)
+        assert (tmp_path / "dest").read_text() == data
+
+        # real failures must not be masked by the fallback.
+        monkeypatch.setattr(data_source, "_in_kernel_copiers", (failed,))
+        with pytest.raises(OSError):
+            reader.transfer_to_path(tmp_path / "dest2")
+
 
 class TestBz2Source(TestDataSource):
+    source_cls = data_source.bz2_source
+    ext = ".bz2"
+
+    @staticmethod
+    def compress(data):
+        return compression.compress_data("bzip2", data)
+
     def get_obj(self, data="foonani", mutable=False, test_creation=False):
-        self.fp = self.dir / "bz2source.test.bz2"
+        self.fp = self.dir / f"compressed.test{self.ext}"
         if not test_creation:
             if isinstance(data, str):
                 data = data.encode()
             with open(self.fp, "wb") as f:
-                f.write(compression.compress_data("bzip2", data))
-        return data_source.bz2_source(self.fp, mutable=mutable)
+                f.write(self.compress(data))
+        return self.source_cls(self.fp, mutable=mutable)
 
     def test_bytes_fileobj(self):
         data = b"foonani\xf2"
@@ -142,6 +214,75 @@ class TestBz2Source(TestDataSource):
         with obj.bytes_fileobj() as f:
             assert f.read() == data
 
+    def test_streaming_read(self):
+        obj = self.get_obj(data=self._mk_data())
+        with obj.bytes_fileobj() as f:
+            # not pulled into memory up front
+            assert not isinstance(f, io.BytesIO)
+            assert f.read(5) == b"01234"
+        with obj.text_fileobj() as f:
+            assert f.readline() == self._mk_data()
+
+    def test_atomic_writers(self):
+        obj = self.get_obj()
+        with pytest.raises(TypeError):
+            obj.atomic_bytes_fileobj()
+
+        obj = self.get_obj(mutable=True)
+        with obj.atomic_bytes_fileobj() as f:
+            f.write(b"dar")
+            # the original is untouched until closed
+            assert obj.read_bytes() == b"foonani"
+        assert obj.read_bytes() == b"dar"
+        with obj.atomic_text_fileobj() as f:
+            f.write("nani")
+        assert obj.read_text() == "nani"
+        assert [x.name for x in self.dir.iterdir()] == [self.fp.name]
+
+        with pytest.raises(RuntimeError):
+            with obj.atomic_text_fileobj() as f:
+                f.write("discarded")
+                raise RuntimeError
+        assert obj.read_text() == "nani"
+        assert [x.name for x in self.dir.iterdir()] == [self.fp.name]
+
+    def test_transfer_from_data_source(self):
+        data = self._mk_data()
+        writer = self.get_obj(data="", mutable=True)
+        data_source.text_data_source(data).transfer_to_data_source(writer)
+        assert writer.read_text() == data
+
+
+class TestXzSource(TestBz2Source):
+    source_cls = data_source.xz_source
+    ext = ".xz"
+    compress = staticmethod(lzma.compress)
+
+
+class TestGzipSource(TestBz2Source):
+    source_cls = data_source.gzip_source
+    ext = ".gz"
+    compress = staticmethod(gzip.compress)
+
+
+class TestZstdSource(TestBz2Source):
+    source_cls = data_source.zstd_source
+    ext = ".zst"
+
+    @pytest.fixture(autouse=True)
+    def _require_zstd(self):
+        pytest.importorskip(
+            "compression.zstd" if sys.version_info >= (3, 14) else "zstandard"
+        )
+
+    @staticmethod
+    def compress(data):
+        try:
+            from compression import zstd
+        except ImportError:
+            import zstandard as zstd
+        return zstd.compress(data)
+
 
 class Test_invokable_data_source(TestDataSource):
     supports_mutable = False
@@ -179,3 +320,25 @@ class Test_invokable_data_source_wrapper_text(Test_invokable_data_source):
 
 class Test_invokable_data_source_wrapper_bytes(Test_invokable_data_source_wrapper_text):
     text_mode = False
+
+
+def test_set_async_concurrency(tmp_path):
+    with pytest.raises(ValueError):
+        data_source.set_async_concurrency(0)
+
+    sources = []
+    for x in range(10):
+        (path := tmp_path / str(x)).write_text(str(x))
+        sources.append(data_source.local_source(path))
+
+    async def run():
+        return await asyncio.gather(*(s.aread_text() for s in sources))
+
+    original = _async._concurrency
+    try:
+        data_source.set_async_concurrency(2)
+        assert asyncio.run(run()) == [str(x) for x in range(10)]
+        assert _async._executor._max_workers == 2
+    finally:
+        data_source.set_async_concurrency(1)
+        _async._concurrency = original
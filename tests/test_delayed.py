@@ -1,4 +1,8 @@
+import io
+import os
 import re
+import subprocess
+import sys
 
 from snakeoil import delayed
 from snakeoil.python_namespaces import protect_imports
@@ -32,3 +36,57 @@ def test_import_module(tmp_path):
         assert modules["blah"] is shortcircuited, (
             "import_module must return the module if it already is in sys.modules rather than a proxy"
         )
+
+
+def test_is_delayed():
+    d = delayed.regexp("asdf")
+    assert delayed.is_delayed(d)
+    assert not delayed.is_delayed(delayed.reify(d))
+    assert not delayed.is_delayed(re.compile("asdf"))
+
+
+def test_trace_reification(tmp_path):
+    with (tmp_path / "traced_blah.py").open("w") as f:
+        f.write("import time\ntime.sleep(0.01)\nx=1")
+    with protect_imports() as (path, modules):
+        path.append(str(tmp_path))
+        untraced = delayed.regexp("untraced")
+        module = delayed.import_module("traced_blah")
+        pattern = delayed.regexp("^traced")
+        with delayed.trace_reification() as trace:
+            assert module.x == 1
+            assert pattern.match("traced")
+            assert pattern.match("traced")
+        assert untraced.pattern == "untraced"
+
+    assert [(r.kind, r.target) for r in trace.records] == [
+        ("module", "traced_blah"),
+        ("regexp", "'^traced'"),
+    ]
+    assert [r.target for r in trace.sorted()][0] == "traced_blah"
+    assert trace.records[0].duration >= 0.01
+    assert all(r.trigger.startswith(f"{__file__}:") for r in trace.records)
+    assert all("test_trace_reification" in r.trigger for r in trace.records)
+
+    out = io.StringIO()
+    trace.report(out)
+    lines = out.getvalue().splitlines()
+    assert lines[0].startswith("delayed reification: 2 objects")
+    assert "traced_blah" in lines[1]
+    assert "'^traced'" in lines[2]
+
+
+def test_trace_env_var():
+    code = "from snakeoil import delayed; delayed.import_module('json', force_proxy=True).dumps"
+    env = os.environ.copy()
+    env[delayed.TRACE_ENV_VAR] = "1"
+    env["PYTHONPATH"] = os.pathsep.join(sys.path)
+    p = subprocess.run(
+        [sys.executable, "-c", code],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert p.stderr.startswith("delayed reification: 1 objects")
+    assert "module  json  <- <string>:1" in p.stderr
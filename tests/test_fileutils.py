@@ -110,6 +110,138 @@ class TestAtomicWriteFile:
         af.discard()
         af.close()
 
+    @pytest.mark.parametrize(
+        ("durability", "file_syncs", "dir_syncs"),
+        (("none", 0, 0), ("data", 1, 0), ("full", 1, 1)),
+    )
+    def test_durability(self, tmp_path, monkeypatch, durability, file_syncs, dir_syncs):
+        synced = []
+        monkeypatch.setattr(
+            fileutils, "_fsync_path", lambda path, data_only=False: synced.append(path)
+        )
+        timings = []
+        fp = tmp_path / "target"
+        with self.kls(fp, durability=durability, timing_hook=timings.append) as af:
+            af.write("dar")
+        assert fileutils.readfile_ascii(fp) == "dar"
+        assert synced == [af._temp_fp] * file_syncs + [str(tmp_path)] * dir_syncs
+
+        (timing,) = timings
+        assert timing.path == str(fp)
+        assert timing.durability == durability
+        assert all(x >= 0 for x in timing[2:])
+
+    def test_durability_invalid(self, tmp_path):
+        with pytest.raises(ValueError):
+            self.kls(tmp_path / "target", durability="paranoid")
+        assert not os.listdir(tmp_path)
+
+
+class TestAtomicWriteBatch:
+    def test_commit(self, tmp_path):
+        (existing := tmp_path / "existing").write_text("me")
+        (subdir := tmp_path / "subdir").mkdir()
+        batch = fileutils.AtomicWriteBatch()
+        batch.write(existing, "dar")
+        batch.write(subdir / "new", b"bytes")
+        with batch.open(subdir / "handle") as f:
+            f.write("handle")
+        # left open deliberately; commit must flush it.
+        batch.open(tmp_path / "unclosed").write("unclosed")
+        assert len(batch) == 4
+        assert existing.read_text() == "me"
+        assert not (subdir / "new").exists()
+
+        batch.commit()
+        assert existing.read_text() == "dar"
+        assert (subdir / "new").read_bytes() == b"bytes"
+        assert (subdir / "handle").read_text() == "handle"
+        assert (tmp_path / "unclosed").read_text() == "unclosed"
+        assert sorted(os.listdir(tmp_path)) == ["existing", "subdir", "unclosed"]
+        assert sorted(os.listdir(subdir)) == ["handle", "new"]
+
+        # commit and discard are idempotent, and staging after either fails.
+        batch.commit()
+        batch.discard()
+        assert existing.read_text() == "dar"
+        with pytest.raises(ValueError):
+            batch.write(existing, "again")
+
+    def test_handles_closed_when_staging(self, tmp_path):
+        batch = fileutils.AtomicWriteBatch(durable=False)
+        handles = []
+        for x in range(5):
+            handles.append(f := batch.open(tmp_path / f"file{x}"))
+            f.write(f"content {x}")
+        # only the most recently staged handle is still open.
+        assert [f.closed for f in handles] == [True] * 4 + [False]
+        batch.commit()
+        assert handles[-1].closed
+        for x in range(5):
+            assert (tmp_path / f"file{x}").read_text() == f"content {x}"
+
+    def test_restage(self, tmp_path):
+        batch = fileutils.AtomicWriteBatch()
+        batch.write(tmp_path / "target", "first")
+        batch.write(tmp_path / "target", "second")
+        assert len(batch) == 1
+        batch.commit()
+        assert os.listdir(tmp_path) == ["target"]
+        assert (tmp_path / "target").read_text() == "second"
+
+    def test_context_manager(self, tmp_path):
+        (fp := tmp_path / "target").write_text("me")
+        with pytest.raises(RuntimeError):
+            with fileutils.AtomicWriteBatch() as batch:
+                batch.write(fp, "dar")
+                raise RuntimeError
+        assert fp.read_text() == "me"
+        assert os.listdir(tmp_path) == ["target"]
+
+        with fileutils.AtomicWriteBatch() as batch:
+            batch.write(fp, "dar")
+        assert fp.read_text() == "dar"
+
+    def test_del(self, tmp_path):
+        batch = fileutils.AtomicWriteBatch()
+        batch.write(tmp_path / "target", "dar")
+        del batch
+        gc.collect()
+        assert os.listdir(tmp_path) == []
+
+    def test_perms(self, tmp_path):
+        with fileutils.AtomicWriteBatch(durable=False) as batch:
+            batch.write(tmp_path / "target", "dar", perms=0o600)
+        assert os.stat(tmp_path / "target").st_mode & 0o4777 == 0o600
+
+    @pytest.mark.parametrize("syncfs", (False, True))
+    def test_sync(self, tmp_path, monkeypatch, syncfs):
+        fsynced = []
+        real_fsync = os.fsync
+
+        def fsync(fd):
+            fsynced.append(os.readlink(f"/proc/self/fd/{fd}"))
+            return real_fsync(fd)
+
+        monkeypatch.setattr(os, "fsync", fsync)
+        paths = [tmp_path / str(x) for x in range(10)]
+        with fileutils.AtomicWriteBatch(syncfs=syncfs, workers=4) as batch:
+            for path in paths:
+                batch.write(path, "data")
+        if fileutils._get_syncfs() is None or not syncfs:
+            assert sorted(fsynced[:-1]) == sorted(
+                str(tmp_path / f".update.{x}") for x in range(10)
+            )
+        else:
+            assert len(fsynced) == 1
+        # the directory is synced once, after the renames.
+        assert fsynced[-1] == str(tmp_path)
+
+        fsynced.clear()
+        with fileutils.AtomicWriteBatch(durable=False) as batch:
+            batch.write(tmp_path / "nondurable", "data")
+        assert not fsynced
+
 
 class Test_readfile:
     func = staticmethod(fileutils.readfile)
@@ -229,8 +361,8 @@ class readlines_mixin:
         assert results == expected
 
 
-def mk_readlines_test(scope, mode):
-    func_name = "readlines_%s" % mode
+def mk_readlines_test(scope, mode, prefix="readlines"):
+    func_name = "%s_%s" % (prefix, mode)
     base = globals()["Test_readfile_%s" % mode]
 
     class kls(readlines_mixin, base):
@@ -244,6 +376,64 @@ def mk_readlines_test(scope, mode):
 for case in ("ascii", "utf8"):
     name = "readlines_%s" % case
     mk_readlines_test(locals(), case)
+    mk_readlines_test(locals(), case, prefix="readlines_bulk")
+
+
+class Test_readlines_bulk:
+    samples = (
+        "",
+        "\n",
+        "single",
+        "a\nb\n",
+        " a \n\n b\n\n",
+        "no trailing\nnewline",
+        "dos\r\nnewlines\r\n",
+        "old mac\rnewlines\rmixed\r\nin\n",
+        "form\x0cfeed\x1cand\u2028friends\n",
+    )
+
+    @pytest.mark.parametrize("strip", (True, False))
+    @pytest.mark.parametrize("data", samples)
+    def test_matches_readlines(self, tmp_path, data, strip):
+        (fp := tmp_path / "data").write_text(data, newline="")
+        assert list(fileutils.readlines(fp, strip)) == fileutils.readlines_bulk(
+            fp, strip
+        )
+
+    @pytest.mark.parametrize("data", samples)
+    def test_bytes(self, tmp_path, data):
+        (fp := tmp_path / "data").write_text(data, newline="")
+        with fp.open("rb") as f:
+            assert [line.strip() for line in f] == fileutils.readlines_bulk_bytes(fp)
+        with fp.open("rb") as f:
+            assert list(f) == fileutils.readlines_bulk_bytes(fp, False)
+
+    def test_skip_blanks(self, tmp_path):
+        (fp := tmp_path / "data").write_text(" a \n\n  \nb\n\n")
+        assert fileutils.readlines_bulk(fp, skip_blanks=True) == ["a", "b"]
+        assert fileutils.readlines_bulk(fp, False, skip_blanks=True) == [
+            " a \n",
+            "b\n",
+        ]
+
+    def test_mtime(self, tmp_path):
+        (fp := tmp_path / "data").write_text("a\n")
+        os.utime(fp, (1, 2))
+        result = fileutils.readlines_bulk(fp)
+        assert result.mtime == 2
+        assert result == ["a"]
+        assert (
+            fileutils.readlines_bulk(tmp_path / "missing", swallow_missing=True).mtime
+            is None
+        )
+
+    def test_large(self, tmp_path):
+        lines = [f"line {x} \u00e9" for x in range(200_000)]
+        (fp := tmp_path / "data").write_text("\n".join(lines), encoding="utf8")
+        assert fp.stat().st_size >= _fileutils._BULK_MMAP_THRESHOLD
+        assert fileutils.readlines_bulk(fp) == lines
+        with pytest.raises(UnicodeDecodeError):
+            fileutils.readlines_bulk_ascii(fp)
 
 
 class TestBrokenStats:
@@ -257,6 +447,10 @@ class TestBrokenStats:
         for path in self.test_cases:
             self._check_path(path, fileutils.readlines, True)
 
+    def test_readlines_bulk(self):
+        for path in self.test_cases:
+            self._check_path(path, fileutils.readlines_bulk, True)
+
     def _check_path(self, path, func, split_it=False):
         try:
             with open(path, "r") as handle:
@@ -275,6 +469,76 @@ class TestBrokenStats:
         assert func_data == data
 
 
+class Test_read_many:
+    @pytest.fixture
+    def paths(self, tmp_path):
+        paths = []
+        for x in range(50):
+            (path := tmp_path / f"file{x}").write_text(f"content {x}\n\u00e9")
+            paths.append(path)
+        return paths
+
+    def test_ordered(self, paths):
+        results = list(fileutils.read_many(paths, workers=4, readahead=3))
+        assert [p for p, _ in results] == paths
+        assert [c for _, c in results] == [p.read_text() for p in paths]
+
+    def test_unordered(self, paths):
+        results = dict(fileutils.read_many(paths, workers=4, ordered=False))
+        assert results == {p: p.read_text() for p in paths}
+
+    def test_bytes(self, paths):
+        for path, content in fileutils.read_many(paths, "rb"):
+            assert content == path.read_bytes()
+        with pytest.raises(ValueError):
+            next(fileutils.read_many(paths, "w"))
+
+    def test_exceptions(self, tmp_path, paths):
+        (bad := tmp_path / "bad").write_bytes(b"\xff")
+        targets = [paths[0], tmp_path / "missing", tmp_path, bad, paths[1]]
+        results = list(fileutils.read_many(targets))
+        assert [p for p, _ in results] == targets
+        assert results[0][1] == paths[0].read_text()
+        assert isinstance(results[1][1], FileNotFoundError)
+        assert isinstance(results[2][1], IsADirectoryError)
+        assert isinstance(results[3][1], UnicodeDecodeError)
+        assert results[4][1] == paths[1].read_text()
+
+    def test_fadvise(self, monkeypatch, tmp_path, paths):
+        hints = []
+
+        def posix_fadvise(fd, offset, length, advice):
+            hints.append((os.fstat(fd).st_ino, offset, length, advice))
+            raise OSError(errno.EINVAL, "unsupported")
+
+        monkeypatch.setattr(os, "posix_fadvise", posix_fadvise, raising=False)
+        monkeypatch.setattr(os, "POSIX_FADV_WILLNEED", 3, raising=False)
+        targets = paths + [tmp_path / "missing"]
+        results = list(fileutils.read_many(targets, workers=2, readahead=4))
+        assert [c for _, c in results[:-1]] == [p.read_text() for p in paths]
+        assert isinstance(results[-1][1], FileNotFoundError)
+        # the whole of every file that could be opened is hinted, in order.
+        assert hints == [(p.stat().st_ino, 0, 0, 3) for p in paths]
+
+        monkeypatch.delattr(os, "posix_fadvise")
+        results = list(fileutils.read_many(paths))
+        assert [c for _, c in results] == [p.read_text() for p in paths]
+
+    def test_lazy_consumption(self, paths):
+        consumed = []
+
+        def source():
+            for path in paths:
+                consumed.append(path)
+                yield path
+
+        results = fileutils.read_many(source(), workers=2, readahead=4)
+        assert next(results)[0] == paths[0]
+        assert len(consumed) <= 5
+        results.close()
+        assert len(consumed) <= 5
+
+
 class Test_mmap_or_open_for_read:
     func = staticmethod(fileutils.mmap_or_open_for_read)
 
@@ -127,3 +127,58 @@ class TestDelayedInstantiation:
             "this is a class level attribute, thus shouldn't "
             "trigger instantiation"
         )
+
+
+class TestReify:
+    def test_reify(self):
+        l = []
+
+        def f():
+            l.append(True)
+            return [1, 2]
+
+        o = make_DI(list, f)
+        real = obj.reify(o)
+        assert type(real) is list
+        assert real == [1, 2]
+        assert l == [True]
+        assert obj.reify(o) is real
+        assert l == [True], "reify must not instantiate twice"
+
+        # non proxies are passed through.
+        assert obj.reify(real) is real
+        assert obj.reify(None) is None
+
+    def test_rebind_globals(self):
+        l = []
+
+        def f():
+            l.append(True)
+            return [1, 2]
+
+        namespace = {"delayed": make_DI(list, f), "other": make_DI(list, f), "x": 1}
+        proxy = namespace["delayed"]
+        obj.rebind_globals(namespace)
+        assert not l, "rebind_globals must not trigger instantiation"
+        assert namespace["delayed"] is proxy
+
+        assert proxy == [1, 2]
+        assert type(namespace["delayed"]) is list
+        assert namespace["delayed"] is obj.reify(proxy)
+        assert namespace["other"] is not namespace["delayed"]
+        assert namespace["x"] == 1
+
+        # names reassigned before instantiation are left alone.
+        namespace = {"delayed": make_DI(list, f)}
+        proxy = namespace["delayed"]
+        obj.rebind_globals(namespace)
+        namespace["delayed"] = "replaced"
+        obj.reify(proxy)
+        assert namespace["delayed"] == "replaced"
+
+        # already instantiated proxies are rebound immediately, and names filtering works.
+        namespace = {"delayed": proxy, "other": make_DI(list, f)}
+        obj.rebind_globals(namespace, names=["delayed"])
+        assert type(namespace["delayed"]) is list
+        namespace["other"].append(3)
+        assert type(namespace["other"]) is not list
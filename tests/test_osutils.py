@@ -50,6 +50,125 @@ class TestNativeListDir(ReaddirCommon):
         (tmp_path / "monkeys").symlink_to("foon")
         assert listdir_files(tmp_path) == ["file"]
 
+    def test_symlinks(self, tmp_path, subdir):
+        (tmp_path / "dirlink").symlink_to("dir")
+        (tmp_path / "filelink").symlink_to("file")
+        assert sorted(listdir_dirs(tmp_path)) == ["dir", "dirlink"]
+        assert sorted(listdir_files(tmp_path)) == ["file", "filelink"]
+        assert listdir_dirs(tmp_path, followSymlinks=False) == ["dir"]
+        assert listdir_files(tmp_path, followSymlinks=False) == ["file"]
+
+    def test_listdir_split(self, tmp_path, subdir):
+        (tmp_path / "dirlink").symlink_to("dir")
+        (tmp_path / "dangling").symlink_to("foon")
+        files, dirs, others = osutils.listdir_split(tmp_path)
+        assert files == ["file"]
+        assert sorted(dirs) == ["dir", "dirlink"]
+        assert sorted(others) == ["dangling", "fifo"]
+
+        files, dirs, others = osutils.listdir_split(tmp_path, followSymlinks=False)
+        assert (files, dirs) == (["file"], ["dir"])
+        assert sorted(others) == ["dangling", "dirlink", "fifo"]
+
+        with pytest.raises(OSError):
+            osutils.listdir_split(tmp_path / "spork")
+
+
+class TestWalkEntries:
+    walk = staticmethod(osutils.walk_entries)
+
+    @pytest.fixture
+    def tree(self, tmp_path):
+        for path in ("a/b/c", "a/d", "e"):
+            (tmp_path / path).mkdir(parents=True)
+        for path in ("f", "a/g", "a/b/h", "a/b/c/i"):
+            (tmp_path / path).touch()
+        (tmp_path / "link").symlink_to("a")
+        return tmp_path
+
+    def test_walk(self, tree):
+        paths = [os.path.relpath(x.path, tree) for x in self.walk(tree)]
+        assert sorted(paths) == sorted(
+            ["a", "a/b", "a/b/c", "a/b/c/i", "a/b/h", "a/d", "a/g", "e", "f", "link"]
+        )
+        # parents are always yielded before their children.
+        for path in paths:
+            if parent := os.path.dirname(path):
+                assert paths.index(parent) < paths.index(path)
+
+    def test_follow_symlinks(self, tree):
+        paths = {
+            os.path.relpath(x.path, tree) for x in self.walk(tree, followSymlinks=True)
+        }
+        assert {"link/b/c/i", "link/g"} <= paths
+
+    def test_entries(self, tree):
+        entries = {os.path.relpath(x.path, tree): x for x in self.walk(tree)}
+        assert entries["a/b/h"].is_file()
+        assert entries["a/b"].is_dir()
+        assert entries["link"].is_symlink()
+        assert entries["a/b/h"].stat().st_size == 0
+
+    def test_onerror(self, tmp_path):
+        assert list(self.walk(tmp_path / "spork")) == []
+        errors = []
+        assert not list(self.walk(tmp_path / "spork", onerror=errors.append))
+        assert len(errors) == 1
+        assert isinstance(errors[0], FileNotFoundError)
+
+
+class TestWalkParallel(TestWalkEntries):
+    @staticmethod
+    def walk(*args, **kwargs):
+        # a chunk size of 1 forces every subtree to be handed off to other tasks.
+        return osutils.walk_parallel(*args, workers=4, chunk_size=1, **kwargs)
+
+    def test_chunking(self, tree):
+        expected = [x.path for x in osutils.walk_parallel(tree, ordered=True)]
+        for chunk_size in (2, 3, 100):
+            assert expected == [
+                x.path
+                for x in osutils.walk_parallel(
+                    tree, ordered=True, workers=2, chunk_size=chunk_size
+                )
+            ]
+
+        for chunk_size in (0, -1):
+            with pytest.raises(ValueError, match="chunk_size"):
+                next(osutils.walk_parallel(tree, chunk_size=chunk_size))
+
+    def test_ordered(self, tree):
+        paths = [os.path.relpath(x.path, tree) for x in self.walk(tree, ordered=True)]
+        assert paths == [
+            "a",
+            "e",
+            "f",
+            "link",
+            "a/b",
+            "a/d",
+            "a/g",
+            "a/b/c",
+            "a/b/h",
+            "a/b/c/i",
+        ]
+
+    def test_filter(self, tree):
+        seen = []
+
+        def filter(entry):
+            seen.append(entry.name)
+            return entry.name != "b"
+
+        paths = {os.path.relpath(x.path, tree) for x in self.walk(tree, filter=filter)}
+        assert paths == {"a", "a/d", "a/g", "e", "f", "link"}
+        # nothing beneath the pruned directory was listed.
+        assert "c" not in seen
+
+    def test_early_close(self, tree):
+        it = self.walk(tree)
+        next(it)
+        it.close()
+
 
 class TestEnsureDirs:
     def check_dir(self, path, uid, gid, mode):
@@ -178,6 +297,107 @@ class TestEnsureDirs:
         self.check_dir(path, os.geteuid(), os.getegid(), 0o777)
 
 
+class TestEnsureDirsCache:
+    @pytest.fixture(autouse=True)
+    def _clear_cache(self):
+        osutils.ensure_dirs_invalidate()
+        yield
+        osutils.ensure_dirs_invalidate()
+
+    def test_cache(self, tmp_path):
+        path = tmp_path / "foo" / "bar"
+        assert osutils.ensure_dirs(path, mode=0o755, cache=True)
+        with mock.patch("snakeoil.osutils.os.stat") as stat_mock:
+            assert osutils.ensure_dirs(path, mode=0o755, cache=True)
+            # differing arguments aren't cached results.
+            stat_mock.side_effect = OSError(errno.EIO, "io error")
+            assert not osutils.ensure_dirs(path, mode=0o700, cache=True)
+            # nor are calls not requesting the cache
+            assert not osutils.ensure_dirs(path, mode=0o755)
+
+        path.rmdir()
+        # stale until invalidated
+        assert osutils.ensure_dirs(path, mode=0o755, cache=True)
+        assert not path.exists()
+        osutils.ensure_dirs_invalidate(tmp_path / "foo")
+        assert osutils.ensure_dirs(path, mode=0o755, cache=True)
+        assert path.is_dir()
+
+    def test_invalidate_subtree(self, tmp_path):
+        for name in ("a", "a/b", "ab"):
+            assert osutils.ensure_dirs(tmp_path / name, cache=True)
+        osutils.ensure_dirs_invalidate(tmp_path / "a")
+        assert {x[0] for x in osutils._ensured_dirs} == {str(tmp_path / "ab")}
+
+    def test_deepest_ancestor(self, tmp_path):
+        (tmp_path / "a" / "b").mkdir(parents=True)
+        real_stat = os.stat
+        stats = []
+
+        def stat_mock(path, *args, **kwargs):
+            stats.append(str(path))
+            return real_stat(path, *args, **kwargs)
+
+        with mock.patch("snakeoil.osutils.os.stat", side_effect=stat_mock):
+            assert osutils.ensure_dirs(tmp_path / "a" / "b" / "c" / "d")
+        # the target, then upwards until an existing directory is found.
+        assert stats == [
+            str(tmp_path / "a" / "b" / "c" / "d"),
+            str(tmp_path / "a" / "b" / "c"),
+            str(tmp_path / "a" / "b"),
+        ]
+        assert (tmp_path / "a" / "b" / "c" / "d").is_dir()
+
+
+class TestEnsureDirsMany:
+    def test_many(self, tmp_path):
+        (tmp_path / "existing").mkdir(mode=0o700)
+        paths = [
+            tmp_path / "x" / "y" / "z",
+            tmp_path / "x" / "y",
+            tmp_path / "x" / "w",
+            tmp_path / "existing",
+            str(tmp_path / "x" / "y" / "z"),
+        ]
+        with mock.patch("snakeoil.osutils.os.mkdir", wraps=os.mkdir) as mkdir:
+            assert osutils.ensure_dirs_many(paths, mode=0o755) == []
+        # every directory was created exactly once.
+        assert sorted(str(x.args[0]) for x in mkdir.call_args_list) == sorted(
+            str(tmp_path / x) for x in ("x", "x/y", "x/y/z", "x/w")
+        )
+        for path in paths:
+            assert stat.S_IMODE(os.stat(path).st_mode) == 0o755
+
+    def test_restrictive_mode(self, tmp_path):
+        # parents must remain writable until all children are created
+        paths = [tmp_path / "r", tmp_path / "r" / "a", tmp_path / "r" / "b"]
+        assert osutils.ensure_dirs_many(paths, mode=0o500) == []
+        for path in paths:
+            assert stat.S_IMODE(os.stat(path).st_mode) == 0o500
+        (tmp_path / "r").chmod(0o700)
+
+    def test_failures(self, tmp_path):
+        (tmp_path / "file").touch()
+        paths = [tmp_path / "file", tmp_path / "file" / "dir", tmp_path / "ok"]
+        assert osutils.ensure_dirs_many(paths) == [
+            str(tmp_path / "file"),
+            str(tmp_path / "file" / "dir"),
+        ]
+        assert (tmp_path / "ok").is_dir()
+
+    def test_cache(self, tmp_path):
+        osutils.ensure_dirs_invalidate()
+        try:
+            paths = [tmp_path / "a", tmp_path / "b"]
+            assert osutils.ensure_dirs_many(paths, cache=True) == []
+            with mock.patch("snakeoil.osutils.os.stat") as stat_mock:
+                stat_mock.side_effect = OSError(errno.EIO, "io error")
+                assert osutils.ensure_dirs_many(paths, cache=True) == []
+                assert osutils.ensure_dirs(paths[0], cache=True)
+        finally:
+            osutils.ensure_dirs_invalidate()
+
+
 class TestAbsSymlink:
     @deprecated.suppress_deprecations()
     def test_abssymlink(self, tmp_path):
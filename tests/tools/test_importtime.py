@@ -0,0 +1,73 @@
+from snakeoil.cli.tool import Tool
+from snakeoil.tools import importtime
+
+SAMPLE = """\
+import time: self [us] | cumulative | imported package
+import time:       100 |        100 |   _io
+import time:        50 |        150 | io
+some unrelated stderr output
+import time:        10 |         10 |       errno
+import time:        20 |         30 |     subprocess.helper
+import time:        40 |         40 |     select
+import time:       200 |        270 |   subprocess
+import time:        30 |        300 | target
+"""
+
+
+def test_parse_importtime():
+    records = importtime.parse_importtime(SAMPLE)
+    assert [r.name for r in records] == [
+        "_io",
+        "io",
+        "errno",
+        "subprocess.helper",
+        "select",
+        "subprocess",
+        "target",
+    ]
+    by_name = {r.name: r for r in records}
+    assert by_name["_io"].parent == "io"
+    assert by_name["io"].parent is None
+    assert by_name["errno"].parent == "subprocess.helper"
+    assert by_name["subprocess.helper"].parent == "subprocess"
+    assert by_name["select"].parent == "subprocess"
+    assert by_name["subprocess"].parent == "target"
+    assert by_name["target"] == ("target", 30, 300, 0, None)
+
+
+def test_profile():
+    records = importtime.parse_importtime(SAMPLE)
+    profile = importtime.ImportProfile("target", tuple(records[2:]))
+    assert profile.total_us == 300
+    assert profile.chain("errno") == [
+        "target",
+        "subprocess",
+        "subprocess.helper",
+        "errno",
+    ]
+    assert [r.name for r in profile.eager()] == ["subprocess"]
+    assert [r.name for r in profile.eager(["select", "subprocess"])] == [
+        "subprocess",
+        "select",
+    ]
+
+
+def test_profile_import():
+    profile = importtime.profile_import("snakeoil.osutils", runs=1)
+    assert profile.module == "snakeoil.osutils"
+    assert profile.get("snakeoil.osutils") is not None
+    assert profile.total_us > 0
+
+
+def test_main(capsys):
+    ret = Tool(importtime.parser)(
+        ["-n", "1", "--budget=snakeoil.osutils=0", "snakeoil.osutils"]
+    )
+    assert ret == 1
+    out, err = capsys.readouterr()
+    assert "snakeoil.osutils:" in out
+    assert "EXCEEDED" in out
+    assert "modules over budget: snakeoil.osutils" in err
+
+    assert Tool(importtime.parser)(["--budget=nope", "snakeoil.osutils"]) != 0
+    assert "invalid" in capsys.readouterr().err